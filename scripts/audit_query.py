@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import boto3
+
+# Allow running as `python scripts/audit_query.py` from the project root
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.audit import AuditQuery
+from src.audit.schema import HOUR, DAY, HISTOGRAM_BINS
+
+
+def get_table(args):
+    """Resolve the audit table from arguments or environment."""
+    table_name = args.table or os.getenv("DYNAMODB_TABLE")
+    if not table_name:
+        print("❌ No table given. Use --table or set DYNAMODB_TABLE.")
+        sys.exit(1)
+    endpoint_url = args.endpoint_url or os.getenv("DYNAMODB_ENDPOINT_URL")
+    dynamodb = boto3.resource('dynamodb', endpoint_url=endpoint_url)
+    return dynamodb.Table(table_name)
+
+
+def cmd_toxic(query, args):
+    end = time.time()
+    items = query.predictions_between(end - args.hours * HOUR, end, min_toxicity=args.min_score)
+    print(f"🔍 {len(items)} predictions with toxicity >= {args.min_score} in the last {args.hours}h")
+    for item in items[:args.limit]:
+        print(json.dumps({
+            "timestamp": item.get("timestamp"),
+            "toxicity": item.get("toxicity"),
+            "flagged_categories": item.get("flagged_categories"),
+            "text_snippet": item.get("text_snippet")
+        }))
+
+
+def cmd_flag_rate(query, args):
+    end = time.time()
+    rates = query.flag_rates(end - args.days * DAY, end, per=args.per)
+    print(f"📊 Flag rates per {args.per} (last {args.days} days)")
+    print(json.dumps(rates, indent=2))
+
+
+def cmd_histogram(query, args):
+    end = time.time()
+    histogram = query.score_histogram(args.category, end - args.days * DAY, end)
+    total = sum(histogram) or 1
+    print(f"📊 Score histogram for '{args.category}' (last {args.days} days)")
+    for i, count in enumerate(histogram):
+        low, high = i / HISTOGRAM_BINS, (i + 1) / HISTOGRAM_BINS
+        bar = "█" * int(40 * count / total)
+        print(f"  {low:.1f}-{high:.1f} {count:>8} {bar}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the moderation audit table")
+    parser.add_argument("--table", help="Audit table name (default: $DYNAMODB_TABLE)")
+    parser.add_argument("--endpoint-url", help="DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local")
+    parser.add_argument("--shards", type=int, default=int(os.getenv("AUDIT_SHARDS", "4")))
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    toxic = sub.add_parser("toxic", help="Recent predictions above a toxicity score")
+    toxic.add_argument("--hours", type=float, default=1)
+    toxic.add_argument("--min-score", type=float, default=0.5)
+    toxic.add_argument("--limit", type=int, default=20)
+    toxic.set_defaults(func=cmd_toxic)
+
+    flag_rate = sub.add_parser("flag-rate", help="Flag rate per category from rollups")
+    flag_rate.add_argument("--days", type=float, default=7)
+    flag_rate.add_argument("--per", choices=["day", "hour"], default="day")
+    flag_rate.set_defaults(func=cmd_flag_rate)
+
+    histogram = sub.add_parser("histogram", help="Score histogram for a category from rollups")
+    histogram.add_argument("--category", default="toxic")
+    histogram.add_argument("--days", type=float, default=1)
+    histogram.set_defaults(func=cmd_histogram)
+
+    args = parser.parse_args()
+    query = AuditQuery(get_table(args), shards=args.shards)
+    args.func(query, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+# Allow running as `python scripts/benchmark_grpc.py` from the project root
+sys.path.append(str(Path(__file__).parent.parent))
+
+import grpc
+import httpx
+import uvicorn
+
+from src.api import main
+from src.proto import moderation_pb2, moderation_pb2_grpc
+
+SAMPLE_TEXTS = [
+    "Thanks!",
+    "You are an idiot.",
+    "I really appreciate the detailed feedback on my edit, it helped a lot.",
+    "This article is biased garbage and whoever wrote it should be ashamed of themselves. " * 3,
+]
+
+FAKE_PREDICTION = {
+    'is_toxic': True,
+    'toxicity_scores': {'toxic': 0.95, 'severe_toxic': 0.1, 'obscene': 0.8, 'threat': 0.0, 'insult': 0.7, 'identity_hate': 0.0},
+    'flagged_categories': ['toxic', 'obscene', 'insult'],
+    'confidence': 0.95
+}
+
+
+def summarize(latencies, items=1):
+    ordered = sorted(latencies)
+    total = sum(latencies) / 1000
+    return {
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p99_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 3),
+        "items_per_s": round(len(latencies) * items / total, 1) if total else None
+    }
+
+
+def start_servers(http_port, grpc_port):
+    """Run uvicorn (with gRPC started from the app lifespan) in a background thread."""
+    os.environ["GRPC_PORT"] = str(grpc_port)
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=http_port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def time_calls(call, rounds):
+    for text in SAMPLE_TEXTS:
+        call(text)  # Warm up
+    latencies = []
+    for _ in range(rounds):
+        for text in SAMPLE_TEXTS:
+            start = time.perf_counter()
+            call(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def time_stream(stub, count):
+    """Messages pushed as fast as possible through one stream; per-message round trip."""
+    sent_at = {}
+
+    async def requests():
+        for i in range(count):
+            sent_at[str(i)] = time.perf_counter()
+            yield moderation_pb2.ModerateRequest(text=SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)], id=str(i))
+
+    latencies = []
+    start = time.perf_counter()
+    async for response in stub.ModerateStream(requests()):
+        latencies.append((time.perf_counter() - sent_at[response.id]) * 1000)
+    return latencies, time.perf_counter() - start
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark the gRPC service against the REST API")
+    parser.add_argument("--rounds", type=int, default=50, help="Passes over the sample texts")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--http-port", type=int, default=8765)
+    parser.add_argument("--grpc-port", type=int, default=50561)
+    parser.add_argument("--fake-model", action="store_true",
+                        help="Constant predictor, to isolate transport and serialization cost")
+    args = parser.parse_args()
+
+    if args.fake_model:
+        fake = MagicMock()
+        fake.predict.return_value = FAKE_PREDICTION
+        fake.predict_batch.side_effect = lambda texts: [FAKE_PREDICTION] * len(texts)
+        main.predictor = fake
+    server, thread = start_servers(args.http_port, args.grpc_port)
+
+    http = httpx.Client(base_url=f"http://127.0.0.1:{args.http_port}")
+    channel = grpc.insecure_channel(f"127.0.0.1:{args.grpc_port}")
+    stub = moderation_pb2_grpc.ModerationStub(channel)
+    batch = (SAMPLE_TEXTS * args.batch_size)[:args.batch_size]
+    batch_rounds = max(1, args.rounds * len(SAMPLE_TEXTS) // args.batch_size)
+
+    results = {
+        "REST /moderate": summarize(time_calls(
+            lambda text: http.post("/moderate", json={"text": text}).json(), args.rounds
+        )),
+        "gRPC Moderate": summarize(time_calls(
+            lambda text: stub.Moderate(moderation_pb2.ModerateRequest(text=text)), args.rounds
+        )),
+        "REST /moderate/batch": summarize(time_calls(
+            lambda _: http.post("/moderate/batch", json={"texts": batch}).json(), batch_rounds
+        ), args.batch_size),
+        "gRPC ModerateBatch": summarize(time_calls(
+            lambda _: stub.ModerateBatch(moderation_pb2.BatchModerateRequest(texts=batch)), batch_rounds
+        ), args.batch_size),
+    }
+
+    async def stream():
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{args.grpc_port}") as aio_channel:
+            return await time_stream(moderation_pb2_grpc.ModerationStub(aio_channel), args.rounds * len(SAMPLE_TEXTS))
+    stream_latencies, elapsed = asyncio.run(stream())
+    # Messages overlap in a stream, so throughput is messages over wall time, not summed latency
+    results["gRPC ModerateStream"] = {
+        **summarize(stream_latencies), "items_per_s": round(len(stream_latencies) / elapsed, 1)
+    }
+
+    print(f"\nModel: {'fake (transport only)' if args.fake_model else 'loaded from MODEL_PATH'}")
+    print(f"{'path':24}{'p50 ms':>10}{'p99 ms':>10}{'texts/s':>10}")
+    for name, row in results.items():
+        print(f"{name:24}{row['p50_ms']:>10}{row['p99_ms']:>10}{str(row['items_per_s'] or '-'):>10}")
+
+    http.close()
+    channel.close()
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main_cli()
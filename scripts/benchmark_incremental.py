@@ -0,0 +1,88 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Allow running as `python scripts/benchmark_incremental.py` from the project root
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.models.incremental import IncrementalModerator
+from src.models.model_loader import ModelLoader
+from src.models.predictor import ToxicityPredictor
+from src.utils.text_processing import clean_text
+
+SENTENCES = [
+    "Thanks for fixing the references in this section.",
+    "I reverted your edit because it removed sourced content.",
+    "Please discuss major changes on the talk page first.",
+    "You are an idiot and nobody wants you here.",
+    "The infobox still lists the wrong release date.",
+    "This is the third time you have vandalized this article.",
+    "I really appreciate the detailed feedback on my edit.",
+    "Stop being so stupid about the formatting rules.",
+    "The second paragraph reads like an advertisement.",
+    "Could someone with access check the original source?",
+]
+
+
+def edit_replay(documents, sentences_per_doc, edits_per_doc, seed=0):
+    """Versions of each document, where every edit rewrites one sentence."""
+    rng = random.Random(seed)
+    workload = []
+    for doc in range(documents):
+        sentences = [f"{rng.choice(SENTENCES)[:-1]} (note {doc}-{i})." for i in range(sentences_per_doc)]
+        workload.append((f"doc-{doc}", " ".join(sentences)))
+        for edit in range(edits_per_doc):
+            position = rng.randrange(sentences_per_doc)
+            sentences[position] = f"{rng.choice(SENTENCES)[:-1]} (edit {doc}-{edit})."
+            workload.append((f"doc-{doc}", " ".join(sentences)))
+    return workload
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental re-moderation on an edit-replay workload")
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--sentences", type=int, default=12, help="Sentences per document")
+    parser.add_argument("--edits", type=int, default=5, help="Single-sentence edits per document")
+    parser.add_argument("--model-name", default=os.getenv("MODEL_NAME", "distilbert-base-uncased"))
+    parser.add_argument("--model-path", default=os.getenv("MODEL_PATH", "models/best_model.pt"))
+    parser.add_argument("--max-length", type=int, default=int(os.getenv("MAX_LENGTH", "256")))
+    args = parser.parse_args()
+
+    loader = ModelLoader(model_name=args.model_name, model_path=args.model_path, device="cpu", inference_mode="eager")
+    loader.load_model()
+    predictor = ToxicityPredictor(loader.get_model(), loader.get_tokenizer(), max_length=args.max_length)
+    moderator = IncrementalModerator(predictor)
+    workload = [(doc_id, clean_text(text)) for doc_id, text in edit_replay(args.documents, args.sentences, args.edits)]
+
+    full_ms, incremental_ms, segments, scored, agree = [], [], 0, 0, 0
+    for doc_id, text in workload:
+        start = time.perf_counter()
+        full = predictor.predict(text)
+        full_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        incremental, details = moderator.moderate(doc_id, text)
+        incremental_ms.append((time.perf_counter() - start) * 1000)
+
+        segments += details["segments"]
+        scored += details["segments_scored"]
+        agree += full["is_toxic"] == incremental["is_toxic"]
+
+    edits = [ms for i, ms in enumerate(incremental_ms) if i % (args.edits + 1)]
+    print(f"\nWorkload: {args.documents} documents x {args.sentences} sentences, {args.edits} edits each "
+          f"({len(workload)} requests)")
+    print(f"{'mode':14}{'total s':>10}{'p50 ms':>10}{'edit p50 ms':>13}")
+    print(f"{'full text':14}{sum(full_ms) / 1000:>10.2f}{statistics.median(full_ms):>10.2f}{'':>13}")
+    print(f"{'incremental':14}{sum(incremental_ms) / 1000:>10.2f}{statistics.median(incremental_ms):>10.2f}"
+          f"{statistics.median(edits) if edits else 0:>13.2f}")
+    print(f"\nSegments scored: {scored}/{segments} ({scored / segments:.1%})")
+    print(f"Verdict agreement with full-text scoring: {agree / len(workload):.1%}")
+    print(f"Cache: {moderator.snapshot()['segments']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Allow running as `python scripts/benchmark_inference.py` from the project root
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.models.model_loader import ModelLoader
+from src.models.predictor import ToxicityPredictor
+from src.utils.text_processing import clean_text
+
+SAMPLE_TEXTS = [
+    "Thanks!",
+    "You are an idiot.",
+    "I really appreciate the detailed feedback on my edit, it helped a lot.",
+    "This article is biased garbage and whoever wrote it should be ashamed of themselves. " * 3,
+    "Please stop vandalizing this page. If you continue you will be blocked from editing. " * 8,
+]
+
+
+def time_predictor(predictor, texts, rounds):
+    """Per-call latencies in milliseconds over `rounds` passes of `texts`."""
+    for text in texts:
+        predictor.predict(text)  # Warm up
+    latencies = []
+    for _ in range(rounds):
+        for text in texts:
+            start = time.perf_counter()
+            predictor.predict(text)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {
+        "p50": statistics.median(ordered),
+        "p95": ordered[int(0.95 * (len(ordered) - 1))],
+        "mean": statistics.fmean(ordered)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare eager and TorchScript bucketed inference")
+    parser.add_argument("--model-name", default=os.getenv("MODEL_NAME", "distilbert-base-uncased"))
+    parser.add_argument("--model-path", default=os.getenv("MODEL_PATH", "models/best_model.pt"))
+    parser.add_argument("--buckets", default=os.getenv("SEQUENCE_BUCKETS", "32,64,128,256"))
+    parser.add_argument("--max-length", type=int, default=int(os.getenv("MAX_LENGTH", "256")))
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    buckets = tuple(int(b) for b in args.buckets.split(","))
+    texts = [clean_text(t) for t in SAMPLE_TEXTS]
+    cache_dir = tempfile.mkdtemp(prefix="torchscript_bench_")
+
+    results = {}
+    predictors = {}
+    for mode in ("eager", "torchscript"):
+        start = time.perf_counter()
+        loader = ModelLoader(
+            model_name=args.model_name,
+            model_path=args.model_path,
+            inference_mode=mode,
+            sequence_buckets=buckets,
+            torchscript_cache_dir=cache_dir
+        )
+        loader.load_model()
+        load_time = time.perf_counter() - start
+        predictors[mode] = ToxicityPredictor(
+            loader.get_model(), loader.get_tokenizer(), max_length=args.max_length, device=loader.device
+        )
+        results[mode] = {"load_s": load_time, **summarize(time_predictor(predictors[mode], texts, args.rounds))}
+
+    # Cold start with the trace already cached
+    start = time.perf_counter()
+    ModelLoader(
+        model_name=args.model_name,
+        model_path=args.model_path,
+        inference_mode="torchscript",
+        sequence_buckets=buckets,
+        torchscript_cache_dir=cache_dir
+    ).load_model()
+    results["torchscript"]["cached_load_s"] = time.perf_counter() - start
+
+    max_diff = 0.0
+    for text in texts:
+        eager = predictors["eager"].predict(text)["toxicity_scores"]
+        traced = predictors["torchscript"].predict(text)["toxicity_scores"]
+        max_diff = max(max_diff, max(abs(eager[k] - traced[k]) for k in eager))
+
+    print(f"\n📊 Inference benchmark ({args.rounds} rounds x {len(texts)} texts, buckets {list(buckets)})")
+    print(f"{'Mode':<12} {'Load (s)':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'Mean (ms)':>10}")
+    print("-" * 53)
+    for mode, r in results.items():
+        print(f"{mode:<12} {r['load_s']:>9.2f} {r['p50']:>9.2f} {r['p95']:>9.2f} {r['mean']:>10.2f}")
+    print(f"\nTorchScript cold start with cached trace: {results['torchscript']['cached_load_s']:.2f}s")
+    print(f"Max score difference vs eager: {max_diff:.2e}")
+    print(f"Speedup (p50): {results['eager']['p50'] / results['torchscript']['p50']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Allow running as `python scripts/benchmark_serialization.py` from the project root
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from src.api.responses import render_batch, render_result
+from src.api.schemas import BatchModerationResponse, ModerationResponse, ToxicityScores
+
+TEXT = "I reverted your edit because it removed sourced content and, frankly, you are an idiot. " * 2
+
+PREDICTION = {
+    'is_toxic': True,
+    'toxicity_scores': {
+        'toxic': 0.9512, 'severe_toxic': 0.1033, 'obscene': 0.8121,
+        'threat': 0.0042, 'insult': 0.7265, 'identity_hate': 0.0117
+    },
+    'flagged_categories': ['toxic', 'obscene', 'insult'],
+    'confidence': 0.9512
+}
+
+
+def pydantic_model(text, prediction):
+    """The model the endpoint used to build before this path existed."""
+    return ModerationResponse(
+        text=text[:100] + "..." if len(text) > 100 else text,
+        is_toxic=prediction['is_toxic'],
+        toxicity_scores=ToxicityScores(**prediction['toxicity_scores']),
+        flagged_categories=prediction['flagged_categories'],
+        confidence=prediction['confidence'],
+        timestamp=datetime.utcnow()
+    )
+
+
+def response_model_path(adapter, model):
+    """What FastAPI does with a returned model: dump, re-validate, encode, json.dumps."""
+    value = adapter.validate_python(model.model_dump())
+    return JSONResponse(jsonable_encoder(adapter.dump_python(value, mode="json"))).body
+
+
+def time_per_call(call, repeat):
+    call()  # Warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization paths")
+    parser.add_argument("--repeat", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    single = TypeAdapter(ModerationResponse)
+    batch = TypeAdapter(BatchModerationResponse)
+    texts = [TEXT] * args.batch_size
+    predictions = [PREDICTION] * args.batch_size
+
+    paths = {
+        "pydantic + response_model": (
+            lambda: response_model_path(single, pydantic_model(TEXT, PREDICTION)),
+            lambda: response_model_path(batch, BatchModerationResponse(
+                results=[pydantic_model(t, p) for t, p in zip(texts, predictions)]
+            ))
+        ),
+        "orjson full": (
+            lambda: render_result(TEXT, PREDICTION, "full").body,
+            lambda: render_batch(texts, predictions, "full").body
+        ),
+        "orjson compact": (
+            lambda: render_result(TEXT, PREDICTION, "compact").body,
+            lambda: render_batch(texts, predictions, "compact").body
+        ),
+    }
+
+    print(f"\nBatch size: {args.batch_size}, {args.repeat} repeats (median)")
+    print(f"{'path':28}{'us/resp':>10}{'bytes':>8}{'us/batch':>10}{'bytes':>8}")
+    baseline = None
+    for name, (one, many) in paths.items():
+        one_us, many_us = time_per_call(one, args.repeat), time_per_call(many, max(1, args.repeat // 10))
+        baseline = baseline or one_us
+        print(f"{name:28}{one_us:>10.1f}{len(one()):>8}{many_us:>10.1f}{len(many()):>8}"
+              f"  ({baseline / one_us:.1f}x)")
+
+    # Sanity check: the full orjson body carries the same fields as the pydantic one
+    legacy = json.loads(response_model_path(single, pydantic_model(TEXT, PREDICTION)))
+    fast = json.loads(render_result(TEXT, PREDICTION, "full").body)
+    assert legacy.keys() == fast.keys(), (legacy.keys(), fast.keys())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 
 import boto3
+import hashlib
 import os
 import sys
 from pathlib import Path
@@ -24,6 +25,17 @@ def get_model_bucket():
         return None
     return None
 
+def compute_sha256(path):
+    """
+    Compute the sha256 of the model file.
+    Stored as object metadata so the loader can verify its download.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(8 * 1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def upload_model():
     # 1. Locate Model File
     project_root = Path(__file__).parent.parent
@@ -37,6 +49,9 @@ def upload_model():
     print(f"✅ Found model file: {model_path}")
     file_size_mb = model_path.stat().st_size / (1024 * 1024)
     print(f"   Size: {file_size_mb:.2f} MB")
+    
+    checksum = compute_sha256(model_path)
+    print(f"   sha256: {checksum}")
 
     # 2. Identify S3 Bucket
     print("🔍 Looking for S3 bucket...")
@@ -60,7 +75,10 @@ def upload_model():
             str(model_path), 
             bucket_name, 
             s3_key,
-            ExtraArgs={'ContentType': 'application/octet-stream'}
+            ExtraArgs={
+                'ContentType': 'application/octet-stream',
+                'Metadata': {'sha256': checksum}
+            }
         )
         print("✅ Upload successful!")
         print("   The Lambda function will now download this model on startup.")
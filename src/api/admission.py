@@ -0,0 +1,239 @@
+"""
+Admission control for model inference.
+Bounds concurrent and queued inferences, drops queued work whose deadline
+has passed and lets interactive requests overtake bulk ones.
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+PRIORITY_LANES = ("interactive", "bulk")  # Highest priority first
+
+
+class AdmissionRejected(Exception):
+    """Base class for requests the controller refuses to run."""
+
+    status_code = 503
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class QueueFullError(AdmissionRejected):
+    """Raised when the lane queue is full and the request is shed."""
+
+    status_code = 429
+
+
+class DeadlineExceededError(AdmissionRejected):
+    """Raised when a request's deadline passes before it reaches the model."""
+
+    status_code = 503
+
+
+class AdmissionController:
+    """Concurrency limiter with bounded priority queues and deadlines."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        max_queue: int = 32,
+        max_bulk_queue: int = None,
+        default_deadline: float = 5.0
+    ):
+        """
+        Initialize admission controller.
+
+        Args:
+            max_concurrent: Maximum number of inferences running at once
+            max_queue: Maximum number of queued interactive requests
+            max_bulk_queue: Maximum number of queued bulk requests (defaults to max_queue)
+            default_deadline: Deadline in seconds for requests that don't set one
+        """
+        self.max_concurrent = max_concurrent
+        self.queue_limits = {
+            "interactive": max_queue,
+            "bulk": max_queue if max_bulk_queue is None else max_bulk_queue
+        }
+        self.default_deadline = default_deadline
+
+        self._active = 0
+        self._waiters: Dict[str, deque] = {lane: deque() for lane in PRIORITY_LANES}
+        self._service_time = 0.1  # EWMA of inference time, used for Retry-After
+
+        # Counters
+        self.admitted = {lane: 0 for lane in PRIORITY_LANES}
+        self.shed = {lane: 0 for lane in PRIORITY_LANES}
+        self.timed_out = {lane: 0 for lane in PRIORITY_LANES}
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.queued_admissions = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Create a controller configured from environment variables."""
+        max_queue = int(os.getenv("MAX_QUEUED_INFERENCES", "32"))
+        return cls(
+            max_concurrent=int(os.getenv("MAX_CONCURRENT_INFERENCES", "2")),
+            max_queue=max_queue,
+            max_bulk_queue=int(os.getenv("MAX_QUEUED_BULK_INFERENCES", str(max_queue))),
+            default_deadline=int(os.getenv("REQUEST_DEADLINE_MS", "5000")) / 1000
+        )
+
+    @property
+    def active(self) -> int:
+        """Number of inferences currently holding a slot."""
+        return self._active
+
+    def queued(self, lane: str = None) -> int:
+        """Number of requests waiting for a slot, optionally for one lane."""
+        lanes = [lane] if lane else PRIORITY_LANES
+        return sum(
+            1 for name in lanes for fut in self._waiters[name] if not fut.done()
+        )
+
+    def is_idle(self) -> bool:
+        """True when no inference is running or waiting."""
+        return self._active == 0 and self.queued() == 0
+
+    def retry_after(self) -> int:
+        """Estimate in whole seconds until the current backlog drains."""
+        backlog = self.queued() + self._active
+        return max(1, math.ceil(self._service_time * backlog / self.max_concurrent))
+
+    def deadline_from(self, timeout_ms: Optional[int]) -> float:
+        """
+        Convert a relative timeout into an absolute monotonic deadline.
+
+        Args:
+            timeout_ms: Caller supplied budget in milliseconds, or None for the default
+
+        Returns:
+            Deadline on the time.monotonic() clock
+        """
+        budget = self.default_deadline if timeout_ms is None else timeout_ms / 1000
+        return time.monotonic() + budget
+
+    async def acquire(self, lane: str = "interactive", deadline: float = None):
+        """
+        Wait for an inference slot.
+
+        Args:
+            lane: Priority lane, one of PRIORITY_LANES
+            deadline: Absolute time.monotonic() deadline (defaults to default_deadline)
+
+        Raises:
+            QueueFullError: If the lane queue is full
+            DeadlineExceededError: If the deadline passes before a slot frees up
+        """
+        if lane not in self._waiters:
+            raise ValueError(f"Unknown priority lane: {lane}")
+        if deadline is None:
+            deadline = time.monotonic() + self.default_deadline
+        if deadline <= time.monotonic():
+            # Already expired (e.g. X-Request-Deadline-Ms <= 0); never worth a forward pass
+            self.timed_out[lane] += 1
+            raise DeadlineExceededError("Request deadline exceeded", self.retry_after())
+
+        if self._active < self.max_concurrent and self.queued() == 0:
+            self._active += 1
+            self.admitted[lane] += 1
+            return
+
+        if self.queued(lane) >= self.queue_limits[lane]:
+            self.shed[lane] += 1
+            raise QueueFullError("Server overloaded, request shed", self.retry_after())
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self.timed_out[lane] += 1
+            raise DeadlineExceededError("Request deadline exceeded", self.retry_after())
+
+        fut = asyncio.get_running_loop().create_future()
+        waiters = self._waiters[lane]
+        waiters.append(fut)
+        enqueued_at = time.monotonic()
+
+        try:
+            await asyncio.wait_for(fut, timeout=remaining)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if fut.done() and not fut.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release()
+            else:
+                try:
+                    waiters.remove(fut)
+                except ValueError:
+                    pass
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            self.timed_out[lane] += 1
+            raise DeadlineExceededError("Request deadline exceeded", self.retry_after())
+
+        wait = time.monotonic() - enqueued_at
+        self.queued_admissions += 1
+        self.queue_wait_total += wait
+        self.queue_wait_max = max(self.queue_wait_max, wait)
+
+        if time.monotonic() >= deadline:
+            # Don't spend model time on work the client has already given up on
+            self._release()
+            self.timed_out[lane] += 1
+            raise DeadlineExceededError("Request deadline exceeded", self.retry_after())
+
+        self.admitted[lane] += 1
+
+    def _release(self):
+        """Hand the slot to the highest-priority waiter or free it."""
+        for lane in PRIORITY_LANES:
+            waiters = self._waiters[lane]
+            while waiters:
+                fut = waiters.popleft()
+                if not fut.done():
+                    fut.set_result(None)
+                    return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, lane: str = "interactive", deadline: float = None):
+        """
+        Hold an inference slot for the duration of the block.
+
+        Args:
+            lane: Priority lane, one of PRIORITY_LANES
+            deadline: Absolute time.monotonic() deadline
+        """
+        await self.acquire(lane, deadline)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            self._release()
+
+    def snapshot(self) -> Dict:
+        """Current limits, occupancy and counters."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "queue_limits": dict(self.queue_limits),
+            "active": self._active,
+            "queued": {lane: self.queued(lane) for lane in PRIORITY_LANES},
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+            "timed_out": dict(self.timed_out),
+            "queue_wait": {
+                "count": self.queued_admissions,
+                "mean_ms": round(
+                    1000 * self.queue_wait_total / self.queued_admissions, 3
+                ) if self.queued_admissions else 0.0,
+                "max_ms": round(1000 * self.queue_wait_max, 3)
+            }
+        }
@@ -0,0 +1,238 @@
+"""
+gRPC service sharing the REST API's predictor, admission control and stats.
+
+Runs on the same event loop as the FastAPI app when GRPC_PORT is set
+(started from the app's lifespan), or standalone:
+
+    python -m src.api.grpc_server --port 50051
+
+Scores travel as a packed float array in ToxicityPredictor.LABEL_COLUMNS
+order with a flags bitmask, so there is no JSON or pydantic work per call.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List
+
+import grpc
+from starlette.concurrency import run_in_threadpool
+
+from src.api import main
+from src.api.admission import AdmissionRejected, PRIORITY_LANES
+from src.api.responses import LABELS, label_flags
+from src.api.schemas import MAX_BATCH_SIZE
+from src.models.predictor import ToxicityPredictor
+from src.proto import moderation_pb2, moderation_pb2_grpc
+from src.utils.text_processing import clean_text, validate_text
+
+logger = logging.getLogger(__name__)
+
+STREAM_MAX_BATCH = int(os.getenv("GRPC_STREAM_MAX_BATCH", "16"))
+STREAM_MAX_WAIT_MS = float(os.getenv("GRPC_STREAM_MAX_WAIT_MS", "5"))
+MODEL_NOT_LOADED = "Model not loaded. Please try again later."
+INTERNAL_ERROR = "Internal server error"
+
+
+class ModelNotLoadedError(Exception):
+    """The predictor hasn't been loaded yet."""
+
+
+def to_message(prediction: Dict, request_id: str = "") -> moderation_pb2.ModerateResponse:
+    """Convert a predictor result into a ModerateResponse."""
+    return moderation_pb2.ModerateResponse(
+        id=request_id,
+        is_toxic=prediction['is_toxic'],
+        scores=[prediction['toxicity_scores'][label] for label in LABELS],
+        flags=label_flags(prediction['flagged_categories']),
+        confidence=prediction['confidence']
+    )
+
+
+class ModerationServicer(moderation_pb2_grpc.ModerationServicer):
+    """Moderation service backed by the predictor loaded in src.api.main."""
+
+    def __init__(self, stream_max_batch: int = STREAM_MAX_BATCH, stream_max_wait: float = STREAM_MAX_WAIT_MS / 1000):
+        """
+        Initialize servicer.
+
+        Args:
+            stream_max_batch: Most stream messages scored in one forward pass (capped at MAX_BATCH_SIZE)
+            stream_max_wait: Seconds the first stream message waits for others
+        """
+        self.stream_max_batch = max(1, min(stream_max_batch, MAX_BATCH_SIZE))
+        self.stream_max_wait = stream_max_wait
+
+    async def _predict(self, texts: List[str], priority: str, deadline_ms: int, peer: str) -> List[Dict]:
+        """
+        Score cleaned texts under admission control and record stats and audit entries.
+
+        Raises:
+            AdmissionRejected: If the work is shed or misses its deadline
+            ModelNotLoadedError: If the model isn't loaded
+        """
+        predictor = main.predictor
+        if predictor is None:
+            raise ModelNotLoadedError(MODEL_NOT_LOADED)
+
+        start = time.perf_counter()
+        deadline = main.admission.deadline_from(deadline_ms or None)
+        async with main.admission.slot(priority or "interactive", deadline):
+            predictions = await run_in_threadpool(predictor.predict_batch, [clean_text(t) for t in texts])
+
+        latency = time.perf_counter() - start
+        for prediction in predictions:
+            main.prediction_stats.record(
+                [prediction['toxicity_scores'][label] for label in main.prediction_stats.labels],
+                latency
+            )
+        main.log_audit(texts, predictions, peer)
+        return predictions
+
+    async def _unary(self, texts: List[str], request, context) -> List[Dict]:
+        """Validate, predict and map failures onto gRPC status codes."""
+        for index, text in enumerate(texts):
+            is_valid, error_msg = validate_text(text)
+            if not is_valid:
+                prefix = f"texts[{index}]: " if len(texts) > 1 else ""
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, prefix + error_msg)
+        if request.priority and request.priority not in PRIORITY_LANES:
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT, f"priority must be one of: {', '.join(PRIORITY_LANES)}"
+            )
+
+        try:
+            return await self._predict(texts, request.priority, request.deadline_ms, context.peer())
+        except AdmissionRejected as e:
+            context.set_trailing_metadata((("retry-after", str(e.retry_after)),))
+            code = grpc.StatusCode.RESOURCE_EXHAUSTED if e.status_code == 429 else grpc.StatusCode.UNAVAILABLE
+            await context.abort(code, e.detail)
+        except ModelNotLoadedError:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, MODEL_NOT_LOADED)
+        except Exception as e:
+            logger.error("Error processing gRPC request: %s", e)
+            await context.abort(grpc.StatusCode.INTERNAL, INTERNAL_ERROR)
+
+    async def Moderate(self, request, context):
+        predictions = await self._unary([request.text], request, context)
+        return to_message(predictions[0], request.id)
+
+    async def ModerateBatch(self, request, context):
+        if not request.texts:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "texts cannot be empty")
+        if len(request.texts) > MAX_BATCH_SIZE:
+            # Same limit as /moderate/batch: one forward pass holds one admission slot
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT, f"texts cannot contain more than {MAX_BATCH_SIZE} items"
+            )
+        predictions = await self._unary(list(request.texts), request, context)
+        return moderation_pb2.BatchModerateResponse(results=[to_message(p) for p in predictions])
+
+    async def ModerateStream(self, request_iterator, context):
+        """Micro-batch messages that arrive within stream_max_wait of each other."""
+        queue = asyncio.Queue()
+        done = object()
+
+        async def read():
+            try:
+                async for request in request_iterator:
+                    await queue.put(request)
+            finally:
+                await queue.put(done)
+
+        reader = asyncio.ensure_future(read())
+        finished = False
+        try:
+            while not finished:
+                batch = [await queue.get()]
+                if batch[0] is done:
+                    break
+                deadline = time.perf_counter() + self.stream_max_wait
+                while len(batch) < self.stream_max_batch:
+                    try:
+                        item = await asyncio.wait_for(queue.get(), max(0.0, deadline - time.perf_counter()))
+                    except asyncio.TimeoutError:
+                        break
+                    if item is done:
+                        finished = True
+                        break
+                    batch.append(item)
+
+                for response in await self._stream_batch(batch, context.peer()):
+                    yield response
+        finally:
+            reader.cancel()
+
+    async def _stream_batch(self, batch, peer: str) -> List[moderation_pb2.ModerateResponse]:
+        """Score one micro-batch; failures are reported per message instead of ending the stream."""
+        responses = [None] * len(batch)
+        valid = []
+        for i, request in enumerate(batch):
+            is_valid, error_msg = validate_text(request.text)
+            if not is_valid:
+                responses[i] = moderation_pb2.ModerateResponse(id=request.id, error=error_msg)
+            elif request.priority and request.priority not in PRIORITY_LANES:
+                responses[i] = moderation_pb2.ModerateResponse(id=request.id, error="invalid priority")
+            else:
+                valid.append(i)
+
+        if valid:
+            # The batch runs in the most urgent lane and tightest deadline among its messages
+            priority = "interactive" if any(batch[i].priority in ("", "interactive") for i in valid) else "bulk"
+            deadlines = [batch[i].deadline_ms for i in valid if batch[i].deadline_ms]
+            error = None
+            try:
+                predictions = await self._predict(
+                    [batch[i].text for i in valid], priority, min(deadlines) if deadlines else 0, peer
+                )
+                for i, prediction in zip(valid, predictions):
+                    responses[i] = to_message(prediction, batch[i].id)
+            except AdmissionRejected as e:
+                error = e.detail
+            except ModelNotLoadedError:
+                error = MODEL_NOT_LOADED
+            except Exception as e:
+                logger.error("Error processing gRPC stream batch: %s", e)
+                error = INTERNAL_ERROR  # Don't leak internal exception text to clients
+            if error is not None:
+                for i in valid:
+                    responses[i] = moderation_pb2.ModerateResponse(id=batch[i].id, error=error)
+        return responses
+
+    async def Labels(self, request, context):
+        return moderation_pb2.LabelsResponse(labels=LABELS, threshold=ToxicityPredictor.THRESHOLD)
+
+
+async def start_server(port: int, host: str = "[::]") -> grpc.aio.Server:
+    """Start the gRPC server on the running event loop."""
+    server = grpc.aio.server()
+    moderation_pb2_grpc.add_ModerationServicer_to_server(ModerationServicer(), server)
+    bound = server.add_insecure_port(f"{host}:{port}")
+    await server.start()
+    server.bound_port = bound
+    logger.info("🚀 gRPC server listening on port %d", bound)
+    return server
+
+
+async def serve(port: int):
+    """Load the model and serve gRPC until cancelled."""
+    if main.predictor is None:
+        main.load_predictor()
+    server = await start_server(port)
+    try:
+        await server.wait_for_termination()
+    finally:
+        await server.stop(grace=5)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="gRPC moderation server")
+    parser.add_argument("--port", type=int, default=int(os.getenv("GRPC_PORT", "50051")))
+    args = parser.parse_args()
+    asyncio.run(serve(args.port))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -3,26 +3,43 @@
 FastAPI application for content moderation.
 """
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import Depends, FastAPI, HTTPException, Request, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import json
 import time
 import uuid
 import os
 import boto3
-from decimal import Decimal
 from datetime import datetime
-from pythonjsonlogger import jsonlogger
 from pathlib import Path
+from typing import Optional
 from dotenv import load_dotenv
 from mangum import Mangum
 
-from src.api.schemas import ModerationRequest, ModerationResponse, HealthResponse, ToxicityScores
+from src.api.schemas import (
+    ModerationRequest, ModerationResponse, BatchModerationRequest, BatchModerationResponse,
+    IncrementalModerationRequest, IncrementalModerationResponse, HealthResponse,
+    JobRequest, JobStatusResponse
+)
+from src.api.admission import AdmissionController, AdmissionRejected, PRIORITY_LANES
+from src.api.shadow import ShadowScorer
+from src.api.responses import LABELS, RESPONSE_FORMATS, compact_result, full_result, render_batch, render_result
+from src.api.stats import PredictionStats, DEFAULT_WINDOWS
+from src.audit import AuditWriter
+from src.jobs.callbacks import check_callback_url
+from src.jobs.store import JobStore
+from src.models.incremental import IncrementalModerator
 from src.models.model_loader import ModelLoader
 from src.models.predictor import ToxicityPredictor
 from src.utils.text_processing import clean_text, validate_text
+from src.utils.logging_config import setup_logging, REQUEST_LOGGER_NAME
+from src.utils import memory
 
 # Get the project root directory (where .env is located)
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -41,32 +58,35 @@ if os.getenv("AWS_LAMBDA_FUNCTION_NAME"):
     os.environ['TRANSFORMERS_CACHE'] = '/tmp/transformers_cache'
     os.environ['HF_HOME'] = '/tmp/hf_home'
     os.environ['NLTK_DATA'] = '/tmp/nltk_data'
+    # Frozen containers make no background progress and the task root is read-only:
+    # jobs stay off unless JOB_DB_PATH points at writable shared storage
+    os.environ.setdefault('JOB_EXECUTOR', 'false')
+    # A frozen container can't flush buffered rollups later, so write them every invocation
+    os.environ.setdefault('AUDIT_ROLLUP_FLUSH_SECONDS', '0')
 
 
-# Configure Structured JSON Logging
+# Configure Structured JSON Logging (queued, with per-request sampling)
+setup_logging()
 logger = logging.getLogger()
-logHandler = logging.StreamHandler()
-formatter = jsonlogger.JsonFormatter(
-    fmt='%(asctime)s %(levelname)s %(name)s %(message)s'
-)
-logHandler.setFormatter(formatter)
-logger.addHandler(logHandler)
-logger.setLevel(logging.INFO)
-
-# Remove default handlers to avoid duplicate logs
-for handler in logger.handlers[:-1]:
-    logger.removeHandler(handler)
+request_logger = logging.getLogger(REQUEST_LOGGER_NAME)
 
 # Log environment variables (for debugging)
-logger.info(f"PROJECT_ROOT: {PROJECT_ROOT}")
-logger.info(f"Loading .env from: {env_path}")
-logger.info(f"MODEL_NAME from env: {os.getenv('MODEL_NAME')}")
-logger.info(f"MODEL_PATH from env: {os.getenv('MODEL_PATH')}")
+logger.info("PROJECT_ROOT: %s", PROJECT_ROOT)
+logger.info("Loading .env from: %s", env_path)
+logger.info("MODEL_NAME from env: %s", os.getenv('MODEL_NAME'))
+logger.info("MODEL_PATH from env: %s", os.getenv('MODEL_PATH'))
 
 # Global variables
 model_loader = None
 predictor = None
 dynamodb_table = None
+audit_writer = None
+incremental_moderator = None
+job_store = None
+job_executor = None
+shadow_scorer = None
+admission = AdmissionController.from_env()
+prediction_stats = PredictionStats(capacity=int(os.getenv("STATS_CAPACITY", "10000")))
 
 def get_dynamodb_table():
     """Lazy load DynamoDB table resource."""
@@ -75,7 +95,7 @@ def get_dynamodb_table():
         table_name = os.getenv("DYNAMODB_TABLE")
         if table_name:
             try:
-                dynamodb = boto3.resource('dynamodb')
+                dynamodb = boto3.resource('dynamodb', endpoint_url=os.getenv("DYNAMODB_ENDPOINT_URL"))
                 dynamodb_table = dynamodb.Table(table_name)
                 logger.info(f"✅ DynamoDB logging enabled: {table_name}")
             except Exception as e:
@@ -83,12 +103,84 @@ def get_dynamodb_table():
     return dynamodb_table
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+def get_audit_writer():
+    """Lazy load the audit writer on top of the DynamoDB table."""
+    global audit_writer
+    if audit_writer is None:
+        table = get_dynamodb_table()
+        if table:
+            audit_writer = AuditWriter(
+                table,
+                shards=int(os.getenv("AUDIT_SHARDS", "4")),
+                threshold=ToxicityPredictor.THRESHOLD,
+                flush_interval=float(os.getenv("AUDIT_ROLLUP_FLUSH_SECONDS", "60")),
+                ttl_days=int(os.getenv("AUDIT_TTL_DAYS", "30")),
+                max_queue=int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+            )
+    return audit_writer
+
+
+def get_incremental_moderator():
+    """Lazy load the segment-caching moderator on top of the predictor."""
+    global incremental_moderator
+    if incremental_moderator is None or incremental_moderator.predictor is not predictor:
+        incremental_moderator = IncrementalModerator(
+            predictor,
+            max_segments=int(os.getenv("SEGMENT_CACHE_SIZE", "50000")),
+            max_documents=int(os.getenv("DOCUMENT_CACHE_SIZE", "10000")),
+            max_segment_chars=int(os.getenv("SEGMENT_MAX_CHARS", "500")),
+            max_document_segments=int(os.getenv("SEGMENT_MAX_PER_DOCUMENT", "64"))
+        )
+    return incremental_moderator
+
+
+def get_job_store():
     """
-    Lifespan context manager for startup and shutdown events.
+    Lazy open the sqlite job store.
+    
+    JOB_DB_PATH is resolved against the project root. On Lambda there is no
+    default, so the job API is unavailable unless a path is configured.
+    
+    Returns:
+        The JobStore, or None if jobs are disabled or the database can't be opened
+    """
+    global job_store
+    if job_store is None:
+        default_path = None if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "data/jobs.sqlite3"
+        db_path = os.getenv("JOB_DB_PATH", default_path)
+        if db_path:
+            try:
+                job_store = JobStore(
+                    str(PROJECT_ROOT / db_path),
+                    lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", "300"))
+                )
+            except Exception as e:
+                logger.error(f"❌ Failed to open job store {db_path}: {e}")
+    return job_store
+
+
+def require_job_store() -> JobStore:
+    """The job store, or 503 when background jobs are unavailable in this deployment."""
+    store = get_job_store()
+    if store is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Background jobs are not available in this deployment."
+        )
+    return store
+
+
+def log_job_batch(texts: list, predictions: list, job: dict):
+    """Audit job predictions; they stay out of the interactive /stats window."""
+    log_audit(texts, predictions, job.get("ip_address") or "unknown")
+
+
+def load_predictor():
+    """
+    Load the model and create the predictor.
+    Called from lifespan, or ahead of time by the pre-fork server so that
+    workers share the weights.
     """
-    # Startup: Load model
     global model_loader, predictor
     
     logger.info("Starting up: Loading model...")
@@ -124,36 +216,120 @@ async def lifespan(app: FastAPI):
         logger.info("✅ Model loaded successfully!")
         logger.info(f"✅ Using device: {model_loader.device}")
         logger.info(f"✅ Fine-tuned model loaded: {model_loader.fine_tuned_loaded}")
+        logger.info("📊 Model load memory", extra={"memory": memory.tracker.snapshot()["stages"].get("model_load")})
         
     except Exception as e:
         logger.error(f"❌ Failed to load model: {str(e)}")
         raise
+
+
+def load_shadow_scorer():
+    """
+    Load the candidate model named by SHADOW_MODEL_PATH for shadow scoring.
+    Called from lifespan, or ahead of time by the pre-fork server so that
+    workers share the candidate's weights too. A candidate that fails to
+    load is logged and skipped; it never blocks startup.
+    """
+    global shadow_scorer
     
-    yield
+    model_path_relative = os.getenv("SHADOW_MODEL_PATH")
+    if not model_path_relative:
+        return
     
-    # Shutdown
-    logger.info("Shutting down...")
+    try:
+        loader = ModelLoader(
+            model_name=os.getenv("SHADOW_MODEL_NAME", os.getenv("MODEL_NAME", "distilbert-base-uncased")),
+            model_path=str(PROJECT_ROOT / model_path_relative)
+        )
+        loader.load_model()
+        candidate = ToxicityPredictor(
+            model=loader.get_model(),
+            tokenizer=loader.get_tokenizer(),
+            max_length=int(os.getenv("MAX_LENGTH", "256")),
+            device=loader.device
+        )
+    except Exception as e:
+        logger.error(f"❌ Failed to load shadow model {model_path_relative}: {str(e)}")
+        return
+    
+    shadow_scorer = ShadowScorer(
+        candidate,
+        admission,
+        sample_rate=float(os.getenv("SHADOW_SAMPLE_RATE", "0.05")),
+        max_queue=int(os.getenv("SHADOW_QUEUE_SIZE", "1000")),
+        batch_size=int(os.getenv("SHADOW_BATCH_SIZE", "4"))
+    )
+    logger.info(f"✅ Shadow model loaded: {model_path_relative}")
 
 
-# Configure Structured JSON Logging
-logger = logging.getLogger()
-logHandler = logging.StreamHandler()
-formatter = jsonlogger.JsonFormatter(
-    fmt='%(asctime)s %(levelname)s %(name)s %(message)s'
-)
-logHandler.setFormatter(formatter)
-logger.addHandler(logHandler)
-logger.setLevel(logging.INFO)
+def shadow_task(texts: list, predictions: list) -> Optional[BackgroundTask]:
+    """Offer primary results to the shadow scorer once the response has been sent."""
+    if shadow_scorer is None:
+        return None
+    return BackgroundTask(shadow_scorer.offer, texts, predictions)
 
-# Remove default handlers to avoid duplicate logs
-for handler in logger.handlers[:-1]:
-    logger.removeHandler(handler)
 
-# Log environment variables (for debugging)
-logger.info(f"PROJECT_ROOT: {PROJECT_ROOT}")
-logger.info(f"Loading .env from: {env_path}")
-logger.info(f"MODEL_NAME from env: {os.getenv('MODEL_NAME')}")
-logger.info(f"MODEL_PATH from env: {os.getenv('MODEL_PATH')}")
+async def log_memory_periodically(interval: float):
+    """Log RSS, peak and per-stage memory every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info("📊 Memory", extra={"memory": memory.tracker.snapshot()})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Lifespan context manager for startup and shutdown events.
+    """
+    # Startup: Load model unless it was preloaded (pre-fork server)
+    if predictor is None:
+        load_predictor()
+    
+    # gRPC shares this event loop, predictor and admission controller
+    grpc_server = None
+    if os.getenv("GRPC_PORT"):
+        from src.api.grpc_server import start_server
+        grpc_server = await start_server(int(os.getenv("GRPC_PORT")))
+    
+    global job_executor
+    if os.getenv("JOB_EXECUTOR", "true").lower() in ("1", "true", "yes") and get_job_store() is not None:
+        from src.jobs.executor import JobExecutor
+        job_executor = JobExecutor(
+            job_store,
+            lambda: predictor,
+            admission,
+            batch_size=int(os.getenv("JOB_BATCH_SIZE", "64")),
+            retention=float(os.getenv("JOB_RETENTION_HOURS", "24")) * 3600,
+            on_batch=log_job_batch,
+            max_callbacks=int(os.getenv("JOB_CALLBACK_CONCURRENCY", "8")),
+            callback_guard=check_callback_url
+        )
+        job_executor.start()
+    
+    if shadow_scorer is None:
+        load_shadow_scorer()
+    if shadow_scorer is not None:
+        shadow_scorer.start()
+    
+    memory_logger = None
+    interval = float(os.getenv("MEMORY_LOG_SECONDS", "60"))
+    if interval > 0:
+        memory_logger = asyncio.create_task(log_memory_periodically(interval))
+    
+    yield
+    
+    # Shutdown
+    logger.info("Shutting down...")
+    if memory_logger is not None:
+        memory_logger.cancel()
+    if grpc_server is not None:
+        await grpc_server.stop(grace=5)
+    if job_executor is not None:
+        await job_executor.stop()
+    if shadow_scorer is not None:
+        await shadow_scorer.stop()
+    if audit_writer is not None:
+        await run_in_threadpool(audit_writer.close)
 
 
 # Create FastAPI app
@@ -167,28 +343,28 @@ app = FastAPI(
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     request_id = str(uuid.uuid4())
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     # Add request context to logs
-    logger = logging.getLogger("api")
     extra = {"request_id": request_id, "path": request.url.path, "method": request.method}
     
-    logger.info("Request started", extra=extra)
+    if request_logger.isEnabledFor(logging.DEBUG):
+        request_logger.debug("Request started", extra=extra)
     
     try:
         response = await call_next(request)
-        process_time = time.time() - start_time
-        
-        extra["status_code"] = response.status_code
-        extra["process_time"] = round(process_time, 4)
+        process_time = time.perf_counter() - start_time
         
-        logger.info("Request completed", extra=extra)
+        if request_logger.isEnabledFor(logging.INFO):
+            extra["status_code"] = response.status_code
+            extra["process_time"] = round(process_time, 4)
+            request_logger.info("Request completed", extra=extra)
         
         response.headers["X-Request-ID"] = request_id
         response.headers["X-Process-Time"] = str(process_time)
         return response
     except Exception as e:
-        logger.error(f"Request failed: {str(e)}", extra=extra)
+        request_logger.error("Request failed: %s", e, extra=extra)
         raise
 
 # Add CORS middleware
@@ -201,7 +377,19 @@ app.add_middleware(
 )
 
 # Create handler for AWS Lambda
-handler = Mangum(app)
+mangum_handler = Mangum(app)
+
+
+def handler(event, context):
+    """
+    Lambda entry point.
+    Waits for queued audit writes before returning: the container is frozen
+    between invocations, so the background writer can't finish them later.
+    """
+    response = mangum_handler(event, context)
+    if audit_writer is not None:
+        audit_writer.drain(float(os.getenv("AUDIT_DRAIN_SECONDS", "5")))
+    return response
 
 
 @app.get("/", tags=["Root"])
@@ -227,17 +415,117 @@ async def health_check():
     )
 
 
+@app.get("/labels", tags=["Root"])
+async def labels():
+    """Label order of compact scores and flag bits, and the flagging threshold."""
+    return {"labels": LABELS, "threshold": ToxicityPredictor.THRESHOLD}
+
+
+@app.get("/admission", tags=["Monitoring"])
+async def admission_stats():
+    """Admission control occupancy, shed, timeout and queue-wait counters."""
+    return admission.snapshot()
+
+
+@app.get("/stats", tags=["Monitoring"])
+async def moderation_stats(window: Optional[int] = Query(None, gt=0, description="Window in seconds")):
+    """Rolling toxicity rates, score percentiles and flag counts over recent predictions."""
+    windows = [window] if window else DEFAULT_WINDOWS
+    return prediction_stats.snapshot(windows)
+
+
+@app.get("/shadow", tags=["Monitoring"])
+async def shadow_stats():
+    """Candidate-vs-primary score differences and flag disagreements on sampled traffic."""
+    if shadow_scorer is None:
+        return {"enabled": False}
+    return {"enabled": True, **shadow_scorer.snapshot()}
+
+
+@app.get("/debug/memory", tags=["Monitoring"])
+async def debug_memory(
+    tensors: bool = Query(False, description="Count live tensors (walks all objects; slow)"),
+    top: int = Query(0, ge=0, le=100, description="Largest allocation sites to return"),
+    trace: bool = Query(False, description="Start tracemalloc so later calls can report allocation sites")
+):
+    """Current and peak RSS, per-stage memory deltas and, on demand, tensors and allocation sites."""
+    report = memory.tracker.snapshot()
+    if trace:
+        report["tracemalloc_started"] = memory.start_tracing()
+    if tensors:
+        report["live_tensors"] = await run_in_threadpool(memory.live_tensors)
+    if top:
+        report["top_allocations"] = await run_in_threadpool(memory.top_allocations, top)
+    return report
+
+
+def priority_lane(x_priority: str = Header("interactive")) -> str:
+    """Admission lane named by the X-Priority header."""
+    if x_priority not in PRIORITY_LANES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"X-Priority must be one of: {', '.join(PRIORITY_LANES)}"
+        )
+    return x_priority
+
+
+def response_format_query(
+    response_format: str = Query("full", alias="format", description="full, or compact (score array and flags bitmask)")
+) -> str:
+    """Response shape named by the format query parameter."""
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"format must be one of: {', '.join(RESPONSE_FORMATS)}"
+        )
+    return response_format
+
+
+@asynccontextmanager
+async def admission_slot(lane: str, deadline_ms: Optional[int]):
+    """
+    Hold an admission slot for the block.
+    
+    Args:
+        lane: Priority lane from priority_lane
+        deadline_ms: X-Request-Deadline-Ms budget, or None for the default
+        
+    Raises:
+        HTTPException: 429 or 503 with Retry-After when the request isn't admitted
+    """
+    try:
+        async with admission.slot(lane, admission.deadline_from(deadline_ms)):
+            yield
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
 @app.post("/moderate", response_model=ModerationResponse, tags=["Moderation"])
-async def moderate_content(request: ModerationRequest):
+async def moderate_content(
+    request: ModerationRequest,
+    raw_request: Request,
+    x_priority: str = Depends(priority_lane),
+    x_request_deadline_ms: Optional[int] = Header(None),
+    response_format: str = Depends(response_format_query)
+):
     """
     Moderate content for toxicity.
     
     Args:
         request: ModerationRequest with text to analyze
+        raw_request: Underlying HTTP request (client address for the audit log)
+        x_priority: Priority lane (interactive or bulk)
+        x_request_deadline_ms: Time budget in milliseconds before queued work is dropped
+        response_format: Response shape, full or compact
         
     Returns:
         ModerationResponse with toxicity predictions
     """
+    start_time = time.perf_counter()
     try:
         # Validate input
         is_valid, error_msg = validate_text(request.text)
@@ -254,50 +542,311 @@ async def moderate_content(request: ModerationRequest):
                 detail="Model not loaded. Please try again later."
             )
         
-        # Get prediction
-        prediction = predictor.predict(cleaned_text)
+        # Get prediction once admitted, off the event loop
+        async with admission_slot(x_priority, x_request_deadline_ms):
+            prediction = await run_in_threadpool(predictor.predict, cleaned_text)
         
-        # Create response
-        response = ModerationResponse(
-            text=request.text[:100] + "..." if len(request.text) > 100 else request.text,
-            is_toxic=prediction['is_toxic'],
-            toxicity_scores=ToxicityScores(**prediction['toxicity_scores']),
-            flagged_categories=prediction['flagged_categories'],
-            confidence=prediction['confidence'],
-            timestamp=datetime.utcnow()
+        prediction_stats.record(
+            [prediction['toxicity_scores'][label] for label in prediction_stats.labels],
+            time.perf_counter() - start_time
         )
         
-        logger.info(f"Moderation request processed: is_toxic={prediction['is_toxic']}, confidence={prediction['confidence']:.3f}")
+        # Create response (serialized directly, without re-validation)
+        response = render_result(request.text, prediction, response_format)
+        response.background = shadow_task([cleaned_text], [prediction])
+        
+        request_logger.info(
+            "Moderation request processed: is_toxic=%s, confidence=%.3f",
+            prediction['is_toxic'], prediction['confidence']
+        )
         
         return response
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing request: {str(e)}")
+        logger.error("Error processing request: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
     finally:
         # Log to DynamoDB
+        if 'prediction' in locals():
+            log_audit([request.text], [prediction], client_ip(raw_request))
+
+
+@app.post("/moderate/batch", response_model=BatchModerationResponse, tags=["Moderation"])
+async def moderate_batch(
+    request: BatchModerationRequest,
+    raw_request: Request,
+    x_priority: str = Depends(priority_lane),
+    x_request_deadline_ms: Optional[int] = Header(None),
+    response_format: str = Depends(response_format_query)
+):
+    """
+    Moderate several texts with a single batched forward pass.
+    
+    The batch takes one admission slot; any invalid text rejects the whole batch.
+    
+    Args:
+        request: BatchModerationRequest with the texts to analyze
+        raw_request: Underlying HTTP request (client address for the audit log)
+        x_priority: Priority lane (interactive or bulk)
+        x_request_deadline_ms: Time budget in milliseconds before queued work is dropped
+        response_format: Response shape, full or compact
+        
+    Returns:
+        BatchModerationResponse with one result per text, in order
+    """
+    start_time = time.perf_counter()
+    
+    for index, text in enumerate(request.texts):
+        is_valid, error_msg = validate_text(text)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=f"texts[{index}]: {error_msg}")
+    
+    if predictor is None:
+        raise HTTPException(status_code=503, detail="Model not loaded. Please try again later.")
+    
+    cleaned_texts = [clean_text(text) for text in request.texts]
+    try:
+        async with admission_slot(x_priority, x_request_deadline_ms):
+            predictions = await run_in_threadpool(predictor.predict_batch, cleaned_texts)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error processing batch request: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    latency = time.perf_counter() - start_time
+    for prediction in predictions:
+        prediction_stats.record(
+            [prediction['toxicity_scores'][label] for label in prediction_stats.labels],
+            latency
+        )
+    
+    request_logger.info(
+        "Batch moderation request processed: size=%d, toxic=%d",
+        len(predictions), sum(p['is_toxic'] for p in predictions)
+    )
+    
+    log_audit(request.texts, predictions, client_ip(raw_request))
+    response = render_batch(request.texts, predictions, response_format)
+    response.background = shadow_task(cleaned_texts, predictions)
+    return response
+
+
+@app.post("/moderate/incremental", response_model=IncrementalModerationResponse, tags=["Moderation"])
+async def moderate_incremental(
+    request: IncrementalModerationRequest,
+    raw_request: Request,
+    x_priority: str = Depends(priority_lane),
+    x_request_deadline_ms: Optional[int] = Header(None),
+    response_format: str = Depends(response_format_query)
+):
+    """
+    Moderate an edited document, scoring only segments not seen before.
+    
+    The text is split into sentence segments; cached segment scores are
+    reused and the document is flagged if any segment is. Requests served
+    entirely from the cache skip admission control and the model.
+    
+    The verdict can differ from /moderate on the same text: each sentence
+    is scored without the others, so toxicity spread across sentences may
+    be missed and a sentence that is only toxic out of context may flag.
+    Documents with more than SEGMENT_MAX_PER_DOCUMENT segments are scored
+    as one whole text, as /moderate would, and report segments=1.
+    
+    Args:
+        request: Document id and its full current text
+        raw_request: Underlying HTTP request (client address for the audit log)
+        x_priority: Priority lane (interactive or bulk)
+        x_request_deadline_ms: Time budget in milliseconds before queued work is dropped
+        response_format: Response shape, full or compact
+        
+    Returns:
+        IncrementalModerationResponse with the document verdict and segment counts
+    """
+    start_time = time.perf_counter()
+    
+    is_valid, error_msg = validate_text(request.text)
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_msg)
+    
+    if predictor is None:
+        raise HTTPException(status_code=503, detail="Model not loaded. Please try again later.")
+    
+    moderator = get_incremental_moderator()
+    plan = moderator.prepare(clean_text(request.text))
+    scored = 0
+    if plan.missing:
         try:
-            table = get_dynamodb_table()
-            if table and 'prediction' in locals():
-                item = {
-                    'prediction_id': str(uuid.uuid4()),
-                    'timestamp': Decimal(str(time.time())),
-                    'text_snippet': request.text[:200],
-                    'is_toxic': prediction['is_toxic'],
-                    'confidence': Decimal(str(prediction['confidence'])),
-                    'flagged_categories': prediction['flagged_categories'],
-                    'ip_address': request.client.host if request.client else "unknown"
-                }
-                # Add individual scores
-                for cat, score in prediction['toxicity_scores'].items():
-                    item[f"score_{cat}"] = Decimal(str(score))
-                
-                table.put_item(Item=item)
-                logger.info("✅ Prediction logged to DynamoDB")
+            async with admission_slot(x_priority, x_request_deadline_ms):
+                scored = await run_in_threadpool(moderator.score_missing, plan)
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"❌ Error logging to DynamoDB: {e}")
+            logger.error("Error processing incremental request: %s", e)
+            raise HTTPException(status_code=500, detail="Internal server error")
+    
+    prediction, details = moderator.finish(request.document_id, plan, scored)
+    prediction_stats.record(
+        [prediction['toxicity_scores'][label] for label in prediction_stats.labels],
+        time.perf_counter() - start_time
+    )
+    request_logger.info(
+        "Incremental moderation request processed: segments=%d, scored=%d, is_toxic=%s",
+        details['segments'], scored, prediction['is_toxic']
+    )
+    log_audit([request.text], [prediction], client_ip(raw_request))
+    
+    return render_result(
+        request.text, prediction, response_format,
+        document_id=request.document_id,
+        segments=details['segments'],
+        segments_scored=details['segments_scored'],
+        segments_changed=details['segments_changed']
+    )
+
+
+@app.get("/incremental", tags=["Monitoring"])
+async def incremental_stats():
+    """Segment and document cache occupancy, hit rate and evictions."""
+    if incremental_moderator is None:
+        return {"segments": None, "documents": None, "whole_text_documents": 0}
+    return incremental_moderator.snapshot()
+
+
+@app.post("/jobs", response_model=JobStatusResponse, status_code=202, tags=["Jobs"])
+async def submit_job(request: JobRequest, raw_request: Request):
+    """
+    Queue texts for background moderation.
+    
+    Jobs are scored in large batches only while interactive requests leave
+    spare capacity. Poll GET /jobs/{job_id}, page through
+    GET /jobs/{job_id}/results, or pass callback_url to be notified.
+    Callback URLs that resolve to private, loopback or link-local
+    addresses are rejected unless listed in JOB_CALLBACK_ALLOWED_HOSTS.
+    
+    Args:
+        request: Texts to moderate and an optional completion callback URL
+        raw_request: Underlying HTTP request (client address for the audit log)
+        
+    Returns:
+        JobStatusResponse for the queued job
+    """
+    # Up to MAX_JOB_SIZE texts, so off the event loop
+    error_msg = await run_in_threadpool(invalid_text_error, request.texts)
+    if error_msg:
+        raise HTTPException(status_code=400, detail=error_msg)
+    
+    if request.callback_url:
+        # Resolves the host, so off the event loop
+        is_valid, error_msg = await run_in_threadpool(check_callback_url, request.callback_url)
+        if not is_valid:
+            raise HTTPException(status_code=422, detail=f"callback_url {error_msg}")
+    
+    store = require_job_store()
+    job = await run_in_threadpool(
+        store.create, request.texts, request.callback_url, client_ip(raw_request)
+    )
+    if job_executor is not None:
+        job_executor.notify()
+    request_logger.info("Job %s queued: %d texts", job["id"], job["total"])
+    return job_status(job)
+
+
+@app.get("/jobs", tags=["Monitoring"])
+async def job_stats():
+    """Jobs per status, pending items and executor counters."""
+    if job_executor is None:
+        return {"jobs": (await run_in_threadpool(require_job_store().counts)), "executor": None}
+    return await run_in_threadpool(job_executor.snapshot)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse, tags=["Jobs"])
+async def get_job(job_id: str):
+    """Status and progress of a job."""
+    job = await run_in_threadpool(require_job_store().get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+
+@app.get("/jobs/{job_id}/results", tags=["Jobs"])
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="First text position"),
+    limit: int = Query(100, ge=1, le=1000, description="Texts per page"),
+    response_format: str = Depends(response_format_query)
+):
+    """
+    Page through a job's scored texts in submission order.
+    
+    Results are available as soon as each batch is scored; positions not
+    scored yet are omitted from the page.
+    """
+    store = require_job_store()
+    job = await run_in_threadpool(store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    rows = await run_in_threadpool(store.results, job_id, offset, limit)
+    if response_format == "compact":
+        results = [{"index": position, **compact_result(prediction)} for position, _, prediction in rows]
+    else:
+        timestamp = datetime.utcfromtimestamp(job["finished_at"] or time.time())
+        results = [
+            {"index": position, **full_result(text, prediction, timestamp)} for position, text, prediction in rows
+        ]
+    next_offset = offset + limit if offset + limit < job["total"] else None
+    return ORJSONResponse({
+        "job_id": job_id,
+        "status": job["status"],
+        "total": job["total"],
+        "offset": offset,
+        "next_offset": next_offset,
+        "results": results
+    })
+
+
+def job_status(job: dict) -> JobStatusResponse:
+    """Response model for a stored job, with unix times as datetimes."""
+    times = {
+        key: datetime.utcfromtimestamp(job[key]) if job[key] else None
+        for key in ("created_at", "started_at", "finished_at")
+    }
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        total=job["total"],
+        completed=job["completed"],
+        error=job["error"],
+        callback_status=job["callback_status"],
+        **times
+    )
+
+
+def invalid_text_error(texts: list) -> Optional[str]:
+    """Error for the first text validate_text rejects, or None if all are valid."""
+    for index, text in enumerate(texts):
+        is_valid, error_msg = validate_text(text)
+        if not is_valid:
+            return f"texts[{index}]: {error_msg}"
+    return None
+
+
+def client_ip(raw_request: Request) -> str:
+    return raw_request.client.host if raw_request.client else "unknown"
+
+
+def log_audit(texts: list, predictions: list, ip_address: str):
+    """Queue predictions for the DynamoDB audit log; failures are logged, not raised."""
+    try:
+        writer = get_audit_writer()
+        if writer:
+            writer.submit(texts, predictions, ip_address=ip_address)
+            request_logger.debug("✅ Prediction queued for DynamoDB")
+    except Exception as e:
+        logger.error("❌ Error logging to DynamoDB: %s", e)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+"""
+Response bodies written straight to JSON with orjson.
+
+Endpoints return these as ORJSONResponse, so FastAPI skips building and
+re-validating pydantic models through response_model (which is kept only
+for the OpenAPI schema). Two shapes are available:
+
+- full (default): the ModerationResponse fields, unchanged on the wire
+- compact: scores as a float array in LABELS order plus a flags bitmask
+  (bit i set when LABELS[i] is flagged), without the echoed text and
+  timestamp, for high-volume clients
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi.responses import ORJSONResponse
+
+from src.models.predictor import ToxicityPredictor
+
+LABELS = ToxicityPredictor.LABEL_COLUMNS
+RESPONSE_FORMATS = ("full", "compact")
+ECHO_CHARS = 100  # Echoed text is truncated to this many characters
+
+
+def label_flags(flagged_categories: List[str]) -> int:
+    """Bitmask with bit i set when LABELS[i] is flagged."""
+    flags = 0
+    for i, label in enumerate(LABELS):
+        if label in flagged_categories:
+            flags |= 1 << i
+    return flags
+
+
+def full_result(text: str, prediction: Dict, timestamp: Optional[datetime] = None) -> Dict:
+    """ModerationResponse-shaped dictionary, with the echoed text truncated."""
+    return {
+        "text": text[:ECHO_CHARS] + "..." if len(text) > ECHO_CHARS else text,
+        "is_toxic": prediction['is_toxic'],
+        "toxicity_scores": prediction['toxicity_scores'],
+        "flagged_categories": prediction['flagged_categories'],
+        "confidence": prediction['confidence'],
+        "timestamp": timestamp or datetime.utcnow()
+    }
+
+
+def compact_result(prediction: Dict) -> Dict:
+    """Scores in LABELS order and a flags bitmask."""
+    scores = prediction['toxicity_scores']
+    return {
+        "is_toxic": prediction['is_toxic'],
+        "scores": [scores[label] for label in LABELS],
+        "flags": label_flags(prediction['flagged_categories']),
+        "confidence": prediction['confidence']
+    }
+
+
+def render_result(text: str, prediction: Dict, response_format: str, **extra) -> ORJSONResponse:
+    """One moderation result in the requested format, with extra fields appended."""
+    if response_format == "compact":
+        body = compact_result(prediction)
+    else:
+        body = full_result(text, prediction)
+    body.update(extra)
+    return ORJSONResponse(body)
+
+
+def render_batch(texts: List[str], predictions: List[Dict], response_format: str) -> ORJSONResponse:
+    """Batch results in request order; full results share one timestamp."""
+    if response_format == "compact":
+        results = [compact_result(prediction) for prediction in predictions]
+    else:
+        timestamp = datetime.utcnow()
+        results = [full_result(text, prediction, timestamp) for text, prediction in zip(texts, predictions)]
+    return ORJSONResponse({"results": results})
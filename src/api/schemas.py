@@ -1,7 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime
 
+MAX_BATCH_SIZE = 32  # Texts per /moderate/batch request
+MAX_JOB_SIZE = 10000  # Texts per /jobs submission
+
 
 class ModerationRequest(BaseModel):
     """Request model for content moderation."""
@@ -54,6 +57,74 @@ class ModerationResponse(BaseModel):
         }
 
 
+class BatchModerationRequest(BaseModel):
+    """Request model for moderating several texts in one call."""
+    texts: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE, description="Texts to moderate")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "texts": ["This is a sample comment", "And another one"]
+            }
+        }
+
+
+class BatchModerationResponse(BaseModel):
+    """Response model for batch moderation; results are in request order."""
+    results: List[ModerationResponse]
+
+
+class IncrementalModerationRequest(BaseModel):
+    """Request model for re-moderating a document that may have been edited."""
+    document_id: str = Field(..., min_length=1, max_length=256, description="Stable id of the document")
+    text: str = Field(..., min_length=1, max_length=5000, description="Full current text of the document")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "document_id": "comment-12345",
+                "text": "First sentence. Edited second sentence."
+            }
+        }
+
+
+class IncrementalModerationResponse(ModerationResponse):
+    """Document verdict plus how much of it had to be scored."""
+    document_id: str
+    segments: int
+    segments_scored: int
+    segments_changed: int
+
+
+class JobRequest(BaseModel):
+    """Request model for an asynchronous moderation job."""
+    texts: List[str] = Field(..., min_length=1, max_length=MAX_JOB_SIZE, description="Texts to moderate")
+    callback_url: Optional[str] = Field(
+        None, max_length=2048, pattern=r"^https?://", description="URL that receives a POST when the job finishes"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "texts": ["First comment", "Second comment"],
+                "callback_url": "https://example.com/moderation-done"
+            }
+        }
+
+
+class JobStatusResponse(BaseModel):
+    """Progress of an asynchronous moderation job."""
+    job_id: str
+    status: str
+    total: int
+    completed: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    callback_status: Optional[str] = None
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     status: str
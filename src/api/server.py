@@ -0,0 +1,231 @@
+"""
+Pre-fork multi-worker server.
+
+The parent process loads and freezes the model once, then forks uvicorn
+workers that share the weight pages copy-on-write. CPU threads are split
+across workers so they don't oversubscribe cores.
+
+Usage:
+    python -m src.api.server --workers 4
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict, List
+
+import torch
+import uvicorn
+
+from src.api import main
+from src.utils.logging_config import setup_logging, shutdown_logging
+
+logger = logging.getLogger(__name__)
+
+SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def threads_per_worker(workers: int, cpus: int = None) -> int:
+    """Intra-op threads per worker so that workers * threads <= cpus."""
+    cpus = cpus or os.cpu_count() or 1
+    return max(1, cpus // workers)
+
+
+def parse_smaps_rollup(text: str) -> Dict[str, int]:
+    """
+    Parse /proc/<pid>/smaps_rollup.
+
+    Returns:
+        Values in kB for the fields in SMAPS_FIELDS
+    """
+    values = {}
+    for line in text.splitlines():
+        name, _, rest = line.partition(":")
+        if name in SMAPS_FIELDS:
+            values[name] = int(rest.split()[0])
+    return values
+
+
+def process_memory(pid: int) -> Dict[str, float]:
+    """
+    Resident, proportional, shared and private memory of a process in MB.
+
+    Uses smaps_rollup where available and falls back to statm.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            kb = parse_smaps_rollup(f.read())
+        return {
+            "rss_mb": round(kb.get("Rss", 0) / 1024, 1),
+            "pss_mb": round(kb.get("Pss", 0) / 1024, 1),
+            "shared_mb": round((kb.get("Shared_Clean", 0) + kb.get("Shared_Dirty", 0)) / 1024, 1),
+            "private_mb": round((kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)) / 1024, 1)
+        }
+    except FileNotFoundError:
+        page_mb = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        with open(f"/proc/{pid}/statm") as f:
+            _, resident, shared = (int(v) for v in f.read().split()[:3])
+        return {
+            "rss_mb": round(resident * page_mb, 1),
+            "pss_mb": None,
+            "shared_mb": round(shared * page_mb, 1),
+            "private_mb": round((resident - shared) * page_mb, 1)
+        }
+
+
+def memory_report(pids: List[int]) -> Dict:
+    """Per-process memory plus totals; PSS total is the real footprint."""
+    processes = {}
+    for pid in pids:
+        try:
+            processes[pid] = process_memory(pid)
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return {
+        "processes": processes,
+        "total_rss_mb": round(sum(p["rss_mb"] for p in processes.values()), 1),
+        "total_pss_mb": round(sum(p["pss_mb"] or 0 for p in processes.values()), 1)
+    }
+
+
+def freeze_model(model):
+    """Put a model in inference mode so workers never write to its weights."""
+    model.eval()
+    for param in model.parameters():
+        param.requires_grad_(False)
+
+
+def preload_and_freeze():
+    """Load the model (and any shadow candidate) in the parent and make their pages safe to share."""
+    # Keep the parent single-threaded so no OpenMP pool exists at fork time
+    torch.set_num_threads(1)
+    main.load_predictor()
+    freeze_model(main.model_loader.get_model())
+
+    # Without this every worker would load its own copy of the candidate
+    main.load_shadow_scorer()
+    if main.shadow_scorer is not None:
+        freeze_model(main.shadow_scorer.candidate.model)
+
+    # Move everything allocated so far out of the GC's reach, so that
+    # collections in the workers don't write to (and copy) shared pages
+    gc.collect()
+    gc.freeze()
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Create the listening socket shared by all workers."""
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, threads: int):
+    """Body of a forked worker process; never returns."""
+    setup_logging()
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Already initialized
+
+    logger.info("👷 Worker %d started with %d threads", os.getpid(), threads)
+    config = uvicorn.Config(main.app, log_config=None, timeout_graceful_shutdown=10)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    os._exit(0)
+
+
+def spawn_worker(sock: socket.socket, threads: int) -> int:
+    """Fork a worker process and return its pid."""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(sock, threads)
+        finally:
+            os._exit(1)
+    return pid
+
+
+def serve(host: str, port: int, workers: int, threads: int = None, report_interval: float = 60.0):
+    """
+    Preload the model, fork workers and supervise them until signalled.
+
+    Args:
+        host: Bind address
+        port: Bind port
+        workers: Number of worker processes
+        threads: Intra-op threads per worker (defaults to cpus // workers)
+        report_interval: Seconds between memory reports (0 disables)
+    """
+    threads = threads or threads_per_worker(workers)
+    preload_and_freeze()
+    sock = bind_socket(host, port)
+    logger.info("🚀 Pre-fork server on %s:%d: %d workers x %d threads", host, port, workers, threads)
+
+    # The logging listener thread doesn't survive fork; restart it on both sides
+    shutdown_logging()
+    children = {spawn_worker(sock, threads) for _ in range(workers)}
+    setup_logging()
+
+    stopping = False
+
+    def handle_signal(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    next_report = time.monotonic() + min(report_interval, 10) if report_interval else None
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            children.discard(pid)
+            if not stopping:
+                logger.warning("⚠️  Worker %d exited (status %d), restarting", pid, status)
+                shutdown_logging()
+                children.add(spawn_worker(sock, threads))
+                setup_logging()
+            continue
+
+        if next_report and time.monotonic() >= next_report:
+            report = memory_report([os.getpid(), *sorted(children)])
+            logger.info("📊 Worker memory", extra={"memory": report})
+            next_report = time.monotonic() + report_interval
+        time.sleep(0.5)
+
+    sock.close()
+    logger.info("Shutting down pre-fork server")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Pre-fork multi-worker moderation server")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    parser.add_argument("--threads", type=int, default=int(os.getenv("TORCH_THREADS", "0")) or None,
+                        help="Torch threads per worker (default: cpus // workers)")
+    parser.add_argument("--report-interval", type=float,
+                        default=float(os.getenv("WORKER_MEMORY_REPORT_SECONDS", "60")))
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.threads, args.report_interval)
+
+
+if __name__ == "__main__":
+    main_cli()
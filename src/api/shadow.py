@@ -0,0 +1,302 @@
+"""
+Off-path shadow scoring of a candidate model.
+
+A sampled fraction of moderated texts is offered to a bounded queue once
+the primary response has been sent. A worker on the event loop scores
+the queue in batches with the candidate model, the same way the job
+executor does. It only starts a batch when the admission controller is
+idle, and runs it under a bulk-lane slot. Per-label score differences
+and flag disagreements are accumulated in fixed-size arrays. Whenever
+the queue is full or the service is busy, work is dropped and counted.
+Disagreement examples keep only a hash and the length of the text, never
+the text itself, since GET /shadow is unauthenticated.
+
+A candidate forward pass can't be interrupted once started. An
+interactive request that arrives during one competes with it for CPU,
+and waits for it if it needs the slot. Batches are therefore kept small:
+the worst case is one forward pass over SHADOW_BATCH_SIZE texts.
+snapshot() reports its duration as max_forward_ms.
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from src.api.admission import AdmissionRejected
+from src.models.predictor import ToxicityPredictor
+
+logger = logging.getLogger(__name__)
+
+DIFF_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5)  # Upper edges of |candidate - primary| histogram buckets
+
+
+class ShadowSummary:
+    """Running per-label score differences and flag disagreements."""
+
+    def __init__(
+        self,
+        labels: List[str] = None,
+        threshold: float = ToxicityPredictor.THRESHOLD,
+        max_examples: int = 20
+    ):
+        """
+        Initialize accumulators.
+
+        Args:
+            labels: Label names in score order
+            threshold: Probability threshold used to compare flags
+            max_examples: Recent disagreements kept for inspection
+        """
+        self.labels = list(labels or ToxicityPredictor.LABEL_COLUMNS)
+        self.threshold = threshold
+        n = len(self.labels)
+
+        self.count = 0
+        self.toxic_disagreements = 0
+        self._diff_sum = np.zeros(n, dtype=np.float64)
+        self._abs_sum = np.zeros(n, dtype=np.float64)
+        self._abs_max = np.zeros(n, dtype=np.float64)
+        self._primary_only = np.zeros(n, dtype=np.int64)
+        self._candidate_only = np.zeros(n, dtype=np.int64)
+        self._histogram = np.zeros((n, len(DIFF_BUCKETS) + 1), dtype=np.int64)
+        self._examples = deque(maxlen=max_examples)
+        self._lock = threading.Lock()
+
+    def record(self, texts: Sequence[str], primary: np.ndarray, candidate: np.ndarray):
+        """
+        Add a scored batch.
+
+        Args:
+            texts: Texts that were scored (hashed for disagreement examples)
+            primary: Primary model scores [batch, labels]
+            candidate: Candidate model scores [batch, labels]
+        """
+        diff = candidate - primary
+        abs_diff = np.abs(diff)
+        primary_flags = primary > self.threshold
+        candidate_flags = candidate > self.threshold
+        disagree = primary_flags != candidate_flags
+        toxic_disagree = primary_flags.any(axis=1) != candidate_flags.any(axis=1)
+        buckets = np.searchsorted(DIFF_BUCKETS, abs_diff)
+
+        with self._lock:
+            self.count += len(texts)
+            self.toxic_disagreements += int(toxic_disagree.sum())
+            self._diff_sum += diff.sum(axis=0)
+            self._abs_sum += abs_diff.sum(axis=0)
+            np.maximum(self._abs_max, abs_diff.max(axis=0), out=self._abs_max)
+            self._primary_only += (primary_flags & ~candidate_flags).sum(axis=0)
+            self._candidate_only += (candidate_flags & ~primary_flags).sum(axis=0)
+            for j in range(len(self.labels)):
+                self._histogram[j] += np.bincount(buckets[:, j], minlength=len(DIFF_BUCKETS) + 1)
+            for i in np.flatnonzero(disagree.any(axis=1)):
+                self._examples.append({
+                    "text_hash": hashlib.blake2b(texts[i].encode("utf-8"), digest_size=8).hexdigest(),
+                    "text_length": len(texts[i]),
+                    "labels": [label for label, flag in zip(self.labels, disagree[i]) if flag],
+                    "primary": [round(float(s), 4) for s in primary[i]],
+                    "candidate": [round(float(s), 4) for s in candidate[i]],
+                    "timestamp": time.time()
+                })
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            count = max(self.count, 1)
+            per_label = {
+                label: {
+                    "mean_diff": round(float(self._diff_sum[j] / count), 6),
+                    "mean_abs_diff": round(float(self._abs_sum[j] / count), 6),
+                    "max_abs_diff": round(float(self._abs_max[j]), 6),
+                    "flagged_by_primary_only": int(self._primary_only[j]),
+                    "flagged_by_candidate_only": int(self._candidate_only[j]),
+                    "disagreement_rate": round(float((self._primary_only[j] + self._candidate_only[j]) / count), 6),
+                    "abs_diff_histogram": dict(zip(
+                        [f"<={edge}" for edge in DIFF_BUCKETS] + [f">{DIFF_BUCKETS[-1]}"],
+                        self._histogram[j].tolist()
+                    ))
+                }
+                for j, label in enumerate(self.labels)
+            }
+            return {
+                "scored": self.count,
+                "is_toxic_disagreements": self.toxic_disagreements,
+                "is_toxic_disagreement_rate": round(self.toxic_disagreements / count, 6),
+                "labels": per_label,
+                "recent_disagreements": list(self._examples)
+            }
+
+
+class ShadowScorer:
+    """Samples live traffic into a bounded queue and scores it with a candidate model."""
+
+    def __init__(
+        self,
+        candidate,
+        admission,
+        sample_rate: float = 0.05,
+        max_queue: int = 1000,
+        batch_size: int = 4,
+        flush_interval: float = 1.0,
+        idle_wait: float = 0.05,
+        summary: Optional[ShadowSummary] = None
+    ):
+        """
+        Initialize scorer.
+
+        Args:
+            candidate: Predictor for the candidate model
+            admission: AdmissionController shared with interactive traffic
+            sample_rate: Fraction of moderated texts to shadow score
+            max_queue: Queued texts beyond which new samples are dropped
+            batch_size: Texts per candidate forward pass; bounds how long interactive work can wait on one
+            flush_interval: Seconds to wait for a full batch before scoring a partial one
+            idle_wait: Seconds to back off while interactive work is running
+            summary: Accumulator for the comparison (created if omitted)
+        """
+        self.candidate = candidate
+        self.admission = admission
+        self.sample_rate = sample_rate
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.idle_wait = idle_wait
+        self.summary = summary or ShadowSummary()
+        self._queue = deque()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        # Counters
+        self.offered = 0
+        self.sampled = 0
+        self.batches = 0
+        self.deferred = 0
+        self.failures = 0
+        self.forward_seconds = 0.0
+        self.max_forward_seconds = 0.0
+        self.dropped = {"queue_full": 0, "preempted": 0, "error": 0}
+
+    async def offer(self, texts: Sequence[str], predictions: Sequence[Dict]):
+        """
+        Sample primary results into the queue; never blocks.
+        A coroutine so it runs on the event loop (as a response background task)
+        rather than hopping to the threadpool.
+
+        Args:
+            texts: Cleaned texts as the primary model saw them
+            predictions: Primary predictions, in order
+        """
+        labels = self.summary.labels
+        for text, prediction in zip(texts, predictions):
+            self.offered += 1
+            if random.random() >= self.sample_rate:
+                continue
+            self.sampled += 1
+            if len(self._queue) >= self.max_queue:
+                self.dropped["queue_full"] += 1
+                continue
+            self._queue.append((text, [prediction['toxicity_scores'][label] for label in labels]))
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def step(self) -> bool:
+        """
+        Score one batch from the queue if the service is idle.
+
+        Returns:
+            True if a batch was taken off the queue
+        """
+        if not self._queue:
+            return False
+        if not self.admission.is_idle():
+            self.deferred += 1
+            return False
+
+        batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+        texts = [text for text, _ in batch]
+        try:
+            async with self.admission.slot("bulk", time.monotonic() + self.idle_wait):
+                start = time.perf_counter()
+                predictions = await run_in_threadpool(self.candidate.predict_batch, texts)
+                elapsed = time.perf_counter() - start
+        except AdmissionRejected:
+            # Interactive requests took the capacity; the sample is not worth delaying them
+            self.dropped["preempted"] += len(batch)
+            return False
+        except Exception as e:
+            self.failures += 1
+            self.dropped["error"] += len(batch)
+            logger.error("❌ Shadow scoring failed: %s", e)
+            return True
+
+        labels = self.summary.labels
+        primary = np.array([scores for _, scores in batch], dtype=np.float64)
+        candidate = np.array(
+            [[prediction['toxicity_scores'][label] for label in labels] for prediction in predictions],
+            dtype=np.float64
+        )
+        self.summary.record(texts, primary, candidate)
+        self.batches += 1
+        self.forward_seconds += elapsed
+        self.max_forward_seconds = max(self.max_forward_seconds, elapsed)
+        return True
+
+    async def run(self):
+        """Score queued samples until cancelled."""
+        logger.info("🚀 Shadow scorer started (sample rate %.3f)", self.sample_rate)
+        while True:
+            try:
+                if await self.step():
+                    await asyncio.sleep(0)  # Let interactive requests reach admission first
+                elif self._queue and not self.admission.is_idle():
+                    await asyncio.sleep(self.idle_wait)
+                else:
+                    await self._sleep(self.flush_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error in shadow scorer: %s", e)
+                await asyncio.sleep(self.flush_interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> Dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "offered": self.offered,
+            "sampled": self.sampled,
+            "queued": len(self._queue),
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+            "mean_forward_ms": round(1000 * self.forward_seconds / self.batches, 2) if self.batches else None,
+            "max_forward_ms": round(1000 * self.max_forward_seconds, 2),
+            "deferred": self.deferred,
+            "failures": self.failures,
+            "dropped": dict(self.dropped),
+            "summary": self.summary.snapshot()
+        }
@@ -0,0 +1,132 @@
+"""
+Rolling in-memory moderation statistics.
+Recent predictions are kept in fixed-size numpy ring buffers so memory
+stays constant regardless of traffic, and window aggregates are computed
+with vectorized operations.
+"""
+
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Sequence
+
+from src.models.predictor import ToxicityPredictor
+
+DEFAULT_WINDOWS = (60, 300, 3600)  # Seconds
+
+
+class PredictionStats:
+    """Array-backed ring buffer of recent prediction scores and latencies."""
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        labels: List[str] = None,
+        threshold: float = ToxicityPredictor.THRESHOLD
+    ):
+        """
+        Initialize ring buffer.
+
+        Args:
+            capacity: Maximum number of predictions retained
+            labels: Label names in score order
+            threshold: Probability threshold used to count flags
+        """
+        self.capacity = capacity
+        self.labels = list(labels or ToxicityPredictor.LABEL_COLUMNS)
+        self.threshold = threshold
+
+        self._scores = np.zeros((capacity, len(self.labels)), dtype=np.float32)
+        self._latency = np.zeros(capacity, dtype=np.float32)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def record(self, scores: Sequence[float], latency: float, timestamp: float = None):
+        """
+        Add one prediction, overwriting the oldest entry when full.
+
+        Args:
+            scores: Label probabilities in label order
+            latency: Request latency in seconds
+            timestamp: Unix time of the prediction (defaults to now)
+        """
+        with self._lock:
+            i = self._next
+            self._scores[i] = scores
+            self._latency[i] = latency
+            self._timestamps[i] = time.time() if timestamp is None else timestamp
+            self._next = (i + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            self._total += 1
+
+    def window(self, seconds: float, now: float = None) -> Dict:
+        """
+        Aggregate predictions recorded within the last `seconds`.
+
+        When traffic outruns the buffer, entries inside the window have
+        already been overwritten. The aggregates then cover only the span
+        back to the oldest retained entry: `truncated` is set, and rates
+        are divided by `covered_seconds` rather than the full window.
+
+        Args:
+            seconds: Window length in seconds
+            now: Reference Unix time (defaults to now)
+
+        Returns:
+            Dictionary with rates, percentiles, per-category flag counts and the covered span
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            size = self._size
+            timestamps = self._timestamps[:size]
+            mask = timestamps >= now - seconds
+            scores = self._scores[:size][mask]
+            latency = self._latency[:size][mask]
+            overwritten = self._total > size
+            oldest = float(timestamps.min()) if size else now
+
+        truncated = overwritten and oldest > now - seconds
+        covered = max(now - oldest, 1e-3) if truncated else seconds
+
+        count = len(scores)
+        if count == 0:
+            return {"count": 0, "requests_per_second": 0.0, "covered_seconds": seconds, "truncated": False}
+
+        flags = scores > self.threshold
+        confidence = scores.max(axis=1)
+        conf_pcts = np.percentile(confidence, [50, 90, 99])
+        lat_pcts = np.percentile(latency, [50, 95, 99]) * 1000
+
+        return {
+            "count": count,
+            "requests_per_second": round(count / covered, 3),
+            "covered_seconds": round(covered, 3),
+            "truncated": truncated,
+            "toxic_rate": round(float(flags.any(axis=1).mean()), 4),
+            "flag_counts": dict(zip(self.labels, flags.sum(axis=0).tolist())),
+            "mean_scores": dict(zip(self.labels, np.round(scores.mean(axis=0), 4).tolist())),
+            "confidence": {
+                "p50": round(float(conf_pcts[0]), 4),
+                "p90": round(float(conf_pcts[1]), 4),
+                "p99": round(float(conf_pcts[2]), 4)
+            },
+            "latency_ms": {
+                "p50": round(float(lat_pcts[0]), 3),
+                "p95": round(float(lat_pcts[1]), 3),
+                "p99": round(float(lat_pcts[2]), 3),
+                "max": round(float(latency.max()) * 1000, 3)
+            }
+        }
+
+    def snapshot(self, windows: Sequence[float] = DEFAULT_WINDOWS) -> Dict:
+        """Aggregates for several windows plus buffer occupancy."""
+        now = time.time()
+        return {
+            "capacity": self.capacity,
+            "buffered": self._size,
+            "total_recorded": self._total,
+            "windows": {str(int(w)): self.window(w, now) for w in windows}
+        }
@@ -0,0 +1,10 @@
+"""
+Audit Package
+
+Time-bucketed DynamoDB audit log of predictions and pre-aggregated rollups.
+"""
+
+from src.audit.writer import AuditWriter
+from src.audit.query import AuditQuery
+
+__all__ = ["AuditWriter", "AuditQuery"]
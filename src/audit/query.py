@@ -0,0 +1,147 @@
+"""
+Queries over the audit table.
+Time-range lookups hit only the hour buckets they cover, and aggregate
+questions are answered from rollup items instead of scanning predictions.
+"""
+
+from decimal import Decimal
+from typing import Dict, Iterator, List
+from boto3.dynamodb.conditions import Key, Attr
+
+from src.audit import schema
+
+
+def _to_number(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+def _plain(item: Dict) -> Dict:
+    return {k: _to_number(v) for k, v in item.items()}
+
+
+class AuditQuery:
+    """Answers common audit questions against the bucketed table layout."""
+
+    def __init__(self, table, shards: int = 4):
+        """
+        Initialize query helper.
+
+        Args:
+            table: boto3 DynamoDB Table resource
+            shards: Number of shards per hour bucket (must match the writer)
+        """
+        self.table = table
+        self.shards = shards
+
+    def _query(self, **kwargs) -> Iterator[Dict]:
+        while True:
+            response = self.table.query(**kwargs)
+            yield from response.get('Items', [])
+            if 'LastEvaluatedKey' not in response:
+                return
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def predictions_between(self, start: float, end: float, min_toxicity: float = None) -> List[Dict]:
+        """
+        Predictions recorded in [start, end], optionally above a toxicity score.
+
+        Args:
+            start: Range start (Unix time)
+            end: Range end (Unix time)
+            min_toxicity: Only return items whose max label score is at least this
+
+        Returns:
+            Prediction items sorted by time
+        """
+        low, high = schema.time_range_keys(start, end)
+        items = []
+        for hour in schema.hours_between(start, end):
+            for shard in range(self.shards):
+                bucket = schema.prediction_partition(hour, shard)
+                if min_toxicity is None:
+                    items.extend(self._query(
+                        KeyConditionExpression=Key('bucket').eq(bucket) & Key('sk').between(low, high)
+                    ))
+                else:
+                    items.extend(self._query(
+                        IndexName=schema.TOXICITY_INDEX,
+                        KeyConditionExpression=Key('bucket').eq(bucket) & Key('toxicity').gte(Decimal(str(min_toxicity))),
+                        FilterExpression=Attr('sk').between(low, high)
+                    ))
+        items.sort(key=lambda item: item['sk'])
+        return [_plain(item) for item in items]
+
+    def rollups_between(self, start: float, end: float, category: str = None) -> List[Dict]:
+        """
+        Hourly rollup items overlapping [start, end].
+
+        Args:
+            start: Range start (Unix time)
+            end: Range end (Unix time)
+            category: Restrict to one label, or schema.ALL_CATEGORIES for totals
+
+        Returns:
+            Rollup items with 'hour' and 'category' fields added
+        """
+        first_hour, last_hour = schema.hour_bucket(start), schema.hour_bucket(end)
+        rollups = []
+        for day in schema.days_between(start, end):
+            items = self._query(
+                KeyConditionExpression=Key('bucket').eq(schema.rollup_partition(day)) &
+                Key('sk').between(f"{first_hour}#", f"{last_hour}#\uffff")
+            )
+            for item in items:
+                hour, cat = item['sk'].split('#', 1)
+                if category is not None and cat != category:
+                    continue
+                rollup = _plain(item)
+                rollup['hour'] = hour
+                rollup['category'] = cat
+                rollups.append(rollup)
+        return rollups
+
+    def flag_rates(self, start: float, end: float, per: str = "day") -> Dict[str, Dict[str, float]]:
+        """
+        Flag rate per category, grouped by day or hour.
+
+        Args:
+            start: Range start (Unix time)
+            end: Range end (Unix time)
+            per: "day" or "hour"
+
+        Returns:
+            {period: {category: flagged / count}}; "_all" is the toxic rate
+        """
+        totals: Dict[str, Dict[str, List[int]]] = {}
+        for rollup in self.rollups_between(start, end):
+            period = rollup['hour'][:10] if per == "day" else rollup['hour']
+            counts = totals.setdefault(period, {}).setdefault(rollup['category'], [0, 0])
+            counts[0] += rollup.get('flagged', 0)
+            counts[1] += rollup.get('count', 0)
+        return {
+            period: {
+                cat: round(flagged / count, 4) if count else 0.0
+                for cat, (flagged, count) in sorted(cats.items())
+            }
+            for period, cats in sorted(totals.items())
+        }
+
+    def score_histogram(self, category: str, start: float, end: float) -> List[int]:
+        """
+        Score histogram for a category over [start, end], from rollups.
+
+        Args:
+            category: Label name
+            start: Range start (Unix time)
+            end: Range end (Unix time)
+
+        Returns:
+            Counts per bin of width 1 / schema.HISTOGRAM_BINS
+        """
+        histogram = [0] * schema.HISTOGRAM_BINS
+        for rollup in self.rollups_between(start, end, category=category):
+            for i in range(schema.HISTOGRAM_BINS):
+                histogram[i] += rollup.get(f"h{i}", 0)
+        return histogram
@@ -0,0 +1,129 @@
+"""
+Key layout for the audit table.
+
+Prediction items:
+    bucket    = "P#<YYYY-MM-DDTHH>#<shard>"   (hour bucket, spread over shards)
+    sk        = "<epoch_ms:013d>#<prediction_id>"  (range queries on time)
+    toxicity  = max label score, sort key of the by_toxicity LSI
+
+Rollup items:
+    bucket    = "R#<YYYY-MM-DD>"
+    sk        = "<YYYY-MM-DDTHH>#<category>"   (category "_all" for totals)
+    count, flagged, score_sum, h0..h9 (score histogram)
+"""
+
+import zlib
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+PREDICTION_PREFIX = "P"
+ROLLUP_PREFIX = "R"
+TOXICITY_INDEX = "by_toxicity"
+ALL_CATEGORIES = "_all"
+HISTOGRAM_BINS = 10
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+def hour_bucket(ts: float) -> str:
+    """UTC hour bucket label for a Unix timestamp."""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H")
+
+
+def day_bucket(ts: float) -> str:
+    """UTC day bucket label for a Unix timestamp."""
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def shard_for(prediction_id: str, shards: int) -> int:
+    """Stable shard number for a prediction id."""
+    return zlib.crc32(prediction_id.encode("utf-8")) % shards
+
+
+def prediction_partition(ts: float, shard: int) -> str:
+    """Partition key of a prediction item."""
+    return f"{PREDICTION_PREFIX}#{hour_bucket(ts)}#{shard}"
+
+
+def prediction_sort_key(ts: float, prediction_id: str) -> str:
+    """Sort key of a prediction item; sorts by time."""
+    return f"{int(ts * 1000):013d}#{prediction_id}"
+
+
+def time_range_keys(start: float, end: float) -> Tuple[str, str]:
+    """Inclusive sort key bounds covering [start, end]."""
+    return f"{int(start * 1000):013d}", f"{int(end * 1000):013d}#\uffff"
+
+
+def rollup_partition(ts: float) -> str:
+    """Partition key of the rollup items for a day."""
+    return f"{ROLLUP_PREFIX}#{day_bucket(ts)}"
+
+
+def rollup_sort_key(ts: float, category: str) -> str:
+    """Sort key of a rollup item for an hour and category."""
+    return f"{hour_bucket(ts)}#{category}"
+
+
+def histogram_bin(score: float) -> int:
+    """Histogram bin index for a probability score."""
+    return min(max(int(score * HISTOGRAM_BINS), 0), HISTOGRAM_BINS - 1)
+
+
+def hours_between(start: float, end: float) -> List[float]:
+    """Start timestamps of every UTC hour overlapping [start, end]."""
+    hour = int(start // HOUR) * HOUR
+    hours = []
+    while hour <= end:
+        hours.append(float(hour))
+        hour += HOUR
+    return hours
+
+
+def days_between(start: float, end: float) -> List[float]:
+    """Start timestamps of every UTC day overlapping [start, end]."""
+    day = int(start // DAY) * DAY
+    days = []
+    while day <= end:
+        days.append(float(day))
+        day += DAY
+    return days
+
+
+def create_table(dynamodb, table_name: str):
+    """
+    Create the audit table with the same layout as terraform/dynamodb.tf.
+    Used against local DynamoDB stand-ins.
+
+    Args:
+        dynamodb: boto3 DynamoDB service resource
+        table_name: Name of the table to create
+
+    Returns:
+        boto3 Table resource
+    """
+    table = dynamodb.create_table(
+        TableName=table_name,
+        BillingMode="PAY_PER_REQUEST",
+        KeySchema=[
+            {"AttributeName": "bucket", "KeyType": "HASH"},
+            {"AttributeName": "sk", "KeyType": "RANGE"}
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "bucket", "AttributeType": "S"},
+            {"AttributeName": "sk", "AttributeType": "S"},
+            {"AttributeName": "toxicity", "AttributeType": "N"}
+        ],
+        LocalSecondaryIndexes=[
+            {
+                "IndexName": TOXICITY_INDEX,
+                "KeySchema": [
+                    {"AttributeName": "bucket", "KeyType": "HASH"},
+                    {"AttributeName": "toxicity", "KeyType": "RANGE"}
+                ],
+                "Projection": {"ProjectionType": "ALL"}
+            }
+        ]
+    )
+    table.wait_until_exists()
+    return table
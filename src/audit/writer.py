@@ -0,0 +1,302 @@
+"""
+Audit log writer.
+Writes one time-bucketed item per prediction and accumulates per-hour,
+per-category rollups in memory, flushing them with atomic counter updates.
+
+Request handlers call submit(), which only enqueues. A background thread
+writes the queued items in batches (batch_write_item) and flushes the
+rollups every flush_interval seconds, whether or not traffic arrives.
+Counts from a failed rollup update are put back and retried on the next flush.
+"""
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Sequence
+
+from src.audit import schema
+
+logger = logging.getLogger(__name__)
+
+
+def _new_rollup() -> Dict:
+    return {"count": 0, "flagged": 0, "score_sum": 0.0, "hist": [0] * schema.HISTOGRAM_BINS}
+
+
+class AuditWriter:
+    """Writes prediction items and periodic rollups to the audit table."""
+
+    def __init__(
+        self,
+        table,
+        shards: int = 4,
+        threshold: float = 0.5,
+        flush_interval: float = 60.0,
+        ttl_days: int = 30,
+        max_queue: int = 10000,
+        batch_size: int = 100
+    ):
+        """
+        Initialize audit writer.
+
+        Args:
+            table: boto3 DynamoDB Table resource
+            shards: Number of partitions each hour bucket is spread over
+            threshold: Probability threshold used to count flags
+            flush_interval: Seconds between rollup flushes
+            ttl_days: Days before prediction items expire (0 disables TTL)
+            max_queue: Predictions waiting to be written before submit() drops new ones
+            batch_size: Predictions written per batch by the background thread
+        """
+        self.table = table
+        self.shards = shards
+        self.threshold = threshold
+        self.flush_interval = flush_interval
+        self.ttl_days = ttl_days
+        self.batch_size = batch_size
+
+        self._rollups: Dict[tuple, Dict] = defaultdict(_new_rollup)
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._unwritten = 0  # Submitted predictions not yet written
+        self._idle = threading.Condition()
+        self._thread = None
+        self.dropped = 0
+        self.write_errors = 0
+
+    def build_item(self, text: str, prediction: Dict, ip_address: str = "unknown", timestamp: float = None) -> Dict:
+        """
+        Build the table item for one prediction.
+
+        Args:
+            text: Original request text (first 200 characters are stored)
+            prediction: Prediction dictionary from ToxicityPredictor
+            ip_address: Client address
+            timestamp: Unix time of the prediction (defaults to now)
+
+        Returns:
+            The item to write
+        """
+        ts = time.time() if timestamp is None else timestamp
+        prediction_id = str(uuid.uuid4())
+        scores = prediction['toxicity_scores']
+
+        item = {
+            'bucket': schema.prediction_partition(ts, schema.shard_for(prediction_id, self.shards)),
+            'sk': schema.prediction_sort_key(ts, prediction_id),
+            'prediction_id': prediction_id,
+            'timestamp': Decimal(str(ts)),
+            'toxicity': Decimal(str(round(max(scores.values()), 6))),
+            'text_snippet': text[:200],
+            'is_toxic': prediction['is_toxic'],
+            'confidence': Decimal(str(prediction['confidence'])),
+            'flagged_categories': prediction['flagged_categories'],
+            'ip_address': ip_address
+        }
+        for cat, score in scores.items():
+            item[f"score_{cat}"] = Decimal(str(score))
+        if self.ttl_days:
+            item['ttl'] = int(ts) + self.ttl_days * schema.DAY
+        return item
+
+    def submit(
+        self,
+        texts: Sequence[str],
+        predictions: Sequence[Dict],
+        ip_address: str = "unknown",
+        timestamp: float = None
+    ) -> int:
+        """
+        Queue predictions for the background thread; never blocks.
+
+        Args:
+            texts: Original request texts
+            predictions: Predictions, in order
+            ip_address: Client address
+            timestamp: Unix time of the predictions (defaults to now)
+
+        Returns:
+            Number of predictions dropped because the queue was full
+        """
+        self.start()
+        ts = time.time() if timestamp is None else timestamp
+        dropped = 0
+        for text, prediction in zip(texts, predictions):
+            with self._idle:
+                self._unwritten += 1
+            try:
+                self._queue.put_nowait((text, prediction, ip_address, ts))
+            except queue.Full:
+                self._done(1)
+                dropped += 1
+        if dropped:
+            self.dropped += dropped
+            logger.warning("⚠️ Audit queue full; dropped %d predictions", dropped)
+        return dropped
+
+    def write_batch(self, records: Sequence[tuple]):
+        """
+        Write (text, prediction, ip_address, timestamp) records with batch_write_item.
+
+        Args:
+            records: Predictions to write
+        """
+        items = [self.build_item(*record) for record in records]
+        with self.table.batch_writer() as batch:
+            for item in items:
+                batch.put_item(Item=item)
+        for (_, prediction, _, ts) in records:
+            self.add_to_rollups(prediction['toxicity_scores'], prediction['is_toxic'], ts)
+
+    def start(self):
+        """Start the background writer thread if it is not running."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            timeout = max(self.flush_interval - (time.monotonic() - self._last_flush), 0.05)
+            try:
+                records = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                records = []
+            while records and len(records) < self.batch_size:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in records  # Sentinel from close()
+            records = [record for record in records if record is not None]
+
+            if records:
+                try:
+                    self.write_batch(records)
+                except Exception as e:
+                    self.write_errors += 1
+                    logger.error("❌ Failed to write %d audit items: %s", len(records), e)
+            try:
+                self.flush_if_due()
+            except Exception as e:
+                logger.error("❌ Failed to flush audit rollups: %s", e)
+            if records:
+                self._done(len(records))
+            if stop:
+                return
+
+    def _done(self, n: int):
+        with self._idle:
+            self._unwritten -= n
+            if self._unwritten <= 0:
+                self._idle.notify_all()
+
+    def drain(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until every submitted prediction has been written.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            True if nothing is left unwritten
+        """
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._unwritten > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """Write queued predictions, flush rollups and stop the background thread."""
+        self.drain(timeout)
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush_rollups()
+
+    def add_to_rollups(self, scores: Dict[str, float], is_toxic: bool, timestamp: float):
+        """
+        Accumulate one prediction into the in-memory rollups.
+
+        Args:
+            scores: Label probabilities keyed by label
+            is_toxic: Whether any label was flagged
+            timestamp: Unix time of the prediction
+        """
+        with self._lock:
+            total = self._rollups[(schema.rollup_partition(timestamp), schema.rollup_sort_key(timestamp, schema.ALL_CATEGORIES))]
+            total["count"] += 1
+            total["flagged"] += int(is_toxic)
+            for cat, score in scores.items():
+                rollup = self._rollups[(schema.rollup_partition(timestamp), schema.rollup_sort_key(timestamp, cat))]
+                rollup["count"] += 1
+                rollup["flagged"] += int(score > self.threshold)
+                rollup["score_sum"] += score
+                rollup["hist"][schema.histogram_bin(score)] += 1
+
+    def flush_if_due(self) -> int:
+        """Flush rollups if flush_interval has passed since the last flush."""
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            return self.flush_rollups()
+        return 0
+
+    def flush_rollups(self) -> int:
+        """
+        Write pending rollups with atomic ADD updates.
+        Rollups whose update fails are merged back and retried on the next flush.
+
+        Returns:
+            Number of rollup items updated
+        """
+        with self._lock:
+            pending, self._rollups = self._rollups, defaultdict(_new_rollup)
+            self._last_flush = time.monotonic()
+
+        written = 0
+        for (bucket, sk), rollup in pending.items():
+            names, values, adds = {}, {}, []
+            for i, (attr, value) in enumerate(self._rollup_attributes(rollup)):
+                names[f"#a{i}"] = attr
+                values[f":v{i}"] = value
+                adds.append(f"#a{i} :v{i}")
+            try:
+                self.table.update_item(
+                    Key={'bucket': bucket, 'sk': sk},
+                    UpdateExpression="ADD " + ", ".join(adds),
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=values
+                )
+                written += 1
+            except Exception as e:
+                logger.error("❌ Failed to write rollup %s/%s: %s", bucket, sk, e)
+                self._requeue((bucket, sk), rollup)
+
+        return written
+
+    def _requeue(self, key: tuple, rollup: Dict):
+        with self._lock:
+            target = self._rollups[key]
+            target["count"] += rollup["count"]
+            target["flagged"] += rollup["flagged"]
+            target["score_sum"] += rollup["score_sum"]
+            target["hist"] = [a + b for a, b in zip(target["hist"], rollup["hist"])]
+
+    @staticmethod
+    def _rollup_attributes(rollup: Dict) -> List[tuple]:
+        attributes = [("count", rollup["count"]), ("flagged", rollup["flagged"])]
+        if rollup["hist"] != [0] * schema.HISTOGRAM_BINS:
+            attributes.append(("score_sum", Decimal(str(round(rollup["score_sum"], 6)))))
+            attributes.extend(
+                (f"h{i}", n) for i, n in enumerate(rollup["hist"]) if n
+            )
+        return attributes
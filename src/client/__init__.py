@@ -0,0 +1,12 @@
+"""
+Client Package
+
+Python SDK for the moderation API: pooled keep-alive connections,
+automatic client-side batching, bounded retries and latency statistics.
+The open-loop load generator lives in src.client.loadgen.
+"""
+
+from src.client.client import ModerationClient, AsyncModerationClient
+from src.client.retry import ModerationAPIError, RetryPolicy
+
+__all__ = ["ModerationClient", "AsyncModerationClient", "ModerationAPIError", "RetryPolicy"]
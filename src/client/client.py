@@ -0,0 +1,419 @@
+"""
+Sync and asyncio clients for the moderation API.
+
+Both keep a pool of keep-alive connections, buffer individual moderate()
+calls into /moderate/batch requests (flushed when max_batch_size texts are
+waiting or the oldest has waited max_wait seconds), retry throttling and
+server errors with jittered backoff, and record per-call latency.
+
+Usage:
+    with ModerationClient("http://localhost:8000") as client:
+        result = client.moderate("some comment")
+        print(client.stats.snapshot())
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Sequence
+
+import httpx
+
+from src.client.retry import ModerationAPIError, RetryPolicy
+from src.client.stats import LatencyStats
+from src.utils.text_processing import validate_text
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 32  # Server limit per /moderate/batch request (src.api.schemas)
+
+
+def _check_text(text: str):
+    is_valid, error_msg = validate_text(text)
+    if not is_valid:
+        raise ValueError(error_msg)
+
+
+def _error_detail(response: httpx.Response) -> str:
+    try:
+        return str(response.json().get("detail", response.text))
+    except ValueError:
+        return response.text
+
+
+def _batch_results(texts: Sequence[str], body: Dict) -> List[Dict]:
+    # A short or long result list can't be matched back to its texts
+    results = body.get("results", [])
+    if len(results) != len(texts):
+        raise ModerationAPIError(None, f"Server returned {len(results)} results for {len(texts)} texts")
+    return results
+
+
+def _chunks(texts: Sequence[str], size: int) -> List[List[str]]:
+    return [list(texts[start:start + size]) for start in range(0, len(texts), size)]
+
+
+class _ThreadBatcher:
+    """Collects texts from many threads and sends them in batches from a worker pool."""
+
+    def __init__(self, send: Callable[[List[str]], List[Dict]], max_batch_size: int, max_wait: float, max_workers: int):
+        self._send = send
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._pending = []  # (text, future, enqueued_at)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="moderation-send")
+        self._thread = threading.Thread(target=self._run, name="moderation-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Client is closed")
+            self._pending.append((text, future, time.monotonic()))
+            if len(self._pending) == 1 or len(self._pending) >= self._max_batch_size:
+                self._cond.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                deadline = self._pending[0][2] + self._max_wait
+                while len(self._pending) < self._max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._pending[:self._max_batch_size]
+                del self._pending[:self._max_batch_size]
+            self._pool.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch):
+        try:
+            results = self._send([text for text, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def close(self):
+        """Send whatever is pending and wait for in-flight batches."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+
+
+class _AsyncBatcher:
+    """Collects texts on the event loop and sends them in batches as tasks."""
+
+    def __init__(self, send, max_batch_size: int, max_wait: float):
+        self._send = send
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._pending = []  # (text, future)
+        self._timer = None
+        self._tasks = set()
+
+    def submit(self, text: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+        return future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self._max_batch_size]
+            del self._pending[:self._max_batch_size]
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch):
+        try:
+            results = await self._send([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def aclose(self):
+        """Send whatever is pending and wait for in-flight batches."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class ModerationClient:
+    """Thread-safe synchronous client."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        timeout: float = 10.0,
+        max_batch_size: int = 16,
+        max_wait: float = 0.01,
+        retry: RetryPolicy = None,
+        priority: str = "interactive",
+        max_connections: int = 10,
+        http_client: httpx.Client = None
+    ):
+        """
+        Initialize client.
+
+        Args:
+            base_url: API root URL
+            timeout: Per-request timeout in seconds
+            max_batch_size: Texts per batch request (1 disables batching)
+            max_wait: Seconds the first buffered text waits for others
+            retry: Retry policy for 429/5xx and transport errors
+            priority: X-Priority lane (interactive or bulk)
+            max_connections: Pooled keep-alive connections (and concurrent batches)
+            http_client: Pre-built httpx.Client, e.g. a TestClient for in-process use
+        """
+        self.max_batch_size = max(1, min(max_batch_size, MAX_BATCH_SIZE))
+        self.retry = retry or RetryPolicy()
+        self.stats = LatencyStats()
+        # Longest a batched call can legitimately take: buffering, every attempt, every backoff
+        self._wait_timeout = (
+            max_wait + timeout * (self.retry.max_retries + 1) + self.retry.backoff_max * self.retry.max_retries
+        )
+        self._headers = {"X-Priority": priority}
+        self._owns_http = http_client is None
+        self._http = http_client or httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        self._batcher = (
+            _ThreadBatcher(self._send_batch, self.max_batch_size, max_wait, max_connections)
+            if self.max_batch_size > 1 else None
+        )
+
+    def moderate(self, text: str) -> Dict:
+        """
+        Moderate one text; concurrent calls are batched together.
+
+        Returns:
+            The ModerationResponse fields as a dictionary
+
+        Raises:
+            ValueError: If the text would be rejected by the API
+            ModerationAPIError: If the request fails after retries
+            TimeoutError: If a batched call outlives its timeout and retries
+        """
+        _check_text(text)
+        start = time.perf_counter()
+        try:
+            if self._batcher:
+                result = self._batcher.submit(text).result(self._wait_timeout)
+            else:
+                result = self._request("/moderate", {"text": text})
+        except Exception:
+            self.stats.record_call(time.perf_counter() - start, ok=False)
+            raise
+        self.stats.record_call(time.perf_counter() - start)
+        return result
+
+    def moderate_many(self, texts: Sequence[str]) -> List[Dict]:
+        """Moderate a list of texts in full-size batches, returning results in order."""
+        for text in texts:
+            _check_text(text)
+        results = []
+        for chunk in _chunks(texts, self.max_batch_size):
+            start = time.perf_counter()
+            try:
+                results.extend(self._send_batch(chunk))
+            except Exception:
+                for _ in chunk:
+                    self.stats.record_call(time.perf_counter() - start, ok=False)
+                raise
+            for _ in chunk:
+                self.stats.record_call(time.perf_counter() - start)
+        return results
+
+    def health(self) -> Dict:
+        return self._request("/health", None, method="GET")
+
+    def _send_batch(self, texts: List[str]) -> List[Dict]:
+        return _batch_results(texts, self._request("/moderate/batch", {"texts": texts}))
+
+    def _request(self, path: str, payload, method: str = "POST") -> Dict:
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = self._http.request(method, path, json=payload, headers=self._headers)
+            except httpx.TransportError as e:
+                status_code, detail = None, str(e)
+            else:
+                if response.status_code < 400:
+                    self.stats.record_request(attempt)
+                    return response.json()
+                status_code, detail = response.status_code, _error_detail(response)
+                retry_after = response.headers.get("Retry-After")
+
+            if attempt >= self.retry.max_retries or not self.retry.is_retryable(status_code):
+                self.stats.record_request(attempt)
+                raise ModerationAPIError(status_code, detail)
+            delay = self.retry.delay(attempt, retry_after)
+            logger.debug("Retrying %s after %s in %.3fs", path, status_code or "transport error", delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self):
+        """Flush buffered calls and release pooled connections."""
+        if self._batcher:
+            self._batcher.close()
+        if self._owns_http:
+            self._http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncModerationClient:
+    """asyncio client; use from a single event loop."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        timeout: float = 10.0,
+        max_batch_size: int = 16,
+        max_wait: float = 0.01,
+        retry: RetryPolicy = None,
+        priority: str = "interactive",
+        max_connections: int = 10,
+        http_client: httpx.AsyncClient = None
+    ):
+        """
+        Initialize client.
+
+        Args:
+            base_url: API root URL
+            timeout: Per-request timeout in seconds
+            max_batch_size: Texts per batch request (1 disables batching)
+            max_wait: Seconds the first buffered text waits for others
+            retry: Retry policy for 429/5xx and transport errors
+            priority: X-Priority lane (interactive or bulk)
+            max_connections: Pooled keep-alive connections
+            http_client: Pre-built httpx.AsyncClient, e.g. with an ASGI transport
+        """
+        self.max_batch_size = max(1, min(max_batch_size, MAX_BATCH_SIZE))
+        self.retry = retry or RetryPolicy()
+        self.stats = LatencyStats()
+        self._headers = {"X-Priority": priority}
+        self._owns_http = http_client is None
+        self._http = http_client or httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        self._batcher = (
+            _AsyncBatcher(self._send_batch, self.max_batch_size, max_wait)
+            if self.max_batch_size > 1 else None
+        )
+
+    async def moderate(self, text: str) -> Dict:
+        """
+        Moderate one text; calls made close together are batched.
+
+        Raises:
+            ValueError: If the text would be rejected by the API
+            ModerationAPIError: If the request fails after retries
+        """
+        _check_text(text)
+        start = time.perf_counter()
+        try:
+            if self._batcher:
+                result = await self._batcher.submit(text)
+            else:
+                result = await self._request("/moderate", {"text": text})
+        except Exception:
+            self.stats.record_call(time.perf_counter() - start, ok=False)
+            raise
+        self.stats.record_call(time.perf_counter() - start)
+        return result
+
+    async def moderate_many(self, texts: Sequence[str]) -> List[Dict]:
+        """Moderate a list of texts in full-size batches sent concurrently, in order."""
+        for text in texts:
+            _check_text(text)
+        start = time.perf_counter()
+        chunks = _chunks(texts, self.max_batch_size)
+        try:
+            batches = await asyncio.gather(*(self._send_batch(chunk) for chunk in chunks))
+        except Exception:
+            for _ in texts:
+                self.stats.record_call(time.perf_counter() - start, ok=False)
+            raise
+        for _ in texts:
+            self.stats.record_call(time.perf_counter() - start)
+        return [result for batch in batches for result in batch]
+
+    async def health(self) -> Dict:
+        return await self._request("/health", None, method="GET")
+
+    async def _send_batch(self, texts: List[str]) -> List[Dict]:
+        return _batch_results(texts, await self._request("/moderate/batch", {"texts": texts}))
+
+    async def _request(self, path: str, payload, method: str = "POST") -> Dict:
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = await self._http.request(method, path, json=payload, headers=self._headers)
+            except httpx.TransportError as e:
+                status_code, detail = None, str(e)
+            else:
+                if response.status_code < 400:
+                    self.stats.record_request(attempt)
+                    return response.json()
+                status_code, detail = response.status_code, _error_detail(response)
+                retry_after = response.headers.get("Retry-After")
+
+            if attempt >= self.retry.max_retries or not self.retry.is_retryable(status_code):
+                self.stats.record_request(attempt)
+                raise ModerationAPIError(status_code, detail)
+            delay = self.retry.delay(attempt, retry_after)
+            logger.debug("Retrying %s after %s in %.3fs", path, status_code or "transport error", delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        """Flush buffered calls and release pooled connections."""
+        if self._batcher:
+            await self._batcher.aclose()
+        if self._owns_http:
+            await self._http.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
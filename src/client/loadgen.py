@@ -0,0 +1,295 @@
+"""
+Open-loop load generator for the moderation API.
+
+Replays a corpus against a running server or the in-process FastAPI app
+at fixed target rates. Requests are sent on schedule whether or not
+earlier ones have finished, and latency is measured from the scheduled
+send time, so a saturated server (or a full client concurrency limit)
+shows up as latency instead of silently lowering the offered load.
+
+Usage:
+    python -m src.client.loadgen --corpus requests.jsonl --rates 5,10,20 \\
+        --duration 30 --target http://localhost:8000 --output load.json
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+import httpx
+import numpy as np
+
+import src
+
+logger = logging.getLogger(__name__)
+
+TEXT_FIELDS = ("text", "comment_text", "body", "title")
+IN_PROCESS = "inprocess"
+
+
+def load_corpus(path: str, field: str = None) -> List[str]:
+    """
+    Load texts to replay.
+
+    Supports JSON lines (the given field, or the first of text, comment_text,
+    body, title), CSV (comment_text column) and plain text (one per line).
+    """
+    if path.endswith(".jsonl"):
+        texts = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                key = field or next((k for k in TEXT_FIELDS if record.get(k)), None)
+                if key and record.get(key):
+                    texts.append(str(record[key]))
+    elif path.endswith(".csv"):
+        with open(path, encoding="utf-8", newline="") as f:
+            texts = [row[field or "comment_text"] for row in csv.DictReader(f)]
+    else:
+        with open(path, encoding="utf-8") as f:
+            texts = [line.rstrip("\n") for line in f]
+    texts = [text for text in texts if text.strip()]
+    if not texts:
+        raise ValueError(f"No texts found in {path}")
+    return texts
+
+
+def arrival_offsets(rate: float, duration: float, poisson: bool = False, seed: int = 0) -> np.ndarray:
+    """Scheduled send times (seconds from stage start) for an open-loop stage."""
+    if poisson:
+        gaps = np.random.default_rng(seed).exponential(1 / rate, size=int(rate * duration * 2) + 10)
+        offsets = np.cumsum(gaps) - gaps[0]
+        return offsets[offsets < duration]
+    return np.arange(int(rate * duration)) / rate
+
+
+async def run_stage(
+    client: httpx.AsyncClient,
+    texts: Sequence[str],
+    rate: float,
+    duration: float,
+    concurrency: int = 64,
+    endpoint: str = "/moderate",
+    headers: Dict = None,
+    poisson: bool = False,
+    timeout: float = 10.0
+) -> Dict[str, np.ndarray]:
+    """
+    Send requests at `rate` per second for `duration` seconds.
+
+    Returns:
+        Arrays of scheduled offsets, latencies (s) and status codes (0 = transport error/timeout)
+    """
+    offsets = arrival_offsets(rate, duration, poisson)
+    latencies = np.full(len(offsets), np.nan)
+    statuses = np.zeros(len(offsets), dtype=np.int32)
+    shed = np.zeros(len(offsets), dtype=bool)
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+
+    async def send(i: int):
+        scheduled = start + offsets[i]
+        async with semaphore:
+            try:
+                response = await client.post(
+                    endpoint, json={"text": texts[i % len(texts)]}, headers=headers, timeout=timeout
+                )
+                statuses[i] = response.status_code
+                # Admission control rejections carry Retry-After; other errors don't
+                shed[i] = response.status_code in (429, 503) and "retry-after" in response.headers
+            except httpx.HTTPError:
+                statuses[i] = 0
+        latencies[i] = time.perf_counter() - scheduled
+
+    tasks = []
+    for i, offset in enumerate(offsets):
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(i)))
+    await asyncio.gather(*tasks)
+
+    return {
+        "offsets": offsets,
+        "latencies": latencies,
+        "statuses": statuses,
+        "shed": shed,
+        "elapsed": time.perf_counter() - start
+    }
+
+
+def percentiles_ms(latencies: np.ndarray) -> Dict:
+    if latencies.size == 0:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        "p50": round(float(p50), 2),
+        "p95": round(float(p95), 2),
+        "p99": round(float(p99), 2),
+        "max": round(float(latencies.max() * 1000), 2)
+    }
+
+
+def summarize(result: Dict, rate: float, bucket_seconds: float = 1.0) -> Dict:
+    """Throughput, latency percentiles, error/shed rates and a per-bucket timeline for one stage."""
+    statuses, shed, latencies = result["statuses"], result["shed"], result["latencies"]
+    ok = (statuses >= 200) & (statuses < 300)
+    errors = ~ok & ~shed
+    sent = len(statuses)
+
+    buckets = (result["offsets"] // bucket_seconds).astype(int)
+    timeline = []
+    for bucket in np.unique(buckets):
+        in_bucket = buckets == bucket
+        timeline.append({
+            "t": round(float(bucket * bucket_seconds), 3),
+            "sent": int(in_bucket.sum()),
+            "ok": int((in_bucket & ok).sum()),
+            "shed": int((in_bucket & shed).sum()),
+            "errors": int((in_bucket & errors).sum()),
+            "latency_ms": percentiles_ms(latencies[in_bucket & ok])
+        })
+
+    return {
+        "target_rps": rate,
+        "sent": sent,
+        "ok": int(ok.sum()),
+        "elapsed_s": round(result["elapsed"], 3),
+        "throughput_rps": round(ok.sum() / result["elapsed"], 2) if result["elapsed"] else 0.0,
+        "error_rate": round(float(errors.mean()), 4) if sent else 0.0,
+        "shed_rate": round(float(shed.mean()), 4) if sent else 0.0,
+        "status_counts": {str(code): int(count) for code, count in zip(*np.unique(statuses, return_counts=True))},
+        "latency_ms": percentiles_ms(latencies[ok]),
+        "timeline": timeline
+    }
+
+
+def in_process_client() -> httpx.AsyncClient:
+    """Client bound to the FastAPI app in this process, loading the model if needed."""
+    from src.api import main
+
+    if main.predictor is None:
+        main.load_predictor()
+    return httpx.AsyncClient(app=main.app, base_url="http://testserver")
+
+
+async def run(
+    texts: Sequence[str],
+    rates: Sequence[float],
+    duration: float,
+    target: str = IN_PROCESS,
+    concurrency: int = 64,
+    endpoint: str = "/moderate",
+    priority: str = "interactive",
+    poisson: bool = False,
+    timeout: float = 10.0,
+    bucket_seconds: float = 1.0,
+    client: httpx.AsyncClient = None
+) -> Dict:
+    """
+    Run one stage per target rate and build the report.
+
+    Args:
+        texts: Corpus to replay (cycled)
+        rates: Target requests per second, one stage each
+        duration: Seconds per stage
+        target: Base URL, or "inprocess" for the app in this process
+        concurrency: Maximum requests in flight
+        endpoint: Path to POST {"text": ...} to
+        priority: X-Priority header
+        poisson: Poisson instead of evenly spaced arrivals
+        timeout: Per-request timeout in seconds
+        bucket_seconds: Timeline resolution
+        client: Pre-built client (overrides target)
+
+    Returns:
+        Report dictionary
+    """
+    owns_client = client is None
+    if client is None:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        client = in_process_client() if target == IN_PROCESS else httpx.AsyncClient(base_url=target, limits=limits)
+
+    stages = []
+    try:
+        for rate in rates:
+            logger.info("🚦 %.1f req/s for %.0fs against %s", rate, duration, target)
+            result = await run_stage(
+                client, texts, rate, duration, concurrency, endpoint,
+                headers={"X-Priority": priority}, poisson=poisson, timeout=timeout
+            )
+            stage = summarize(result, rate, bucket_seconds)
+            logger.info(
+                "   %.1f ok/s, p99 %s ms, errors %.2f%%, shed %.2f%%",
+                stage["throughput_rps"], stage["latency_ms"]["p99"],
+                stage["error_rate"] * 100, stage["shed_rate"] * 100
+            )
+            stages.append(stage)
+    finally:
+        if owns_client:
+            await client.aclose()
+
+    return {
+        "version": src.__version__,
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            "target": target,
+            "endpoint": endpoint,
+            "duration_s": duration,
+            "concurrency": concurrency,
+            "priority": priority,
+            "arrivals": "poisson" if poisson else "constant",
+            "corpus_size": len(texts)
+        },
+        "stages": stages
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test for the moderation API")
+    parser.add_argument("--corpus", required=True, help="JSONL, CSV or text file of texts to replay")
+    parser.add_argument("--field", default=None, help="JSONL/CSV field holding the text")
+    parser.add_argument("--rates", default="10", help="Comma-separated target req/s, one stage each")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per stage")
+    parser.add_argument("--target", default=IN_PROCESS, help="Base URL, or 'inprocess'")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument("--endpoint", default="/moderate")
+    parser.add_argument("--priority", default="interactive", choices=["interactive", "bulk"])
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--output", default=None, help="Write the JSON report here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    report = asyncio.run(run(
+        load_corpus(args.corpus, args.field),
+        [float(r) for r in args.rates.split(",")],
+        args.duration,
+        target=args.target,
+        concurrency=args.concurrency,
+        endpoint=args.endpoint,
+        priority=args.priority,
+        poisson=args.poisson,
+        timeout=args.timeout
+    ))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(output)
+        logger.info("✅ Report written to %s", args.output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
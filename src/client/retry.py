@@ -0,0 +1,52 @@
+"""
+Retry policy and errors for the moderation client.
+"""
+
+import random
+from typing import Optional
+
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class ModerationAPIError(Exception):
+    """Raised when the API returns an error that is not (or no longer) retried."""
+
+    def __init__(self, status_code: Optional[int], detail: str):
+        super().__init__(f"{status_code}: {detail}" if status_code else detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff."""
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.1, backoff_max: float = 2.0):
+        """
+        Initialize retry policy.
+
+        Args:
+            max_retries: Retries after the first attempt (0 disables retrying)
+            backoff_base: Backoff ceiling for the first retry, in seconds
+            backoff_max: Upper bound on any single wait, in seconds
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    @staticmethod
+    def is_retryable(status_code: Optional[int]) -> bool:
+        """Throttling and server errors are retried; None means a transport error."""
+        return status_code is None or status_code in RETRYABLE_STATUS
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before retry number `attempt` (0-based).
+
+        A Retry-After header from the server is honored up to backoff_max.
+        """
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass  # HTTP-date form; fall back to backoff
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
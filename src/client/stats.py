@@ -0,0 +1,58 @@
+"""
+Per-call latency statistics for the moderation client.
+"""
+
+import threading
+from collections import deque
+from typing import Dict
+
+import numpy as np
+
+
+class LatencyStats:
+    """Bounded record of call latencies plus request, retry and error counters."""
+
+    def __init__(self, capacity: int = 10000):
+        self._latencies = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.requests = 0
+        self.retries = 0
+
+    def record_call(self, seconds: float, ok: bool = True):
+        """Record one moderate() call, from submission to result."""
+        with self._lock:
+            self.calls += 1
+            if ok:
+                self._latencies.append(seconds)
+            else:
+                self.errors += 1
+
+    def record_request(self, retries: int):
+        """Record one HTTP request (single or batch) and how often it was retried."""
+        with self._lock:
+            self.requests += 1
+            self.retries += retries
+
+    def snapshot(self) -> Dict:
+        """Counters and latency percentiles in milliseconds."""
+        with self._lock:
+            latencies = np.fromiter(self._latencies, dtype=np.float64) * 1000
+            snapshot = {
+                "calls": self.calls,
+                "errors": self.errors,
+                "requests": self.requests,
+                "retries": self.retries
+            }
+        if latencies.size:
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            snapshot["latency_ms"] = {
+                "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3),
+                "p99": round(float(p99), 3),
+                "max": round(float(latencies.max()), 3)
+            }
+        else:
+            snapshot["latency_ms"] = None
+        return snapshot
@@ -0,0 +1,11 @@
+"""
+Jobs Package
+
+Asynchronous moderation jobs: a sqlite store and a background executor
+that scores them when interactive traffic leaves spare capacity.
+"""
+
+from src.jobs.store import JobStore
+from src.jobs.executor import JobExecutor
+
+__all__ = ["JobStore", "JobExecutor"]
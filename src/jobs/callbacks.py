@@ -0,0 +1,69 @@
+"""
+Destination checks for job completion callbacks.
+
+The server POSTs job results to caller-supplied URLs, so a URL must not
+point back into the deployment: loopback, private (RFC 1918), link-local
+(including the 169.254.169.254 metadata service) and other non-global
+addresses are rejected after DNS resolution. When JOB_CALLBACK_ALLOWED_HOSTS
+is set, only the listed hosts are accepted and the address check is
+skipped, so operators can allow an internal receiver on purpose.
+"""
+
+import ipaddress
+import os
+import socket
+from typing import Iterable, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+
+def allowed_hosts_from_env() -> Optional[Set[str]]:
+    """Hosts listed in JOB_CALLBACK_ALLOWED_HOSTS, or None when unset."""
+    value = os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "").strip()
+    if not value:
+        return None
+    return {host.strip().lower() for host in value.split(",") if host.strip()}
+
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])  # Drop any IPv6 zone id
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_callback_url(url: str, allowed_hosts: Optional[Iterable[str]] = None) -> Tuple[bool, str]:
+    """
+    Check that a callback URL is safe for the server to POST to.
+    Resolves the host name, so call it off the event loop.
+
+    Args:
+        url: Callback URL from the job request
+        allowed_hosts: Host allowlist (defaults to JOB_CALLBACK_ALLOWED_HOSTS)
+
+    Returns:
+        Tuple of (is_valid, error_message)
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        return False, "must be an http or https URL with a host"
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        return False, "has an invalid port"
+
+    if allowed_hosts is None:
+        allowed_hosts = allowed_hosts_from_env()
+    if allowed_hosts is not None:
+        if host in {h.lower() for h in allowed_hosts}:
+            return True, ""
+        return False, f"host {host} is not in JOB_CALLBACK_ALLOWED_HOSTS"
+
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError):
+        return False, f"host {host} could not be resolved"
+    # Every address must be public: the HTTP client may connect to any of them
+    if not addresses or not all(is_public_address(address) for address in addresses):
+        return False, f"host {host} resolves to a private, loopback or link-local address"
+    return True, ""
@@ -0,0 +1,268 @@
+"""
+Background executor for moderation jobs.
+
+Runs as a task on the API's event loop. Job work only starts when the
+admission controller is idle (nothing running or queued). Each batch is
+then run under a bulk-lane slot, so interactive requests that arrive
+meanwhile overtake anything queued behind it. JOB_BATCH_SIZE bounds how
+long one forward pass can hold that slot. When a batch can't get a slot
+its items are released and retried later.
+
+Completion callbacks are sent from their own tasks, at most
+max_callbacks at a time, once the job is marked finished in the store.
+The executor never waits on them, so a slow callback host can't hold up
+other jobs.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+import httpx
+from starlette.concurrency import run_in_threadpool
+
+from src.api.admission import AdmissionRejected
+from src.client.retry import RetryPolicy
+from src.jobs.store import JobStore
+from src.utils.text_processing import clean_text
+
+logger = logging.getLogger(__name__)
+
+
+class JobExecutor:
+    """Scores queued job items in batches while the service has spare capacity."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        get_predictor: Callable,
+        admission,
+        batch_size: int = 64,
+        poll_interval: float = 1.0,
+        idle_wait: float = 0.05,
+        retention: float = 86400.0,
+        on_batch: Optional[Callable] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        callback_retry: Optional[RetryPolicy] = None,
+        max_callbacks: int = 8,
+        callback_drain: float = 5.0,
+        callback_guard: Optional[Callable] = None
+    ):
+        """
+        Initialize executor.
+
+        Args:
+            store: Job store to claim work from
+            get_predictor: Returns the current predictor (None while the model loads)
+            admission: AdmissionController shared with interactive traffic
+            batch_size: Texts per forward pass
+            poll_interval: Seconds between checks for new jobs when idle
+            idle_wait: Seconds to back off while interactive work is running
+            retention: Seconds finished jobs are kept before being purged
+            on_batch: Called in the threadpool with (texts, predictions, job) after each batch (stats, audit)
+            http_client: Client for completion callbacks (created on first use)
+            callback_retry: Retry policy for callbacks
+            max_callbacks: Callbacks in flight at once; the rest wait their turn
+            callback_drain: Seconds stop() waits for pending callbacks before cancelling them
+            callback_guard: Returns (is_valid, error_message) for a URL; re-checked right before
+                sending, in case its DNS changed since submission
+        """
+        self.store = store
+        self.get_predictor = get_predictor
+        self.admission = admission
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.idle_wait = idle_wait
+        self.retention = retention
+        self.on_batch = on_batch
+        self.callback_retry = callback_retry or RetryPolicy(max_retries=3, backoff_base=1.0, backoff_max=30.0)
+        self._http = http_client
+        self._callback_slots = asyncio.Semaphore(max_callbacks)
+        self._callback_tasks = set()
+        self.callback_drain = callback_drain
+        self.callback_guard = callback_guard
+        self._wakeup = asyncio.Event()
+        self._task = None
+        self._last_purge = 0.0
+
+        # Counters
+        self.batches = 0
+        self.items_scored = 0
+        self.deferred = 0
+        self.preempted = 0
+        self.failures = 0
+        self.callbacks = {"delivered": 0, "failed": 0}
+
+    def notify(self):
+        """Wake the executor after a job is submitted."""
+        self._wakeup.set()
+
+    async def _sleep(self, seconds: float):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def step(self) -> bool:
+        """
+        Score one batch if there is capacity and work.
+
+        Returns:
+            True if a batch was processed (more work may be waiting)
+        """
+        predictor = self.get_predictor()
+        if predictor is None:
+            return False
+        if not self.admission.is_idle():
+            self.deferred += 1
+            return False
+
+        claim = await run_in_threadpool(self.store.claim, self.batch_size)
+        if claim is None:
+            return False
+        job_id, items = claim
+        positions = [position for position, _ in items]
+        texts = [text for _, text in items]
+
+        try:
+            async with self.admission.slot("bulk", time.monotonic() + self.idle_wait):
+                predictions = await run_in_threadpool(self._predict, predictor, texts)
+        except AdmissionRejected:
+            # Interactive requests took the capacity; hand the items back
+            self.preempted += 1
+            await run_in_threadpool(self.store.release, job_id, positions)
+            return False
+        except Exception as e:
+            self.failures += 1
+            logger.error("❌ Job %s failed: %s", job_id, e)
+            job = await run_in_threadpool(self.store.fail, job_id, f"Prediction failed: {e}")
+            self._schedule_callback(job)
+            return True
+
+        job = await run_in_threadpool(self.store.complete, job_id, positions, predictions)
+        self.batches += 1
+        self.items_scored += len(predictions)
+        if self.on_batch is not None:
+            try:
+                await run_in_threadpool(self.on_batch, texts, predictions, job)
+            except Exception as e:
+                logger.error("Error in job batch hook: %s", e)
+
+        if job["status"] == "completed":
+            logger.info("✅ Job %s completed: %d texts", job_id, job["total"])
+            self._schedule_callback(job)
+        return True
+
+    @staticmethod
+    def _predict(predictor, texts):
+        # Cleaning a full batch of long texts is real work; keep it with the forward pass
+        return predictor.predict_batch([clean_text(text) for text in texts])
+
+    async def run(self):
+        """Process jobs until cancelled."""
+        logger.info("🚀 Job executor started (batch size %d)", self.batch_size)
+        while True:
+            try:
+                if time.time() - self._last_purge > min(self.retention, 3600):
+                    self._last_purge = time.time()
+                    await run_in_threadpool(self.store.purge, self.retention)
+                if await self.step():
+                    await asyncio.sleep(0)  # Let interactive requests reach admission first
+                elif self.get_predictor() is not None and not self.admission.is_idle():
+                    await asyncio.sleep(self.idle_wait)
+                else:
+                    await self._sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error in job executor: %s", e)
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._callback_tasks:
+            _, pending = await asyncio.wait(self._callback_tasks, timeout=self.callback_drain)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning("⚠️ Cancelled %d undelivered job callbacks", len(pending))
+                await asyncio.gather(*pending, return_exceptions=True)
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _schedule_callback(self, job: Dict):
+        """Send the job's callback in the background; never blocks the executor."""
+        if not job.get("callback_url"):
+            return
+        task = asyncio.create_task(self._callback(job))
+        self._callback_tasks.add(task)
+        task.add_done_callback(self._callback_tasks.discard)
+
+    async def _callback(self, job: Dict):
+        """POST the final job status to its callback URL, retrying transient failures."""
+        try:
+            async with self._callback_slots:
+                await self._deliver(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Error sending callback for job %s: %s", job["id"], e)
+
+    async def _deliver(self, job: Dict):
+        url = job["callback_url"]
+        if self.callback_guard is not None:
+            is_valid, error_msg = await run_in_threadpool(self.callback_guard, url)
+            if not is_valid:
+                self.callbacks["failed"] += 1
+                logger.warning("⚠️ Callback for job %s blocked: %s", job["id"], error_msg)
+                await run_in_threadpool(self.store.set_callback_status, job["id"], "failed: blocked destination")
+                return
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=10.0)
+
+        payload = {key: job[key] for key in ("id", "status", "total", "completed", "error")}
+        outcome = "failed"
+        for attempt in range(self.callback_retry.max_retries + 1):
+            status_code, retry_after = None, None
+            try:
+                response = await self._http.post(url, json=payload)
+                if response.status_code < 400:
+                    outcome = "delivered"
+                    break
+                status_code, retry_after = response.status_code, response.headers.get("Retry-After")
+                outcome = f"failed: HTTP {status_code}"
+            except httpx.HTTPError as e:
+                outcome = f"failed: {type(e).__name__}"
+            if attempt == self.callback_retry.max_retries or not self.callback_retry.is_retryable(status_code):
+                break
+            await asyncio.sleep(self.callback_retry.delay(attempt, retry_after))
+
+        self.callbacks["delivered" if outcome == "delivered" else "failed"] += 1
+        if outcome != "delivered":
+            logger.warning("⚠️ Callback for job %s %s", job["id"], outcome)
+        await run_in_threadpool(self.store.set_callback_status, job["id"], outcome)
+
+    def snapshot(self) -> Dict:
+        return {
+            "jobs": self.store.counts(),
+            "pending_items": self.store.pending_items(),
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+            "items_scored": self.items_scored,
+            "deferred": self.deferred,
+            "preempted": self.preempted,
+            "failures": self.failures,
+            "callbacks": {**self.callbacks, "pending": len(self._callback_tasks)}
+        }
@@ -0,0 +1,266 @@
+"""
+sqlite-backed job store.
+
+A job is a set of texts scored in the background. Each text is one row in
+`items`, and its result is stored once scored. Executors claim pending items
+in position order under a lease. If a process dies mid-batch, its lease
+expires and the items are claimed again. Several workers (the pre-fork
+server) can therefore share one database file.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    callback_url TEXT,
+    callback_status TEXT,
+    ip_address TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    result BLOB,
+    lease_until REAL,
+    PRIMARY KEY (job_id, position)
+);
+CREATE INDEX IF NOT EXISTS items_pending ON items (job_id, position) WHERE result IS NULL;
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+JOB_FIELDS = (
+    "id", "status", "total", "completed", "callback_url", "callback_status",
+    "ip_address", "error", "created_at", "started_at", "finished_at"
+)
+
+
+class JobStore:
+    """Persistent jobs, items and results in one sqlite file."""
+
+    def __init__(self, path: str, lease_seconds: float = 300.0):
+        """
+        Open (and create if needed) the job database.
+
+        Args:
+            path: sqlite file path (":memory:" for tests)
+            lease_seconds: How long a claimed item is reserved before another executor may retry it
+        """
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def _job(self, job_id: str) -> Optional[Dict]:
+        row = self._conn.execute(f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(zip(JOB_FIELDS, row)) if row else None
+
+    def create(self, texts: Sequence[str], callback_url: Optional[str] = None, ip_address: str = "unknown") -> Dict:
+        """Store a new queued job and its texts."""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, status, total, callback_url, ip_address, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (job_id, "queued", len(texts), callback_url, ip_address, time.time())
+                )
+                self._conn.executemany(
+                    "INSERT INTO items (job_id, position, text) VALUES (?, ?, ?)",
+                    ((job_id, position, text) for position, text in enumerate(texts))
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._job(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._job(job_id)
+
+    def claim(self, limit: int) -> Optional[Tuple[str, List[Tuple[int, str]]]]:
+        """
+        Lease up to `limit` unscored items from the oldest active job.
+
+        Returns:
+            (job id, [(position, text), ...]) or None when there is no work
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    """
+                    SELECT jobs.id FROM jobs
+                    WHERE jobs.status IN ('queued', 'running') AND EXISTS (
+                        SELECT 1 FROM items WHERE items.job_id = jobs.id AND items.result IS NULL
+                        AND (items.lease_until IS NULL OR items.lease_until < ?)
+                    )
+                    ORDER BY jobs.created_at LIMIT 1
+                    """,
+                    (now,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+
+                job_id = row[0]
+                items = self._conn.execute(
+                    """
+                    SELECT position, text FROM items
+                    WHERE job_id = ? AND result IS NULL AND (lease_until IS NULL OR lease_until < ?)
+                    ORDER BY position LIMIT ?
+                    """,
+                    (job_id, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE items SET lease_until = ? WHERE job_id = ? AND position = ?",
+                    ((now + self.lease_seconds, job_id, position) for position, _ in items)
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = COALESCE(started_at, ?) WHERE id = ?",
+                    (now, job_id)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return job_id, items
+
+    def release(self, job_id: str, positions: Sequence[int]):
+        """Return claimed items to the queue without results."""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE items SET lease_until = NULL WHERE job_id = ? AND position = ?",
+                ((job_id, position) for position in positions)
+            )
+
+    def complete(self, job_id: str, positions: Sequence[int], predictions: Sequence[Dict]) -> Dict:
+        """Store results for claimed items and mark the job completed when none are left."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "UPDATE items SET result = ?, lease_until = NULL WHERE job_id = ? AND position = ? AND result IS NULL",
+                    ((orjson.dumps(prediction), job_id, position) for position, prediction in zip(positions, predictions))
+                )
+                self._conn.execute(
+                    """
+                    UPDATE jobs SET completed = (
+                        SELECT COUNT(*) FROM items WHERE items.job_id = jobs.id AND items.result IS NOT NULL
+                    ) WHERE id = ?
+                    """,
+                    (job_id,)
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'completed', finished_at = ? "
+                    "WHERE id = ? AND completed = total AND status = 'running'",
+                    (now, job_id)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._job(job_id)
+
+    def fail(self, job_id: str, error: str) -> Dict:
+        """Mark a job failed; its remaining items are not retried."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (error, time.time(), job_id)
+            )
+            return self._job(job_id)
+
+    def set_callback_status(self, job_id: str, status: str):
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET callback_status = ? WHERE id = ?", (status, job_id))
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Tuple[int, str, Dict]]:
+        """Scored items with position in [offset, offset + limit), in order."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT position, text, result FROM items
+                WHERE job_id = ? AND position >= ? AND position < ? AND result IS NOT NULL
+                ORDER BY position
+                """,
+                (job_id, offset, offset + limit)
+            ).fetchall()
+        return [(position, text, orjson.loads(result)) for position, text, result in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update(dict(rows))
+        return counts
+
+    def pending_items(self) -> int:
+        """Unscored items across active jobs."""
+        with self._lock:
+            return self._conn.execute(
+                """
+                SELECT COUNT(*) FROM items JOIN jobs ON jobs.id = items.job_id
+                WHERE items.result IS NULL AND jobs.status IN ('queued', 'running')
+                """
+            ).fetchone()[0]
+
+    def purge(self, older_than: float) -> int:
+        """
+        Delete finished jobs that ended more than `older_than` seconds ago.
+
+        Returns:
+            Number of jobs deleted
+        """
+        cutoff = time.time() - older_than
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "DELETE FROM items WHERE job_id IN "
+                    "(SELECT id FROM jobs WHERE status IN ('completed', 'failed') AND finished_at < ?)",
+                    (cutoff,)
+                )
+                deleted = self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND finished_at < ?", (cutoff,)
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if deleted:
+            logger.info("🧹 Purged %d finished jobs", deleted)
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
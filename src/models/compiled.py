@@ -0,0 +1,203 @@
+"""
+TorchScript inference with sequence-length buckets.
+The fine-tuned model is traced once per bucket length into a single
+ScriptModule (the buckets share one copy of the weights) and cached on
+disk, so later cold starts skip both tracing and the Hugging Face model
+construction.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+import warnings
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Optional, Sequence
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (32, 64, 128, 256)
+PARITY_TOLERANCE = 1e-4
+WEIGHT_SUFFIXES = (".bin", ".safetensors", ".pt", ".pth")  # Weight files inside a checkpoint directory
+
+
+class _LogitsModule(torch.nn.Module):
+    """Adapter exposing a (input_ids, attention_mask) -> logits forward for tracing."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, return_dict=False)[0]
+
+
+class BucketedScriptModel:
+    """Routes each batch to the traced graph for the smallest bucket that fits."""
+
+    def __init__(self, scripted: torch.jit.ScriptModule, buckets: Sequence[int], meta: Dict = None):
+        """
+        Initialize bucketed model.
+
+        Args:
+            scripted: ScriptModule with one bucket_<length> method per bucket
+            buckets: Sequence lengths that were traced
+            meta: Metadata stored alongside the traced graphs
+        """
+        self.scripted = scripted
+        self.sequence_buckets = tuple(sorted(buckets))
+        self.meta = meta or {}
+        self._methods = {length: getattr(scripted, f"bucket_{length}") for length in self.sequence_buckets}
+
+    def bucket_for(self, length: int) -> int:
+        """Smallest bucket that fits a sequence of the given length."""
+        for bucket in self.sequence_buckets:
+            if length <= bucket:
+                return bucket
+        raise ValueError(f"Sequence length {length} exceeds largest bucket {self.sequence_buckets[-1]}")
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor):
+        length = input_ids.shape[1]
+        bucket = self.bucket_for(length)
+        if bucket != length:
+            pad = bucket - length
+            input_ids = torch.nn.functional.pad(input_ids, (0, pad), value=0)
+            attention_mask = torch.nn.functional.pad(attention_mask, (0, pad), value=0)
+        return SimpleNamespace(logits=self._methods[bucket](input_ids, attention_mask))
+
+    def eval(self):
+        self.scripted.eval()
+        return self
+
+    def to(self, device):
+        self.scripted.to(device)
+        return self
+
+    def parameters(self):
+        return self.scripted.parameters()
+
+
+def cache_key(model_name: str, model_path: Optional[str], buckets: Sequence[int]) -> str:
+    """
+    Key identifying a traced artifact.
+    Changes whenever the weights, base model, buckets or torch version change.
+    For a checkpoint directory, config.json and every weight file in it are
+    fingerprinted, since the directory's own mtime doesn't change when a
+    file inside it is overwritten.
+    """
+    parts = [model_name, torch.__version__, ",".join(str(b) for b in sorted(buckets))]
+    if model_path and os.path.exists(model_path):
+        parts.append(os.path.abspath(model_path))
+        if os.path.isdir(model_path):
+            files = sorted(
+                path for path in Path(model_path).iterdir()
+                if path.is_file() and (path.name == "config.json" or path.suffix in WEIGHT_SUFFIXES)
+            )
+        else:
+            files = [Path(model_path)]
+        for path in files:
+            stat = path.stat()
+            parts += [path.name, str(stat.st_size), str(stat.st_mtime_ns)]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def trace_buckets(model, buckets: Sequence[int] = DEFAULT_BUCKETS, device: str = "cpu") -> torch.jit.ScriptModule:
+    """
+    Trace the model once per bucket length into a single ScriptModule.
+
+    Args:
+        model: Eager Hugging Face sequence classification model
+        buckets: Sequence lengths to trace
+        device: Device of the model
+
+    Returns:
+        ScriptModule with a bucket_<length> method per bucket
+    """
+    wrapper = _LogitsModule(model).eval()
+    inputs = {}
+    for length in buckets:
+        setattr(wrapper, f"bucket_{length}", wrapper.forward)
+        example = torch.ones((1, length), dtype=torch.long, device=device)
+        inputs[f"bucket_{length}"] = (example, example)
+    with torch.no_grad(), warnings.catch_warnings():
+        # The attention mask fill value is a genuine constant
+        warnings.simplefilter("ignore", torch.jit.TracerWarning)
+        return torch.jit.trace_module(wrapper, inputs)
+
+
+def check_parity(model, bucketed: BucketedScriptModel, vocab_size: int, seed: int = 0) -> float:
+    """
+    Compare traced and eager logits on random padded inputs for every bucket.
+
+    Returns:
+        Maximum absolute logit difference
+    """
+    generator = torch.Generator().manual_seed(seed)
+    max_diff = 0.0
+    with torch.no_grad():
+        for bucket in bucketed.sequence_buckets:
+            length = max(2, bucket - 3)  # Exercise the padding path
+            input_ids = torch.randint(0, vocab_size, (2, length), generator=generator)
+            attention_mask = torch.ones_like(input_ids)
+            attention_mask[1, length // 2:] = 0
+            device = next(model.parameters()).device
+            input_ids, attention_mask = input_ids.to(device), attention_mask.to(device)
+
+            eager = model(input_ids=input_ids, attention_mask=attention_mask).logits
+            traced = bucketed(input_ids, attention_mask).logits
+            max_diff = max(max_diff, (eager - traced).abs().max().item())
+    return max_diff
+
+
+def load_cached(cache_dir: str, key: str, device: str = "cpu") -> Optional[BucketedScriptModel]:
+    """Load a traced artifact from the cache, or None if missing or unreadable."""
+    path = Path(cache_dir) / f"{key}.pt"
+    if not path.exists():
+        return None
+    try:
+        extra = {"meta.json": ""}
+        scripted = torch.jit.load(str(path), map_location=device, _extra_files=extra)
+        meta = json.loads(extra["meta.json"])
+        return BucketedScriptModel(scripted.eval(), meta["buckets"], meta)
+    except Exception as e:
+        logger.warning("⚠️  Ignoring unreadable TorchScript cache %s: %s", path, e)
+        return None
+
+
+def save_cached(bucketed: BucketedScriptModel, cache_dir: str, key: str):
+    """Atomically write a traced artifact to the cache."""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = Path(cache_dir) / f"{key}.pt"
+    tmp = path.with_suffix(f".tmp-{os.getpid()}")
+    torch.jit.save(bucketed.scripted, str(tmp), _extra_files={"meta.json": json.dumps(bucketed.meta)})
+    os.replace(tmp, path)
+
+
+def build_bucketed_model(
+    model,
+    buckets: Sequence[int],
+    vocab_size: int,
+    device: str = "cpu",
+    meta: Dict = None
+) -> BucketedScriptModel:
+    """
+    Trace and parity-check a bucketed model.
+
+    Raises:
+        RuntimeError: If traced logits diverge from eager mode
+    """
+    start = time.perf_counter()
+    scripted = trace_buckets(model, buckets, device)
+    bucketed = BucketedScriptModel(scripted.eval(), buckets, {**(meta or {}), "buckets": sorted(buckets)})
+    max_diff = check_parity(model, bucketed, vocab_size)
+    if max_diff > PARITY_TOLERANCE:
+        raise RuntimeError(f"TorchScript parity check failed: max logit diff {max_diff:.2e}")
+    logger.info(
+        "✅ Traced %d buckets %s in %.2fs (max logit diff %.2e)",
+        len(buckets), list(sorted(buckets)), time.perf_counter() - start, max_diff
+    )
+    return bucketed
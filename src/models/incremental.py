@@ -0,0 +1,221 @@
+"""
+Incremental re-moderation of edited documents.
+
+Cleaned text is split into sentence segments and each segment is scored
+on its own. Scores are cached by segment hash in a bounded LRU, so when a
+user edits one sentence of a long comment only that sentence goes through
+the model again. The document verdict takes, per label, the highest
+segment score: a document is flagged when any of its segments is.
+
+This is not the /moderate verdict. Each sentence is scored without its
+neighbours, so toxicity that only shows across sentences can be missed,
+while a sentence that reads as toxic out of context can flag a document
+that /moderate would pass. Documents with more than max_document_segments
+segments are scored as one whole text instead, the same way /moderate
+would score them, so one request can't fan out into hundreds of forward
+passes.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+def split_segments(text: str, max_chars: int = 500) -> List[str]:
+    """
+    Split cleaned text into sentence segments.
+
+    Sentences longer than max_chars are cut at word boundaries. Boundaries
+    depend only on the sentence itself, so editing one sentence leaves the
+    other segments unchanged.
+    """
+    segments = []
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        if not sentence:
+            continue
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            segments.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence:
+            segments.append(sentence)
+    return segments
+
+
+def segment_key(segment: str) -> str:
+    return hashlib.blake2b(segment.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class LRUStore:
+    """Thread-safe bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._items)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions
+            }
+
+
+class SegmentPlan:
+    """Segments of one document version and the cached scores found for them."""
+
+    def __init__(
+        self,
+        segments: List[str],
+        keys: List[str],
+        scores: List[Optional[np.ndarray]],
+        whole_text: bool = False
+    ):
+        self.segments = segments
+        self.keys = keys
+        self.scores = scores
+        self.whole_text = whole_text
+
+    @property
+    def missing(self) -> List[int]:
+        """Indices of segments that still need a forward pass (first occurrence only)."""
+        seen, missing = set(), []
+        for i, (key, scores) in enumerate(zip(self.keys, self.scores)):
+            if scores is None and key not in seen:
+                seen.add(key)
+                missing.append(i)
+        return missing
+
+
+class IncrementalModerator:
+    """Scores documents segment by segment, reusing cached segment scores."""
+
+    def __init__(
+        self,
+        predictor,
+        max_segments: int = 50000,
+        max_documents: int = 10000,
+        max_segment_chars: int = 500,
+        max_document_segments: int = 64
+    ):
+        """
+        Initialize incremental moderator.
+
+        Args:
+            predictor: ToxicityPredictor used for new segments
+            max_segments: Segment scores kept in the cache
+            max_documents: Documents whose latest segmentation is remembered
+            max_segment_chars: Longest segment before a sentence is cut
+            max_document_segments: Segments per document above which the whole text is scored instead
+        """
+        self.predictor = predictor
+        self.segments = LRUStore(max_segments)
+        self.documents = LRUStore(max_documents)
+        self.max_segment_chars = max_segment_chars
+        self.max_document_segments = max_document_segments
+        self.whole_text_documents = 0
+
+    def prepare(self, text: str) -> SegmentPlan:
+        """Split cleaned text and look up cached scores."""
+        segments = split_segments(text, self.max_segment_chars) or [text]
+        whole_text = len(segments) > self.max_document_segments
+        if whole_text:
+            # Too many segments to score one by one; the whole text is a single (cached) segment
+            self.whole_text_documents += 1
+            segments = [text]
+        keys = [segment_key(segment) for segment in segments]
+        return SegmentPlan(segments, keys, [self.segments.get(key) for key in keys], whole_text)
+
+    def score_missing(self, plan: SegmentPlan) -> int:
+        """
+        Score uncached segments in one batch and cache them.
+
+        Returns:
+            Number of segments sent to the model
+        """
+        missing = plan.missing
+        if missing:
+            predictions = self.predictor.predict_batch([plan.segments[i] for i in missing])
+            labels = self.predictor.LABEL_COLUMNS
+            fresh = {}
+            for i, prediction in zip(missing, predictions):
+                scores = np.array([prediction['toxicity_scores'][label] for label in labels], dtype=np.float32)
+                fresh[plan.keys[i]] = scores
+                self.segments.put(plan.keys[i], scores)
+            plan.scores = [scores if scores is not None else fresh[key] for key, scores in zip(plan.keys, plan.scores)]
+        return len(missing)
+
+    def finish(self, document_id: str, plan: SegmentPlan, scored: int = 0) -> Tuple[Dict, Dict]:
+        """
+        Aggregate segment scores into the document prediction.
+
+        Returns:
+            (prediction dictionary, incremental details)
+        """
+        matrix = np.stack(plan.scores)
+        prediction = self.predictor.format_prediction(matrix.max(axis=0))
+
+        previous = self.documents.get(document_id) or ()
+        self.documents.put(document_id, tuple(plan.keys))
+        previous_keys = set(previous)
+        details = {
+            "segments": len(plan.segments),
+            "segments_scored": scored,
+            "segments_changed": sum(key not in previous_keys for key in plan.keys),
+            "most_toxic_segment": int(matrix.max(axis=1).argmax()),
+            "whole_text": plan.whole_text
+        }
+        return prediction, details
+
+    def moderate(self, document_id: str, text: str) -> Tuple[Dict, Dict]:
+        """Prepare, score and aggregate in one call."""
+        plan = self.prepare(text)
+        scored = self.score_missing(plan)
+        return self.finish(document_id, plan, scored)
+
+    def snapshot(self) -> Dict:
+        return {
+            "segments": self.segments.snapshot(),
+            "documents": self.documents.snapshot(),
+            "whole_text_documents": self.whole_text_documents
+        }
@@ -4,13 +4,23 @@ Handles downloading from S3 (production) or loading locally (development).
 """
 
 import torch
-from transformers import DistilBertTokenizer, DistilBertForSequenceClassification
+from transformers import (
+    AutoModelForSequenceClassification,
+    AutoTokenizer,
+    DistilBertTokenizer,
+    DistilBertForSequenceClassification
+)
 from pathlib import Path
 import logging
 import os
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
+from src.models import s3_download
+from src.models import compiled
+from src.utils import memory
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,7 +31,10 @@ class ModelLoader:
         self, 
         model_name: str = "distilbert-base-uncased",
         model_path: str = None,
-        device: str = None
+        device: str = None,
+        inference_mode: str = None,
+        sequence_buckets: tuple = None,
+        torchscript_cache_dir: str = None
     ):
         """
         Initialize model loader.
@@ -30,77 +43,118 @@ class ModelLoader:
             model_name: Hugging Face model name
             model_path: Path to fine-tuned model weights
             device: Device to load model on (cuda/cpu)
+            inference_mode: "eager" or "torchscript" (defaults to INFERENCE_MODE env var)
+            sequence_buckets: Sequence lengths to trace in torchscript mode
+            torchscript_cache_dir: Directory for traced artifacts
         """
         self.model_name = model_name
         self.model_path = model_path
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self.inference_mode = inference_mode or os.getenv("INFERENCE_MODE", "eager")
+        self.sequence_buckets = tuple(sequence_buckets or (
+            int(b) for b in os.getenv("SEQUENCE_BUCKETS", ",".join(map(str, compiled.DEFAULT_BUCKETS))).split(",")
+        ))
+        self.torchscript_cache_dir = torchscript_cache_dir or os.getenv(
+            "TORCHSCRIPT_CACHE_DIR", "/tmp/torchscript_cache"
+        )
         self.model = None
         self.tokenizer = None
         self.fine_tuned_loaded = False  # Track if fine-tuned weights were loaded
         
     def load_model(self):
         """Load model and tokenizer."""
-        try:
-            logger.info(f"Loading tokenizer: {self.model_name}")
-            self.tokenizer = DistilBertTokenizer.from_pretrained(self.model_name)
-            
-            logger.info(f"Loading base model: {self.model_name}")
-            self.model = DistilBertForSequenceClassification.from_pretrained(
-                self.model_name,
-                num_labels=6,
-                problem_type="multi_label_classification"
-            )
-            
-            # Load fine-tuned weights if available
-            if self.model_path:
-                # Check if we need to download from S3 (if not local and bucket is set)
-                if not os.path.exists(self.model_path) and os.getenv('MODEL_BUCKET'):
+        with memory.tracker.stage("model_load", always=True):
+            try:
+                model_dir = self.is_model_dir()
+                
+                if model_dir:
+                    # Self-describing artifact (e.g. a distilled student): architecture,
+                    # label count and tokenizer all come from the directory
+                    logger.info(f"Loading tokenizer: {self.model_path}")
+                    self.tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+                else:
+                    logger.info(f"Loading tokenizer: {self.model_name}")
+                    self.tokenizer = DistilBertTokenizer.from_pretrained(self.model_name)
+                
+                # Fetch from S3 when a bucket is set; a matching local copy is reused
+                if self.model_path and not model_dir and os.getenv('MODEL_BUCKET'):
                     self._download_from_s3()
-
-                model_path_obj = Path(self.model_path)
                 
-                if model_path_obj.exists():
-                    logger.info(f"📦 Fine-tuned model file found at: {self.model_path}")
-                    logger.info(f"📦 File size: {model_path_obj.stat().st_size / (1024*1024):.2f} MB")
-                    
-                    try:
-                        # Load the state dict
-                        state_dict = torch.load(self.model_path, map_location=self.device)
-                        
-                        # Load into model
-                        self.model.load_state_dict(state_dict)
-                        self.fine_tuned_loaded = True
-                        
-                        logger.info("✅ Fine-tuned weights loaded successfully!")
-                        logger.info("✅ Using YOUR trained model (not base DistilBERT)")
-                        
-                    except Exception as e:
-                        logger.error(f"❌ Error loading fine-tuned weights: {str(e)}")
-                        logger.warning("⚠️  Falling back to base DistilBERT model")
-                        self.fine_tuned_loaded = False
+                # A cached trace skips building the eager model entirely
+                if self.inference_mode == "torchscript" and self._load_torchscript_cache():
+                    return True
+                
+                if model_dir:
+                    logger.info(f"📦 Loading model directory: {self.model_path}")
+                    self.model = AutoModelForSequenceClassification.from_pretrained(self.model_path)
+                    self.fine_tuned_loaded = True
                 else:
-                    logger.warning(f"⚠️  Model file not found at: {self.model_path}")
-                    logger.warning(f"⚠️  Current working directory: {os.getcwd()}")
-                    logger.warning(f"⚠️  Using base DistilBERT model (NOT your fine-tuned model)")
+                    self._load_base_with_weights()
+                
+                # Move to device and set to eval mode
+                self.model.to(self.device)
+                self.model.eval()
+                num_labels = self.model.config.num_labels
+                
+                if self.inference_mode == "torchscript":
+                    self._compile_torchscript()
+                
+                logger.info(f"Model configuration:")
+                logger.info(f"  - Device: {self.device}")
+                logger.info(f"  - Fine-tuned: {self.fine_tuned_loaded}")
+                logger.info(f"  - Inference mode: {self.inference_mode}")
+                logger.info(f"  - Num labels: {num_labels}")
+                
+                return True
+                
+            except Exception as e:
+                logger.error(f"Error loading model: {str(e)}")
+                raise
+    
+    def _load_base_with_weights(self):
+        """Load the base model and the fine-tuned state dict from model_path."""
+        logger.info(f"Loading base model: {self.model_name}")
+        self.model = DistilBertForSequenceClassification.from_pretrained(
+            self.model_name,
+            num_labels=6,
+            problem_type="multi_label_classification"
+        )
+
+        # Load fine-tuned weights if available
+        if self.model_path:
+            model_path_obj = Path(self.model_path)
+
+            if model_path_obj.exists():
+                logger.info(f"📦 Fine-tuned model file found at: {self.model_path}")
+                logger.info(f"📦 File size: {model_path_obj.stat().st_size / (1024*1024):.2f} MB")
+
+                try:
+                    # Load the state dict
+                    state_dict = torch.load(self.model_path, map_location=self.device)
+
+                    # Load into model
+                    self.model.load_state_dict(state_dict)
+                    self.fine_tuned_loaded = True
+
+                    logger.info("✅ Fine-tuned weights loaded successfully!")
+                    logger.info("✅ Using YOUR trained model (not base DistilBERT)")
+
+                except Exception as e:
+                    logger.error(f"❌ Error loading fine-tuned weights: {str(e)}")
+                    logger.warning("⚠️  Falling back to base DistilBERT model")
                     self.fine_tuned_loaded = False
             else:
-                logger.warning("⚠️  No model_path provided. Using base DistilBERT model.")
+                logger.warning(f"⚠️  Model file not found at: {self.model_path}")
+                logger.warning(f"⚠️  Current working directory: {os.getcwd()}")
+                logger.warning(f"⚠️  Using base DistilBERT model (NOT your fine-tuned model)")
                 self.fine_tuned_loaded = False
-            
-            # Move to device and set to eval mode
-            self.model.to(self.device)
-            self.model.eval()
-            
-            logger.info(f"Model configuration:")
-            logger.info(f"  - Device: {self.device}")
-            logger.info(f"  - Fine-tuned: {self.fine_tuned_loaded}")
-            logger.info(f"  - Num labels: 6")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error loading model: {str(e)}")
-            raise
+        else:
+            logger.warning("⚠️  No model_path provided. Using base DistilBERT model.")
+            self.fine_tuned_loaded = False
+
+    def is_model_dir(self) -> bool:
+        """Check if model_path is a saved model directory (config.json + weights)."""
+        return bool(self.model_path) and os.path.isfile(os.path.join(self.model_path, "config.json"))
     
     def is_loaded(self) -> bool:
         """Check if model is loaded."""
@@ -118,25 +172,93 @@ class ModelLoader:
             raise RuntimeError("Tokenizer not loaded. Call load_model() first.")
         return self.tokenizer
 
-    def _download_from_s3(self):
-        """Download model from S3 to local path."""
+    def _torchscript_cache_key(self) -> str:
+        """Cache key for traced artifacts; prefers the S3 ETag over file stats."""
+        meta = s3_download.read_meta(self.model_path) if self.model_path else None
+        if meta:
+            return compiled.cache_key(f"{self.model_name}@{meta['etag']}", None, self.sequence_buckets)
+        return compiled.cache_key(self.model_name, self.model_path, self.sequence_buckets)
+
+    def _load_torchscript_cache(self) -> bool:
+        """Load a previously traced model from the cache directory."""
+        bucketed = compiled.load_cached(
+            self.torchscript_cache_dir, self._torchscript_cache_key(), self.device
+        )
+        if bucketed is None:
+            return False
+        self.model = bucketed
+        self.fine_tuned_loaded = bucketed.meta.get("fine_tuned", False)
+        logger.info(f"✅ Loaded TorchScript model from cache (buckets {list(bucketed.sequence_buckets)})")
+        logger.info(f"  - Fine-tuned: {self.fine_tuned_loaded}")
+        return True
+
+    def _compile_torchscript(self):
+        """Trace the eager model into sequence-length buckets and cache it."""
+        try:
+            bucketed = compiled.build_bucketed_model(
+                self.model,
+                self.sequence_buckets,
+                vocab_size=self.model.config.vocab_size,
+                device=self.device,
+                meta={"fine_tuned": self.fine_tuned_loaded, "model_name": self.model_name}
+            )
+        except Exception as e:
+            logger.error(f"❌ TorchScript tracing failed: {str(e)}")
+            logger.warning("⚠️  Falling back to eager mode")
+            self.inference_mode = "eager"
+            return
+        
+        try:
+            compiled.save_cached(bucketed, self.torchscript_cache_dir, self._torchscript_cache_key())
+        except Exception as e:
+            logger.warning(f"⚠️  Could not cache TorchScript model: {str(e)}")
+        self.model = bucketed
+
+    def _download_from_s3(self) -> bool:
+        """
+        Download model from S3 to local path.
+        
+        Skips the download when the local copy matches the object's
+        ETag/version, otherwise fetches it in parallel byte ranges and
+        verifies its sha256 before moving it into place.
+        
+        Returns:
+            True if an up-to-date verified copy is at model_path
+        """
         bucket = os.getenv('MODEL_BUCKET')
         key = os.getenv('MODEL_KEY', 'models/best_model.pt')
+        part_size = int(os.getenv('S3_DOWNLOAD_PART_MB', '16')) * 1024 * 1024
+        concurrency = int(os.getenv('S3_DOWNLOAD_CONCURRENCY', '8'))
         
-        logger.info(f"⬇️ Downloading model from S3: s3://{bucket}/{key}")
+        logger.info(f"⬇️ Checking model in S3: s3://{bucket}/{key}")
         logger.info(f"⬇️ Destination: {self.model_path}")
         
         try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+            s3_client = boto3.client(
+                's3',
+                endpoint_url=os.getenv('S3_ENDPOINT_URL'),
+                config=Config(max_pool_connections=max(10, concurrency))
+            )
+            remote = s3_download.remote_meta(s3_client, bucket, key)
             
-            s3_client = boto3.client('s3')
-            s3_client.download_file(bucket, key, self.model_path)
+            if s3_download.is_cached(self.model_path, remote):
+                logger.info(f"✅ Cached model is up to date (ETag {remote['etag']}), skipping download")
+                return True
             
+            s3_download.download_parallel(
+                s3_client, bucket, key, self.model_path,
+                part_size=part_size,
+                concurrency=concurrency,
+                remote=remote
+            )
             logger.info("✅ Model downloaded successfully!")
+            return True
             
         except ClientError as e:
             logger.error(f"❌ Failed to download model from S3: {e}")
             # Don't raise here, let the main loader handle the missing file
+        except s3_download.ChecksumMismatchError as e:
+            logger.error(f"❌ Downloaded model failed verification: {e}")
         except Exception as e:
-            logger.error(f"❌ Unexpected error downloading from S3: {e}")
\ No newline at end of file
+            logger.error(f"❌ Unexpected error downloading from S3: {e}")
+        return False
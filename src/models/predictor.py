@@ -7,6 +7,8 @@ import numpy as np
 from typing import Dict, List
 import logging
 
+from src.utils import memory
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +33,17 @@ class ToxicityPredictor:
         self.max_length = max_length
         self.device = device
         
+        # Bucketed (TorchScript) models pad each batch to the smallest bucket
+        # that fits, so inputs are not padded to max_length here
+        buckets = getattr(model, 'sequence_buckets', None)
+        self.sequence_buckets = tuple(buckets) if isinstance(buckets, tuple) else ()
+        if self.sequence_buckets and self.max_length > self.sequence_buckets[-1]:
+            logger.warning(
+                "max_length %d exceeds largest sequence bucket %d; truncating to the bucket",
+                self.max_length, self.sequence_buckets[-1]
+            )
+            self.max_length = self.sequence_buckets[-1]
+        
     def predict(self, text: str) -> Dict:
         """
         Predict toxicity for given text.
@@ -43,22 +56,23 @@ class ToxicityPredictor:
         """
         try:
             # Tokenize
-            encoded = self.tokenizer.encode_plus(
-                text,
-                add_special_tokens=True,
-                max_length=self.max_length,
-                padding='max_length',
-                truncation=True,
-                return_attention_mask=True,
-                return_tensors='pt'
-            )
+            with memory.tracker.stage("tokenize"):
+                encoded = self.tokenizer.encode_plus(
+                    text,
+                    add_special_tokens=True,
+                    max_length=self.max_length,
+                    padding=False if self.sequence_buckets else 'max_length',
+                    truncation=True,
+                    return_attention_mask=True,
+                    return_tensors='pt'
+                )
             
             # Move to device
             input_ids = encoded['input_ids'].to(self.device)
             attention_mask = encoded['attention_mask'].to(self.device)
             
             # Inference
-            with torch.no_grad():
+            with torch.no_grad(), memory.tracker.stage("forward"):
                 outputs = self.model(
                     input_ids=input_ids,
                     attention_mask=attention_mask
@@ -69,30 +83,7 @@ class ToxicityPredictor:
                 probabilities = torch.sigmoid(logits)
                 probs = probabilities.cpu().numpy()[0]
             
-            # Create results dictionary
-            toxicity_scores = {
-                label: float(prob) 
-                for label, prob in zip(self.LABEL_COLUMNS, probs)
-            }
-            
-            # Determine if toxic (any category above threshold)
-            is_toxic = any(prob > self.THRESHOLD for prob in probs)
-            
-            # Get flagged categories
-            flagged_categories = [
-                label for label, prob in toxicity_scores.items() 
-                if prob > self.THRESHOLD
-            ]
-            
-            # Calculate overall confidence (max probability)
-            confidence = float(np.max(probs))
-            
-            return {
-                'is_toxic': is_toxic,
-                'toxicity_scores': toxicity_scores,
-                'flagged_categories': flagged_categories,
-                'confidence': confidence
-            }
+            return self.format_prediction(probs)
             
         except Exception as e:
             logger.error(f"Prediction error: {str(e)}")
@@ -100,7 +91,9 @@ class ToxicityPredictor:
     
     def predict_batch(self, texts: List[str]) -> List[Dict]:
         """
-        Predict toxicity for multiple texts.
+        Predict toxicity for multiple texts in a single forward pass.
+        
+        The batch is padded to its longest text rather than max_length.
         
         Args:
             texts: List of preprocessed texts
@@ -108,4 +101,57 @@ class ToxicityPredictor:
         Returns:
             List of prediction dictionaries
         """
-        return [self.predict(text) for text in texts]
\ No newline at end of file
+        if not texts:
+            return []
+        
+        try:
+            with memory.tracker.stage("tokenize"):
+                encoded = self.tokenizer(
+                    list(texts),
+                    add_special_tokens=True,
+                    max_length=self.max_length,
+                    padding=True,
+                    truncation=True,
+                    return_attention_mask=True,
+                    return_tensors='pt'
+                )
+            
+            with torch.no_grad(), memory.tracker.stage("forward"):
+                outputs = self.model(
+                    input_ids=encoded['input_ids'].to(self.device),
+                    attention_mask=encoded['attention_mask'].to(self.device)
+                )
+                probs = torch.sigmoid(outputs.logits).cpu().numpy()
+            
+            return [self.format_prediction(row) for row in probs]
+            
+        except Exception as e:
+            logger.error(f"Batch prediction error: {str(e)}")
+            raise
+    
+    def format_prediction(self, probs: np.ndarray) -> Dict:
+        """Build the prediction dictionary from one row of label probabilities."""
+        # Create results dictionary
+        toxicity_scores = {
+            label: float(prob) 
+            for label, prob in zip(self.LABEL_COLUMNS, probs)
+        }
+        
+        # Determine if toxic (any category above threshold)
+        is_toxic = any(prob > self.THRESHOLD for prob in probs)
+        
+        # Get flagged categories
+        flagged_categories = [
+            label for label, prob in toxicity_scores.items() 
+            if prob > self.THRESHOLD
+        ]
+        
+        # Calculate overall confidence (max probability)
+        confidence = float(np.max(probs))
+        
+        return {
+            'is_toxic': is_toxic,
+            'toxicity_scores': toxicity_scores,
+            'flagged_categories': flagged_categories,
+            'confidence': confidence
+        }
\ No newline at end of file
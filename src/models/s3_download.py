@@ -0,0 +1,187 @@
+"""
+Parallel, verified download of model artifacts from S3.
+Objects are fetched in byte-range parts into a temporary file, checked
+against the sha256 recorded in the object's metadata by
+scripts/upload_model.py, and moved into place atomically. A sidecar
+file records the ETag/version so warm containers only re-download when
+the object in S3 changes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKSUM_METADATA_KEY = "sha256"  # x-amz-meta-sha256, written by scripts/upload_model.py
+READ_CHUNK = 1024 * 1024
+
+
+class ChecksumMismatchError(Exception):
+    """Raised when a downloaded artifact does not match its recorded checksum."""
+
+
+def sha256_file(path: str) -> str:
+    """Hex sha256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(8 * READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def meta_path_for(path: str) -> str:
+    """Location of the sidecar file describing a cached artifact."""
+    return f"{path}.meta.json"
+
+
+def read_meta(path: str) -> Optional[Dict]:
+    """Read the sidecar metadata for a cached artifact, if any."""
+    try:
+        with open(meta_path_for(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_meta(path: str, meta: Dict):
+    """Atomically write the sidecar metadata for a cached artifact."""
+    tmp = f"{meta_path_for(path)}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path_for(path))
+
+
+def remove_meta(path: str):
+    """Delete the sidecar metadata for a cached artifact, if any."""
+    try:
+        os.remove(meta_path_for(path))
+    except FileNotFoundError:
+        pass
+
+
+def remote_meta(s3_client, bucket: str, key: str) -> Dict:
+    """
+    Describe the current S3 object.
+
+    Returns:
+        Dictionary with etag, version_id, size and sha256 (None if not recorded)
+    """
+    head = s3_client.head_object(Bucket=bucket, Key=key)
+    return {
+        "bucket": bucket,
+        "key": key,
+        "etag": head["ETag"].strip('"'),
+        "version_id": head.get("VersionId"),
+        "size": head["ContentLength"],
+        "sha256": head.get("Metadata", {}).get(CHECKSUM_METADATA_KEY)
+    }
+
+
+def is_cached(path: str, remote: Dict) -> bool:
+    """
+    Check whether the local copy matches the remote object.
+
+    A copy without a sidecar is adopted if its checksum matches the one
+    recorded in S3, so manually placed files aren't downloaded again.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) != remote["size"]:
+        return False
+
+    local = read_meta(path)
+    if local is not None:
+        return all(local.get(field) == remote[field] for field in ("etag", "version_id", "size"))
+
+    if remote["sha256"] and sha256_file(path) == remote["sha256"]:
+        write_meta(path, remote)
+        return True
+    return False
+
+
+def download_parallel(
+    s3_client,
+    bucket: str,
+    key: str,
+    dest: str,
+    part_size: int = 16 * 1024 * 1024,
+    concurrency: int = 8,
+    remote: Dict = None
+) -> Dict:
+    """
+    Download an object in parallel byte ranges and move it into place atomically.
+
+    Args:
+        s3_client: boto3 S3 client (thread-safe)
+        bucket: S3 bucket name
+        key: S3 object key
+        dest: Final local path
+        part_size: Bytes per ranged GET
+        concurrency: Number of parts fetched at once
+        remote: Result of remote_meta() if already fetched
+
+    Returns:
+        The remote metadata recorded for the downloaded file
+
+    Raises:
+        ChecksumMismatchError: If the download doesn't match the recorded sha256
+    """
+    remote = remote or remote_meta(s3_client, bucket, key)
+    size = remote["size"]
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    tmp = f"{dest}.part-{os.getpid()}"
+
+    def fetch(start: int):
+        end = min(start + part_size, size) - 1
+        response = s3_client.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=remote["etag"]
+        )
+        body = response["Body"]
+        offset = start
+        for chunk in iter(lambda: body.read(READ_CHUNK), b""):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+        if offset != end + 1:
+            raise IOError(f"Short read for bytes {start}-{end}: got {offset - start} bytes")
+
+    start_time = time.perf_counter()
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.ftruncate(fd, size)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # list() re-raises the first failed part
+            list(pool.map(fetch, range(0, size, part_size)))
+        os.fsync(fd)
+    except BaseException:
+        os.close(fd)
+        os.remove(tmp)
+        raise
+    os.close(fd)
+    elapsed = time.perf_counter() - start_time
+
+    if remote["sha256"]:
+        actual = sha256_file(tmp)
+        if actual != remote["sha256"]:
+            os.remove(tmp)
+            raise ChecksumMismatchError(
+                f"sha256 mismatch for s3://{bucket}/{key}: expected {remote['sha256']}, got {actual}"
+            )
+    else:
+        logger.warning("⚠️  No sha256 recorded for s3://%s/%s; skipping verification", bucket, key)
+
+    # Drop the old sidecar first: a crash before write_meta must not leave
+    # it describing the new file. A copy without one is re-verified by sha256.
+    remove_meta(dest)
+    os.replace(tmp, dest)
+    write_meta(dest, remote)
+
+    mb = size / (1024 * 1024)
+    logger.info(
+        "✅ Downloaded %.2f MB in %.2fs (%.1f MB/s, %d parts, %d threads)",
+        mb, elapsed, mb / elapsed if elapsed > 0 else float("inf"),
+        max(1, -(-size // part_size)), concurrency
+    )
+    return remote
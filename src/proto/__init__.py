@@ -0,0 +1,5 @@
+"""
+Proto Package
+
+Protocol buffer messages and gRPC stubs generated from moderation.proto.
+"""
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: src/proto/moderation.proto
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1asrc/proto/moderation.proto\x12\rmoderation.v1\"R\n\x0fModerateRequest\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\n\n\x02id\x18\x02 \x01(\t\x12\x10\n\x08priority\x18\x03 \x01(\t\x12\x13\n\x0b\x64\x65\x61\x64line_ms\x18\x04 \x01(\r\"r\n\x10ModerateResponse\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08is_toxic\x18\x02 \x01(\x08\x12\x0e\n\x06scores\x18\x03 \x03(\x02\x12\r\n\x05\x66lags\x18\x04 \x01(\r\x12\x12\n\nconfidence\x18\x05 \x01(\x02\x12\r\n\x05\x65rror\x18\x06 \x01(\t\"L\n\x14\x42\x61tchModerateRequest\x12\r\n\x05texts\x18\x01 \x03(\t\x12\x10\n\x08priority\x18\x02 \x01(\t\x12\x13\n\x0b\x64\x65\x61\x64line_ms\x18\x03 \x01(\r\"I\n\x15\x42\x61tchModerateResponse\x12\x30\n\x07results\x18\x01 \x03(\x0b\x32\x1f.moderation.v1.ModerateResponse\"\x0f\n\rLabelsRequest\"3\n\x0eLabelsResponse\x12\x0e\n\x06labels\x18\x01 \x03(\t\x12\x11\n\tthreshold\x18\x02 \x01(\x02\x32\xd3\x02\n\nModeration\x12K\n\x08Moderate\x12\x1e.moderation.v1.ModerateRequest\x1a\x1f.moderation.v1.ModerateResponse\x12Z\n\rModerateBatch\x12#.moderation.v1.BatchModerateRequest\x1a$.moderation.v1.BatchModerateResponse\x12U\n\x0eModerateStream\x12\x1e.moderation.v1.ModerateRequest\x1a\x1f.moderation.v1.ModerateResponse(\x01\x30\x01\x12\x45\n\x06Labels\x12\x1c.moderation.v1.LabelsRequest\x1a\x1d.moderation.v1.LabelsResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'src.proto.moderation_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_MODERATEREQUEST']._serialized_start=45
+  _globals['_MODERATEREQUEST']._serialized_end=127
+  _globals['_MODERATERESPONSE']._serialized_start=129
+  _globals['_MODERATERESPONSE']._serialized_end=243
+  _globals['_BATCHMODERATEREQUEST']._serialized_start=245
+  _globals['_BATCHMODERATEREQUEST']._serialized_end=321
+  _globals['_BATCHMODERATERESPONSE']._serialized_start=323
+  _globals['_BATCHMODERATERESPONSE']._serialized_end=396
+  _globals['_LABELSREQUEST']._serialized_start=398
+  _globals['_LABELSREQUEST']._serialized_end=413
+  _globals['_LABELSRESPONSE']._serialized_start=415
+  _globals['_LABELSRESPONSE']._serialized_end=466
+  _globals['_MODERATION']._serialized_start=469
+  _globals['_MODERATION']._serialized_end=808
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,170 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from src.proto import moderation_pb2 as src_dot_proto_dot_moderation__pb2
+
+
+class ModerationStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Moderate = channel.unary_unary(
+                '/moderation.v1.Moderation/Moderate',
+                request_serializer=src_dot_proto_dot_moderation__pb2.ModerateRequest.SerializeToString,
+                response_deserializer=src_dot_proto_dot_moderation__pb2.ModerateResponse.FromString,
+                )
+        self.ModerateBatch = channel.unary_unary(
+                '/moderation.v1.Moderation/ModerateBatch',
+                request_serializer=src_dot_proto_dot_moderation__pb2.BatchModerateRequest.SerializeToString,
+                response_deserializer=src_dot_proto_dot_moderation__pb2.BatchModerateResponse.FromString,
+                )
+        self.ModerateStream = channel.stream_stream(
+                '/moderation.v1.Moderation/ModerateStream',
+                request_serializer=src_dot_proto_dot_moderation__pb2.ModerateRequest.SerializeToString,
+                response_deserializer=src_dot_proto_dot_moderation__pb2.ModerateResponse.FromString,
+                )
+        self.Labels = channel.unary_unary(
+                '/moderation.v1.Moderation/Labels',
+                request_serializer=src_dot_proto_dot_moderation__pb2.LabelsRequest.SerializeToString,
+                response_deserializer=src_dot_proto_dot_moderation__pb2.LabelsResponse.FromString,
+                )
+
+
+class ModerationServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def Moderate(self, request, context):
+        """One text per call.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ModerateBatch(self, request, context):
+        """Several texts in one forward pass; results are in request order.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ModerateStream(self, request_iterator, context):
+        """Long-lived stream; the server micro-batches messages that arrive close
+        together and answers each one in arrival order, echoing its id.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Labels(self, request, context):
+        """Label order used by the scores and flags fields.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_ModerationServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Moderate': grpc.unary_unary_rpc_method_handler(
+                    servicer.Moderate,
+                    request_deserializer=src_dot_proto_dot_moderation__pb2.ModerateRequest.FromString,
+                    response_serializer=src_dot_proto_dot_moderation__pb2.ModerateResponse.SerializeToString,
+            ),
+            'ModerateBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.ModerateBatch,
+                    request_deserializer=src_dot_proto_dot_moderation__pb2.BatchModerateRequest.FromString,
+                    response_serializer=src_dot_proto_dot_moderation__pb2.BatchModerateResponse.SerializeToString,
+            ),
+            'ModerateStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.ModerateStream,
+                    request_deserializer=src_dot_proto_dot_moderation__pb2.ModerateRequest.FromString,
+                    response_serializer=src_dot_proto_dot_moderation__pb2.ModerateResponse.SerializeToString,
+            ),
+            'Labels': grpc.unary_unary_rpc_method_handler(
+                    servicer.Labels,
+                    request_deserializer=src_dot_proto_dot_moderation__pb2.LabelsRequest.FromString,
+                    response_serializer=src_dot_proto_dot_moderation__pb2.LabelsResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'moderation.v1.Moderation', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Moderation(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def Moderate(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/moderation.v1.Moderation/Moderate',
+            src_dot_proto_dot_moderation__pb2.ModerateRequest.SerializeToString,
+            src_dot_proto_dot_moderation__pb2.ModerateResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ModerateBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/moderation.v1.Moderation/ModerateBatch',
+            src_dot_proto_dot_moderation__pb2.BatchModerateRequest.SerializeToString,
+            src_dot_proto_dot_moderation__pb2.BatchModerateResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ModerateStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/moderation.v1.Moderation/ModerateStream',
+            src_dot_proto_dot_moderation__pb2.ModerateRequest.SerializeToString,
+            src_dot_proto_dot_moderation__pb2.ModerateResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Labels(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/moderation.v1.Moderation/Labels',
+            src_dot_proto_dot_moderation__pb2.LabelsRequest.SerializeToString,
+            src_dot_proto_dot_moderation__pb2.LabelsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
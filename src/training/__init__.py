@@ -0,0 +1,10 @@
+"""
+Training Package
+
+Offline data preparation and model training utilities, kept CPU-runnable
+and consistent with the serving preprocessing.
+"""
+
+from src.training.data import LABEL_COLUMNS, load_processed_csv
+
+__all__ = ["LABEL_COLUMNS", "load_processed_csv"]
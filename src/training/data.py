@@ -0,0 +1,90 @@
+"""
+Training data loading and batching.
+Reads the CSV splits written by notebooks/02_data_preprocessing.ipynb and
+re-applies the serving clean_text so offline scores match the API.
+"""
+
+import logging
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import torch
+
+from src.models.predictor import ToxicityPredictor
+from src.utils.text_processing import clean_text
+
+logger = logging.getLogger(__name__)
+
+LABEL_COLUMNS = ToxicityPredictor.LABEL_COLUMNS
+
+
+def load_processed_csv(path: str, max_samples: Optional[int] = None, seed: int = 42) -> Tuple[List[str], np.ndarray]:
+    """
+    Load a processed split (comment_text + one column per label).
+
+    Args:
+        path: CSV written by the preprocessing notebook
+        max_samples: Optional random subsample size
+        seed: Subsampling seed
+
+    Returns:
+        (cleaned texts, float32 label matrix of shape [n, len(LABEL_COLUMNS)])
+    """
+    df = pd.read_csv(path, usecols=["comment_text", *LABEL_COLUMNS])
+    if max_samples and len(df) > max_samples:
+        df = df.sample(n=max_samples, random_state=seed)
+
+    texts = [clean_text(text) for text in df["comment_text"].fillna("").astype(str)]
+    labels = df[LABEL_COLUMNS].to_numpy(dtype=np.float32)
+
+    keep = [i for i, text in enumerate(texts) if text]
+    if len(keep) < len(texts):
+        logger.info("Dropped %d rows that were empty after cleaning", len(texts) - len(keep))
+    return [texts[i] for i in keep], labels[keep]
+
+
+def pos_weight(labels: np.ndarray, max_weight: Optional[float] = None) -> torch.Tensor:
+    """
+    Per-label negative/positive ratio for BCEWithLogitsLoss.
+
+    Matches notebooks/03_model_training.ipynb: uncapped, and 1.0 for a label
+    with no positives.
+
+    Args:
+        labels: Binary labels [rows, labels]
+        max_weight: Optional cap, e.g. for small subsamples where a rare label's
+            ratio explodes (None keeps the notebook's weights)
+    """
+    positives = labels.sum(axis=0)
+    negatives = len(labels) - positives
+    weights = np.where(positives > 0, negatives / np.maximum(positives, 1), 1.0)
+    if max_weight is not None:
+        weights = np.minimum(weights, max_weight)
+    return torch.tensor(weights, dtype=torch.float32)
+
+
+def length_sorted_batches(
+    tokenizer,
+    texts: Sequence[str],
+    batch_size: int,
+    max_length: int
+) -> Iterator[Tuple[np.ndarray, dict]]:
+    """
+    Tokenize texts in length-sorted batches padded only to the batch maximum.
+
+    Yields:
+        (original indices, encoded batch tensors)
+    """
+    lengths = [len(ids) for ids in tokenizer(list(texts), truncation=True, max_length=max_length)["input_ids"]]
+    order = np.argsort(lengths, kind="stable")
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        encoded = tokenizer(
+            [texts[i] for i in indices],
+            truncation=True,
+            max_length=max_length,
+            padding=True,
+            return_tensors="pt"
+        )
+        yield indices, encoded
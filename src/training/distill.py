@@ -0,0 +1,351 @@
+"""
+Knowledge distillation of the fine-tuned classifier into a smaller student.
+
+The student keeps the teacher's tokenizer and embeddings and an evenly
+spaced subset of its transformer layers, then trains on a mix of the hard
+labels (the notebook's weighted BCE; --max-pos-weight optionally caps the
+weights) and the teacher's temperature-softened scores. The result is
+saved as a model directory that ModelLoader loads via MODEL_PATH,
+alongside a report comparing per-label AUC and latency.
+
+Usage:
+    python -m src.training.distill --train data/train_processed.csv \\
+        --test data/test_processed.csv --teacher-path models/best_model.pt \\
+        --output models/student --layers 2
+"""
+
+import argparse
+import copy
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from sklearn.metrics import roc_auc_score
+from transformers import get_linear_schedule_with_warmup
+
+from src.models.model_loader import ModelLoader
+from src.models.predictor import ToxicityPredictor
+from src.training.data import LABEL_COLUMNS, length_sorted_batches, load_processed_csv, pos_weight
+
+logger = logging.getLogger(__name__)
+
+LAYER_PATTERN = re.compile(r"\.layer\.(\d+)\.")
+REPORT_FILE = "distill_report.json"
+
+
+def num_layers(model) -> int:
+    """Number of transformer layers in a Hugging Face model."""
+    return model.config.num_hidden_layers
+
+
+def init_student_from_teacher(teacher, n_layers: int):
+    """
+    Build a shallower copy of the teacher.
+
+    Embeddings and the classification head are copied as-is; student layer i
+    is initialized from an evenly spaced teacher layer.
+
+    Args:
+        teacher: Hugging Face sequence classification model
+        n_layers: Number of layers in the student
+
+    Returns:
+        Student model of the same class as the teacher
+    """
+    teacher_layers = num_layers(teacher)
+    if not 0 < n_layers <= teacher_layers:
+        raise ValueError(f"Student layers must be in 1..{teacher_layers}, got {n_layers}")
+
+    config = copy.deepcopy(teacher.config)
+    config.num_hidden_layers = n_layers
+    student = type(teacher)(config)
+
+    chosen = np.linspace(0, teacher_layers - 1, n_layers).round().astype(int).tolist()
+    source_for = {teacher_idx: student_idx for student_idx, teacher_idx in enumerate(chosen)}
+
+    state = {}
+    for name, tensor in teacher.state_dict().items():
+        match = LAYER_PATTERN.search(name)
+        if match is None:
+            state[name] = tensor
+        elif int(match.group(1)) in source_for:
+            student_idx = source_for[int(match.group(1))]
+            state[LAYER_PATTERN.sub(f".layer.{student_idx}.", name, count=1)] = tensor
+    student.load_state_dict(state)
+
+    logger.info("🎓 Student initialized with teacher layers %s", chosen)
+    return student
+
+
+def distillation_loss(
+    student_logits: torch.Tensor,
+    teacher_logits: torch.Tensor,
+    labels: torch.Tensor,
+    label_weights: torch.Tensor,
+    alpha: float = 0.5,
+    temperature: float = 2.0
+) -> torch.Tensor:
+    """
+    Weighted mix of hard-label BCE and soft-target BCE against the teacher.
+
+    Each label is an independent sigmoid, so the soft term is a binary
+    cross-entropy against the teacher's tempered probabilities, scaled by T^2
+    to keep gradient magnitudes comparable across temperatures.
+    """
+    hard = F.binary_cross_entropy_with_logits(student_logits, labels, pos_weight=label_weights)
+    soft = F.binary_cross_entropy_with_logits(
+        student_logits / temperature, torch.sigmoid(teacher_logits / temperature)
+    )
+    return alpha * hard + (1 - alpha) * soft * temperature ** 2
+
+
+def batch_logits(model, tokenizer, texts: Sequence[str], batch_size: int = 32, max_length: int = 256) -> np.ndarray:
+    """
+    Logits for every text, computed in length-sorted, dynamically padded batches.
+
+    Returns:
+        float32 array of shape [len(texts), num_labels] in input order
+    """
+    model.eval()
+    logits = np.zeros((len(texts), model.config.num_labels), dtype=np.float32)
+    with torch.no_grad():
+        for indices, encoded in length_sorted_batches(tokenizer, texts, batch_size, max_length):
+            logits[indices] = model(**encoded).logits.numpy()
+    return logits
+
+
+def train_student(
+    student,
+    tokenizer,
+    texts: List[str],
+    labels: np.ndarray,
+    teacher_logits: np.ndarray,
+    epochs: int = 3,
+    batch_size: int = 16,
+    learning_rate: float = 5e-5,
+    warmup_ratio: float = 0.1,
+    max_length: int = 256,
+    alpha: float = 0.5,
+    temperature: float = 2.0,
+    max_pos_weight: float = None,
+    seed: int = 42
+):
+    """Train the student on hard labels plus teacher soft targets."""
+    generator = np.random.default_rng(seed)
+    torch.manual_seed(seed)
+    label_weights = pos_weight(labels, max_weight=max_pos_weight)
+
+    steps_per_epoch = -(-len(texts) // batch_size)
+    total_steps = steps_per_epoch * epochs
+    optimizer = torch.optim.AdamW(student.parameters(), lr=learning_rate, weight_decay=0.01)
+    scheduler = get_linear_schedule_with_warmup(optimizer, int(total_steps * warmup_ratio), total_steps)
+
+    student.train()
+    for epoch in range(epochs):
+        order = generator.permutation(len(texts))
+        epoch_loss = 0.0
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            encoded = tokenizer(
+                [texts[i] for i in indices],
+                truncation=True,
+                max_length=max_length,
+                padding=True,
+                return_tensors="pt"
+            )
+            outputs = student(**encoded)
+            loss = distillation_loss(
+                outputs.logits,
+                torch.from_numpy(teacher_logits[indices]),
+                torch.from_numpy(labels[indices]),
+                label_weights,
+                alpha=alpha,
+                temperature=temperature
+            )
+            optimizer.zero_grad()
+            loss.backward()
+            torch.nn.utils.clip_grad_norm_(student.parameters(), 1.0)
+            optimizer.step()
+            scheduler.step()
+            epoch_loss += loss.item()
+        logger.info("Epoch %d/%d: loss %.4f", epoch + 1, epochs, epoch_loss / steps_per_epoch)
+
+    student.eval()
+    return student
+
+
+def per_label_auc(labels: np.ndarray, scores: np.ndarray) -> Dict[str, float]:
+    """ROC AUC per label, None where the split has a single class, plus the macro mean."""
+    aucs = {}
+    for i, label in enumerate(LABEL_COLUMNS):
+        column = labels[:, i]
+        aucs[label] = float(roc_auc_score(column, scores[:, i])) if 0 < column.sum() < len(column) else None
+    defined = [v for v in aucs.values() if v is not None]
+    aucs["macro"] = float(np.mean(defined)) if defined else None
+    return aucs
+
+
+def measure_latency(model, tokenizer, texts: Sequence[str], max_length: int = 256, samples: int = 50) -> Dict[str, float]:
+    """Single-request latency through ToxicityPredictor, as the API serves it."""
+    predictor = ToxicityPredictor(model, tokenizer, max_length=max_length)
+    texts = list(texts)[:samples] or ["hello world"]
+    predictor.predict(texts[0])  # Warm-up
+
+    timings = []
+    for text in texts:
+        start = time.perf_counter()
+        predictor.predict(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(float(np.percentile(timings, 50)), 3),
+        "p95_ms": round(float(np.percentile(timings, 95)), 3),
+        "mean_ms": round(float(np.mean(timings)), 3)
+    }
+
+
+def parameter_count(model) -> int:
+    return sum(p.numel() for p in model.parameters())
+
+
+def distill(
+    train_path: str,
+    test_path: str,
+    output_dir: str,
+    teacher_name: str = "distilbert-base-uncased",
+    teacher_path: str = None,
+    student_layers: int = 2,
+    epochs: int = 3,
+    batch_size: int = 16,
+    learning_rate: float = 5e-5,
+    max_length: int = 256,
+    alpha: float = 0.5,
+    temperature: float = 2.0,
+    max_train_samples: int = None,
+    max_test_samples: int = None,
+    latency_samples: int = 50,
+    max_pos_weight: float = None
+) -> Dict:
+    """
+    Distill the teacher into a student, save it and report quality and latency.
+
+    Args:
+        train_path: Processed training split CSV
+        test_path: Processed held-out split CSV
+        output_dir: Directory for the student model, tokenizer and report
+        teacher_name: Base model name of the teacher
+        teacher_path: Teacher weights (.pt state dict) or model directory
+        student_layers: Transformer layers kept in the student
+        epochs: Training epochs
+        batch_size: Training batch size
+        learning_rate: Peak learning rate
+        max_length: Maximum sequence length
+        alpha: Weight of the hard-label loss (1 - alpha goes to the teacher)
+        temperature: Softening temperature for teacher scores
+        max_train_samples: Optional training subsample
+        max_test_samples: Optional evaluation subsample
+        latency_samples: Texts timed one at a time per model
+        max_pos_weight: Cap on pos_weight (None keeps the notebook's uncapped ratios)
+
+    Returns:
+        Report dictionary (also written to output_dir/distill_report.json)
+    """
+    loader = ModelLoader(model_name=teacher_name, model_path=teacher_path, device="cpu", inference_mode="eager")
+    loader.load_model()
+    teacher, tokenizer = loader.get_model(), loader.get_tokenizer()
+
+    train_texts, train_labels = load_processed_csv(train_path, max_train_samples)
+    test_texts, test_labels = load_processed_csv(test_path, max_test_samples)
+    logger.info("📚 %d training and %d held-out texts", len(train_texts), len(test_texts))
+
+    start = time.perf_counter()
+    teacher_train_logits = batch_logits(teacher, tokenizer, train_texts, max_length=max_length)
+    logger.info("Teacher scored the training set in %.1fs", time.perf_counter() - start)
+
+    student = init_student_from_teacher(teacher, student_layers)
+    start = time.perf_counter()
+    train_student(
+        student, tokenizer, train_texts, train_labels, teacher_train_logits,
+        epochs=epochs, batch_size=batch_size, learning_rate=learning_rate,
+        max_length=max_length, alpha=alpha, temperature=temperature, max_pos_weight=max_pos_weight
+    )
+    train_seconds = time.perf_counter() - start
+
+    os.makedirs(output_dir, exist_ok=True)
+    student.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+
+    report = {"train_seconds": round(train_seconds, 1), "models": {}}
+    for name, model in (("teacher", teacher), ("student", student)):
+        scores = 1 / (1 + np.exp(-batch_logits(model, tokenizer, test_texts, max_length=max_length)))
+        report["models"][name] = {
+            "layers": num_layers(model),
+            "parameters": parameter_count(model),
+            "auc": per_label_auc(test_labels, scores),
+            "latency": measure_latency(model, tokenizer, test_texts, max_length, latency_samples)
+        }
+
+    with open(os.path.join(output_dir, REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info("✅ Student saved to %s", output_dir)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distill the toxicity classifier into a smaller student")
+    parser.add_argument("--train", required=True, help="Processed training CSV")
+    parser.add_argument("--test", required=True, help="Processed held-out CSV")
+    parser.add_argument("--output", default="models/student", help="Output model directory")
+    parser.add_argument("--teacher-name", default=os.getenv("MODEL_NAME", "distilbert-base-uncased"))
+    parser.add_argument("--teacher-path", default=os.getenv("MODEL_PATH", "models/best_model.pt"))
+    parser.add_argument("--layers", type=int, default=2, help="Student transformer layers")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--learning-rate", type=float, default=5e-5)
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--alpha", type=float, default=0.5, help="Hard-label loss weight")
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--max-train-samples", type=int, default=None)
+    parser.add_argument("--max-test-samples", type=int, default=None)
+    parser.add_argument("--max-pos-weight", type=float, default=None,
+                        help="Cap on per-label pos_weight (default: uncapped, as in the notebook)")
+    parser.add_argument("--threads", type=int, default=None, help="Torch intra-op threads")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    report = distill(
+        args.train, args.test, args.output,
+        teacher_name=args.teacher_name,
+        teacher_path=args.teacher_path,
+        student_layers=args.layers,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.learning_rate,
+        max_length=args.max_length,
+        alpha=args.alpha,
+        temperature=args.temperature,
+        max_train_samples=args.max_train_samples,
+        max_test_samples=args.max_test_samples,
+        max_pos_weight=args.max_pos_weight
+    )
+
+    print(f"{'':10}{'layers':>8}{'params':>12}{'macro AUC':>11}{'p50 ms':>9}{'p95 ms':>9}")
+    for name, row in report["models"].items():
+        macro = row["auc"]["macro"]
+        print(
+            f"{name:10}{row['layers']:>8}{row['parameters']:>12,}"
+            f"{str(macro if macro is None else round(macro, 4)):>11}"
+            f"{row['latency']['p50_ms']:>9}{row['latency']['p95_ms']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
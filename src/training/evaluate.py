@@ -0,0 +1,415 @@
+"""
+Offline evaluation of model variants on a held-out split.
+
+Each variant (a checkpoint, optionally TorchScript-compiled or int8
+quantized) runs batched inference over the pre-tokenized split once. Its
+logits are cached as a memory-mapped float32 array keyed by the model
+artifact, variant options and dataset. Re-evaluating with new thresholds
+or against another variant then needs no inference at all. All metrics are
+computed with array operations over the cached scores:
+
+- per-label ROC AUC (rank based, ties averaged)
+- precision / recall / F1 for every label over a threshold grid and at
+  the operating thresholds (ToxicityPredictor.THRESHOLD unless given)
+- agreement of each variant with the first one (flags, verdicts, scores)
+
+Latency is measured per variant next to the quality numbers: batch
+throughput from the (cached) inference run and single-request latency
+re-measured on every run.
+
+Usage:
+    python -m src.training.evaluate --test data/test_processed.csv \\
+        --variant baseline=models/best_model.pt \\
+        --variant int8=models/best_model.pt:int8 \\
+        --variant student=models/student --thresholds thresholds.json
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+from src.models.model_loader import ModelLoader
+from src.models.predictor import ToxicityPredictor
+from src.training.data import LABEL_COLUMNS
+from src.training.token_cache import DEFAULT_CACHE_DIR, TokenizedDataset
+
+logger = logging.getLogger(__name__)
+
+VARIANT_OPTIONS = ("torchscript", "int8")
+DEFAULT_GRID = np.round(np.arange(0.05, 1.0, 0.05), 2)
+REPORT_FILE = "evaluation_report.json"
+
+
+class Variant:
+    """A model artifact plus how it is compiled or quantized for serving."""
+
+    def __init__(self, name: str, model_path: Optional[str], options: Sequence[str] = (),
+                 model_name: str = "distilbert-base-uncased"):
+        unknown = set(options) - set(VARIANT_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown variant options {sorted(unknown)}; expected {VARIANT_OPTIONS}")
+        if {"torchscript", "int8"} <= set(options):
+            raise ValueError("int8 quantization applies to eager models only")
+        self.name = name
+        self.model_path = model_path
+        self.options = tuple(sorted(options))
+        self.model_name = model_name
+
+    @classmethod
+    def parse(cls, spec: str, model_name: str = "distilbert-base-uncased") -> "Variant":
+        """Parse `name=path[:option...]`, e.g. `q8=models/best_model.pt:int8`."""
+        name, _, rest = spec.partition("=")
+        if not rest:
+            raise ValueError(f"Variant must look like name=path[:option...], got {spec!r}")
+        path, *options = rest.split(":")
+        return cls(name, path or None, options, model_name)
+
+    def fingerprint(self) -> str:
+        """Hash of the artifact's bytes (or the base model name) and the variant options."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps([self.model_name, self.options]).encode())
+        if self.model_path and os.path.exists(self.model_path):
+            if os.path.isdir(self.model_path):
+                files = sorted(
+                    os.path.join(root, name) for root, _, names in os.walk(self.model_path) for name in names
+                )
+            else:
+                files = [self.model_path]
+            for path in files:
+                digest.update(os.path.relpath(path, self.model_path).encode())
+                with open(path, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+        else:
+            digest.update(str(self.model_path).encode())
+        return digest.hexdigest()
+
+    def load(self) -> Tuple[object, object]:
+        """(model, tokenizer) prepared the way the API would serve this variant."""
+        loader = ModelLoader(
+            model_name=self.model_name,
+            model_path=self.model_path,
+            device="cpu",
+            inference_mode="torchscript" if "torchscript" in self.options else "eager"
+        )
+        loader.load_model()
+        model = loader.get_model()
+        if "int8" in self.options:
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model, loader.get_tokenizer()
+
+
+def sigmoid(logits: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-logits))
+
+
+@torch.no_grad()
+def run_inference(model, dataset: TokenizedDataset, batch_size: int = 64) -> Tuple[np.ndarray, Dict]:
+    """
+    Logits for every row, computed in length-sorted batches.
+
+    Returns:
+        (float32 logits [rows, labels] in dataset order, throughput stats)
+    """
+    logits = np.empty((len(dataset), len(LABEL_COLUMNS)), dtype=np.float32)
+    order = np.argsort(np.asarray(dataset.lengths), kind="stable")
+    if len(order):
+        warmup = dataset.collate([dataset[i] for i in order[:batch_size]])
+        model(input_ids=warmup["input_ids"], attention_mask=warmup["attention_mask"])
+    start = time.perf_counter()
+    for offset in range(0, len(order), batch_size):
+        indices = order[offset:offset + batch_size]
+        batch = dataset.collate([dataset[i] for i in indices])
+        logits[indices] = model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"]).logits.numpy()
+    seconds = time.perf_counter() - start
+    return logits, {
+        "batch_size": batch_size,
+        "seconds": round(seconds, 3),
+        "texts_per_s": round(len(order) / seconds, 1) if seconds else None
+    }
+
+
+@torch.no_grad()
+def single_latency(model, dataset: TokenizedDataset, samples: int = 50) -> Dict[str, float]:
+    """Batch-of-one latency over evenly spaced rows, as an interactive request sees the model."""
+    if not len(dataset) or samples <= 0:
+        return {"p50_ms": None, "p95_ms": None}
+    rows = np.linspace(0, len(dataset) - 1, num=min(samples, len(dataset))).astype(int)
+    timings = []
+    for row in [rows[0], *rows]:  # The first call warms up
+        batch = dataset.collate([dataset[row]])
+        begin = time.perf_counter()
+        model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"])
+        timings.append((time.perf_counter() - begin) * 1000)
+    timings = timings[1:]
+    return {
+        "p50_ms": round(float(np.percentile(timings, 50)), 3),
+        "p95_ms": round(float(np.percentile(timings, 95)), 3)
+    }
+
+
+def cached_logits(
+    variant: Variant,
+    test_csv: str,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    max_length: int = 256,
+    batch_size: int = 64,
+    latency_samples: int = 50
+) -> Tuple[np.ndarray, np.ndarray, Dict]:
+    """
+    Load (or compute and cache) a variant's logits on a split.
+
+    Returns:
+        (memory-mapped logits, labels, variant info including latency)
+    """
+    model, tokenizer = variant.load()
+    dataset = TokenizedDataset.from_csv(test_csv, tokenizer, cache_dir, max_length=max_length)
+    key = hashlib.blake2b(
+        json.dumps([variant.fingerprint(), dataset.meta["source_digest"], dataset.meta["tokenizer_digest"],
+                    dataset.meta["clean_text_version"], max_length]).encode(),
+        digest_size=12
+    ).hexdigest()
+    logits_dir = os.path.join(cache_dir, "logits")
+    path = os.path.join(logits_dir, f"{key}.f32")
+    meta_path = os.path.join(logits_dir, f"{key}.json")
+    shape = (len(dataset), len(LABEL_COLUMNS))
+
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            info = json.load(f)
+        info["cached"] = True
+        logger.info("✅ Logits cache hit for %s", variant.name)
+    else:
+        logger.info("Running %s over %d texts", variant.name, len(dataset))
+        logits, throughput = run_inference(model, dataset, batch_size)
+        os.makedirs(logits_dir, exist_ok=True)
+        logits.tofile(path + ".tmp")
+        os.replace(path + ".tmp", path)
+        info = {"model_path": variant.model_path, "options": list(variant.options), "rows": shape[0],
+                "throughput": throughput}
+        with open(meta_path, "w") as f:
+            json.dump(info, f, indent=2)
+        info["cached"] = False
+
+    info["latency"] = single_latency(model, dataset, latency_samples)
+    logits = np.memmap(path, dtype=np.float32, mode="r", shape=shape) if shape[0] else np.empty(shape, np.float32)
+    return logits, np.asarray(dataset.labels, dtype=np.float32), info
+
+
+def average_ranks(scores: np.ndarray) -> np.ndarray:
+    """1-based ranks of each column, with tied scores sharing their average rank."""
+    ranks = np.empty(scores.shape, dtype=np.float64)
+    for j in range(scores.shape[1]):
+        _, inverse, counts = np.unique(scores[:, j], return_inverse=True, return_counts=True)
+        ends = np.cumsum(counts)
+        ranks[:, j] = (ends - (counts - 1) / 2)[inverse]
+    return ranks
+
+
+def label_auc(labels: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """
+    ROC AUC for every label column at once (Mann-Whitney U over average ranks).
+
+    Columns with a single class get NaN.
+    """
+    ranks = average_ranks(scores)
+    positives = labels.sum(axis=0)
+    negatives = len(labels) - positives
+    with np.errstate(divide="ignore", invalid="ignore"):
+        auc = ((ranks * labels).sum(axis=0) - positives * (positives + 1) / 2) / (positives * negatives)
+    return np.where((positives > 0) & (negatives > 0), auc, np.nan)
+
+
+def threshold_metrics(labels: np.ndarray, scores: np.ndarray, thresholds: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Precision, recall and F1 of `score > threshold` for every label and threshold.
+
+    Each label's scores are sorted once, so any number of thresholds costs a
+    binary search rather than another pass over the data.
+
+    Args:
+        labels: Binary labels [rows, labels]
+        scores: Probabilities [rows, labels]
+        thresholds: One grid shared by all labels [k], or per-label thresholds [labels, k]
+
+    Returns:
+        Dict of arrays shaped [labels, k]
+    """
+    n, n_labels = scores.shape
+    thresholds = np.broadcast_to(np.atleast_2d(thresholds), (n_labels, np.atleast_2d(thresholds).shape[-1]))
+    order = np.argsort(scores, axis=0, kind="stable")
+    sorted_scores = np.take_along_axis(scores, order, axis=0)
+    positives_below = np.vstack([
+        np.zeros((1, n_labels)), np.cumsum(np.take_along_axis(labels, order, axis=0), axis=0)
+    ])
+    total_positives = positives_below[-1]
+
+    below = np.stack([
+        np.searchsorted(sorted_scores[:, j], thresholds[j], side="right") for j in range(n_labels)
+    ])  # Rows with score <= threshold
+    true_positives = total_positives[:, None] - np.take_along_axis(positives_below.T, below, axis=1)
+    predicted = n - below
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, true_positives / predicted, 0.0)
+        recall = np.where(total_positives[:, None] > 0, true_positives / total_positives[:, None], 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def agreement(scores_a: np.ndarray, scores_b: np.ndarray, thresholds: np.ndarray) -> Dict:
+    """How often two variants make the same calls at the operating thresholds."""
+    flags_a, flags_b = scores_a > thresholds, scores_b > thresholds
+    same = flags_a == flags_b
+    return {
+        "flags": {label: round(float(v), 6) for label, v in zip(LABEL_COLUMNS, same.mean(axis=0))},
+        "is_toxic": round(float((flags_a.any(axis=1) == flags_b.any(axis=1)).mean()), 6),
+        "mean_abs_score_diff": round(float(np.abs(scores_a - scores_b).mean()), 6),
+        "max_abs_score_diff": round(float(np.abs(scores_a - scores_b).max()), 6)
+    }
+
+
+def load_thresholds(path: Optional[str]) -> np.ndarray:
+    """Per-label operating thresholds from a {label: threshold} JSON file, defaulting to the serving threshold."""
+    thresholds = {label: ToxicityPredictor.THRESHOLD for label in LABEL_COLUMNS}
+    if path:
+        with open(path) as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(LABEL_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown labels in {path}: {sorted(unknown)}")
+        thresholds.update(overrides)
+    return np.array([thresholds[label] for label in LABEL_COLUMNS], dtype=np.float64)
+
+
+def summarize(labels: np.ndarray, scores: np.ndarray, operating: np.ndarray, grid: np.ndarray) -> Dict:
+    """Quality numbers for one variant."""
+    auc = label_auc(labels, scores)
+    at_operating = threshold_metrics(labels, scores, operating[:, None])
+    sweep = threshold_metrics(labels, scores, grid)
+    defined = auc[~np.isnan(auc)]
+
+    def per_label(values):
+        return {label: None if np.isnan(v) else round(float(v), 6) for label, v in zip(LABEL_COLUMNS, values)}
+
+    return {
+        "auc": {**per_label(auc), "macro": round(float(defined.mean()), 6) if len(defined) else None},
+        "operating": {name: per_label(values[:, 0]) for name, values in at_operating.items()},
+        "macro_f1": round(float(at_operating["f1"].mean()), 6),
+        "sweep": {
+            label: {name: np.round(values[j], 6).tolist() for name, values in sweep.items()}
+            for j, label in enumerate(LABEL_COLUMNS)
+        }
+    }
+
+
+def evaluate(
+    test_csv: str,
+    variants: Sequence[Variant],
+    output: Optional[str] = None,
+    thresholds_path: Optional[str] = None,
+    grid: np.ndarray = DEFAULT_GRID,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    max_length: int = 256,
+    batch_size: int = 64,
+    latency_samples: int = 50
+) -> Dict:
+    """
+    Evaluate variants on one split; the first variant is the agreement baseline.
+
+    Args:
+        test_csv: Processed held-out CSV
+        variants: Variants to compare
+        output: Optional path for the JSON report
+        thresholds_path: JSON {label: threshold} for the operating point
+        grid: Thresholds for the precision/recall sweep
+        cache_dir: Token and logits cache directory
+        max_length: Truncation length in tokens
+        batch_size: Inference batch size
+        latency_samples: Rows timed one at a time per variant
+
+    Returns:
+        Evaluation report
+    """
+    operating = load_thresholds(thresholds_path)
+    report = {
+        "test_csv": test_csv,
+        "labels": LABEL_COLUMNS,
+        "operating_thresholds": dict(zip(LABEL_COLUMNS, operating.tolist())),
+        "grid": [float(t) for t in grid],
+        "variants": {}
+    }
+
+    baseline = None
+    for variant in variants:
+        logits, labels, info = cached_logits(variant, test_csv, cache_dir, max_length, batch_size, latency_samples)
+        start = time.perf_counter()
+        scores = sigmoid(np.asarray(logits))
+        row = {**info, **summarize(labels, scores, operating, np.asarray(grid))}
+        if baseline is None:
+            baseline = (variant.name, scores, len(labels))
+        elif len(labels) == baseline[2]:
+            row["agreement"] = {"with": baseline[0], **agreement(baseline[1], scores, operating)}
+        else:
+            logger.warning("⚠️ %s has %d rows, baseline %d; skipping agreement", variant.name, len(labels), baseline[2])
+        row["metrics_seconds"] = round(time.perf_counter() - start, 4)
+        report["variants"][variant.name] = row
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model variants on a held-out split")
+    parser.add_argument("--test", required=True, help="Processed held-out CSV")
+    parser.add_argument("--variant", action="append", required=True,
+                        help="name=path[:torchscript|:int8]; the first is the agreement baseline")
+    parser.add_argument("--model-name", default=os.getenv("MODEL_NAME", "distilbert-base-uncased"),
+                        help="Base model for .pt state dicts")
+    parser.add_argument("--thresholds", default=None, help="JSON {label: threshold} operating point")
+    parser.add_argument("--output", default=REPORT_FILE)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--latency-samples", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=None, help="Torch intra-op threads")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    report = evaluate(
+        args.test,
+        [Variant.parse(spec, args.model_name) for spec in args.variant],
+        output=args.output,
+        thresholds_path=args.thresholds,
+        cache_dir=args.cache_dir,
+        max_length=args.max_length,
+        batch_size=args.batch_size,
+        latency_samples=args.latency_samples
+    )
+
+    def cell(value, digits=4):
+        return "-" if value is None else str(round(value, digits))
+
+    print(f"\n{'variant':14}{'macro AUC':>10}{'macro F1':>10}{'agree':>8}{'texts/s':>10}{'p50 ms':>9}{'p95 ms':>9}  cached")
+    for name, row in report["variants"].items():
+        print(
+            f"{name:14}{cell(row['auc']['macro']):>10}{cell(row['macro_f1']):>10}"
+            f"{cell(row.get('agreement', {}).get('is_toxic')):>8}{cell(row['throughput']['texts_per_s'], 1):>10}"
+            f"{cell(row['latency']['p50_ms'], 2):>9}{cell(row['latency']['p95_ms'], 2):>9}  {row['cached']}"
+        )
+    print(f"\nReport written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Pre-tokenized, memory-mapped training data.
+
+A processed CSV split is cleaned once in parallel with the serving
+clean_text, tokenized once in batches (truncated, never padded) and
+stored under a directory keyed by the CSV contents, the tokenizer, the
+clean_text version and max_length:
+
+    ids.bin       all token ids back to back (uint16, or uint32 for big vocabularies)
+    offsets.bin   int64 start of each row in ids.bin, plus the end
+    lengths.bin   uint16 tokens per row
+    labels.bin    uint8 (or float32) label matrix in LABEL_COLUMNS order
+    meta.json     shapes, dtypes and the inputs the key was derived from
+
+TokenizedDataset maps these files read-only, so retraining and evaluation
+reuse the work without parsing or tokenizing again.
+
+Usage:
+    python -m src.training.token_cache --csv data/train_processed.csv \\
+        --tokenizer distilbert-base-uncased --max-length 256
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import torch
+from torch.utils.data import Dataset
+
+from src.training.data import LABEL_COLUMNS
+from src.utils.text_processing import CLEAN_TEXT_VERSION, clean_text
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT = 1
+DEFAULT_CACHE_DIR = os.getenv("TOKEN_CACHE_DIR", "data/token_cache")
+META_FILE = "meta.json"
+
+
+def file_digest(path: str) -> str:
+    """Content hash of a file, read in 1 MB chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tokenizer_fingerprint(tokenizer) -> str:
+    """Hash of the tokenizer class, casing and vocabulary."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{type(tokenizer).__name__}|{getattr(tokenizer, 'do_lower_case', None)}".encode())
+    for token, index in sorted(tokenizer.get_vocab().items(), key=lambda item: item[1]):
+        digest.update(f"{index}\t{token}\n".encode())
+    return digest.hexdigest()
+
+
+def cache_key(source_digest: str, tokenizer_digest: str, max_length: int) -> str:
+    """Directory name for one (data, tokenizer, cleaning, max_length) combination."""
+    key = json.dumps([CACHE_FORMAT, source_digest, tokenizer_digest, CLEAN_TEXT_VERSION, max_length])
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def parallel_clean(texts: Sequence[str], workers: Optional[int] = None, chunksize: int = 2048) -> List[str]:
+    """
+    Apply clean_text across worker processes.
+
+    Falls back to a plain loop for one worker or inputs smaller than one chunk.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) <= chunksize:
+        return [clean_text(text) for text in texts]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(clean_text, texts, chunksize=chunksize))
+
+
+def build_token_cache(
+    csv_path: str,
+    tokenizer,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    max_length: int = 256,
+    workers: Optional[int] = None,
+    batch_size: int = 1024,
+    rebuild: bool = False
+) -> str:
+    """
+    Clean and tokenize a processed CSV split once, reusing an existing cache.
+
+    Args:
+        csv_path: CSV written by the preprocessing notebook (comment_text + label columns)
+        tokenizer: Tokenizer the model will be trained with
+        cache_dir: Directory holding one subdirectory per cache key
+        max_length: Truncation length in tokens
+        workers: Cleaning processes (defaults to the CPU count)
+        batch_size: Texts per tokenizer call
+        rebuild: Rebuild even if the cache exists
+
+    Returns:
+        Path of the cache directory
+    """
+    source_digest = file_digest(csv_path)
+    tokenizer_digest = tokenizer_fingerprint(tokenizer)
+    path = os.path.join(cache_dir, cache_key(source_digest, tokenizer_digest, max_length))
+    if not rebuild and os.path.exists(os.path.join(path, META_FILE)):
+        logger.info("✅ Token cache hit: %s", path)
+        return path
+
+    start = time.perf_counter()
+    df = pd.read_csv(csv_path, usecols=["comment_text", *LABEL_COLUMNS])
+    texts = parallel_clean(df["comment_text"].fillna("").astype(str).tolist(), workers)
+    keep = np.array([bool(text) for text in texts], dtype=bool)
+    texts = [text for text in texts if text]
+    if len(texts) < len(df):
+        logger.info("Dropped %d rows that were empty after cleaning", len(df) - len(texts))
+    cleaned_at = time.perf_counter()
+
+    labels = df[LABEL_COLUMNS].to_numpy()[keep]
+    label_dtype = np.uint8 if np.isin(labels, (0, 1)).all() else np.float32
+    id_dtype = np.uint16 if len(tokenizer) <= np.iinfo(np.uint16).max + 1 else np.uint32
+    lengths = np.empty(len(texts), dtype=np.uint16)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=cache_dir, prefix=".building-")
+    try:
+        with open(os.path.join(staging, "ids.bin"), "wb") as f:
+            for offset in range(0, len(texts), batch_size):
+                ids = tokenizer(texts[offset:offset + batch_size], truncation=True, max_length=max_length)["input_ids"]
+                lengths[offset:offset + len(ids)] = [len(row) for row in ids]
+                f.write(np.fromiter(itertools.chain.from_iterable(ids), dtype=id_dtype).tobytes())
+
+        offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        offsets.tofile(os.path.join(staging, "offsets.bin"))
+        lengths.tofile(os.path.join(staging, "lengths.bin"))
+        labels.astype(label_dtype).tofile(os.path.join(staging, "labels.bin"))
+
+        meta = {
+            "format": CACHE_FORMAT,
+            "rows": len(texts),
+            "tokens": int(offsets[-1]),
+            "id_dtype": np.dtype(id_dtype).name,
+            "label_dtype": np.dtype(label_dtype).name,
+            "labels": LABEL_COLUMNS,
+            "pad_token_id": tokenizer.pad_token_id or 0,
+            "max_length": max_length,
+            "source": os.path.abspath(csv_path),
+            "source_digest": source_digest,
+            "tokenizer": type(tokenizer).__name__,
+            "tokenizer_digest": tokenizer_digest,
+            "clean_text_version": CLEAN_TEXT_VERSION,
+            "created": time.time()
+        }
+        with open(os.path.join(staging, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(staging, path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    logger.info(
+        "✅ Token cache built: %d rows, %d tokens in %.1fs (cleaning %.1fs) -> %s",
+        meta["rows"], meta["tokens"], time.perf_counter() - start, cleaned_at - start, path
+    )
+    return path
+
+
+def _open(path: str, dtype: str, shape: Tuple[int, ...]) -> np.ndarray:
+    if not np.prod(shape):
+        return np.empty(shape, dtype=dtype)  # mmap can't map an empty file
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
+
+
+class TokenizedDataset(Dataset):
+    """Read-only view of a token cache; items are slices of the mapped files."""
+
+    def __init__(self, path: str):
+        """
+        Open a token cache.
+
+        Args:
+            path: Cache directory returned by build_token_cache
+        """
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        if self.meta["clean_text_version"] != CLEAN_TEXT_VERSION:
+            logger.warning(
+                "⚠️ Token cache %s was cleaned with clean_text v%s (current v%s)",
+                path, self.meta["clean_text_version"], CLEAN_TEXT_VERSION
+            )
+        self.pad_token_id = self.meta["pad_token_id"]
+        self._map()
+
+    def _map(self):
+        rows = self.meta["rows"]
+        self.input_ids = _open(os.path.join(self.path, "ids.bin"), self.meta["id_dtype"], (self.meta["tokens"],))
+        self.offsets = _open(os.path.join(self.path, "offsets.bin"), "int64", (rows + 1,))
+        self.lengths = _open(os.path.join(self.path, "lengths.bin"), "uint16", (rows,))
+        self.labels = _open(
+            os.path.join(self.path, "labels.bin"), self.meta["label_dtype"], (rows, len(self.meta["labels"]))
+        )
+
+    @classmethod
+    def from_csv(cls, csv_path: str, tokenizer, cache_dir: str = DEFAULT_CACHE_DIR, **kwargs) -> "TokenizedDataset":
+        """Build the cache if needed and open it."""
+        return cls(build_token_cache(csv_path, tokenizer, cache_dir, **kwargs))
+
+    def __len__(self) -> int:
+        return self.meta["rows"]
+
+    def __getitem__(self, index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(token ids, labels) for one row, without copying."""
+        return self.input_ids[self.offsets[index]:self.offsets[index + 1]], self.labels[index]
+
+    def __getstate__(self):
+        # DataLoader workers re-map the files instead of pickling their contents
+        return {"path": self.path, "meta": self.meta, "pad_token_id": self.pad_token_id}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._map()
+
+    def collate(self, batch: Sequence[Tuple[np.ndarray, np.ndarray]]) -> Dict[str, torch.Tensor]:
+        """Pad a batch to its longest row (dynamic padding) for the model."""
+        longest = max(len(ids) for ids, _ in batch)
+        input_ids = torch.full((len(batch), longest), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(batch), longest), dtype=torch.long)
+        for row, (ids, _) in enumerate(batch):
+            input_ids[row, :len(ids)] = torch.from_numpy(ids.astype(np.int64))
+            attention_mask[row, :len(ids)] = 1
+        labels = torch.from_numpy(np.stack([labels for _, labels in batch]).astype(np.float32))
+        return {"input_ids": input_ids, "attention_mask": attention_mask, "labels": labels}
+
+
+def main():
+    from transformers import AutoTokenizer
+
+    parser = argparse.ArgumentParser(description="Clean and tokenize a processed CSV split into a token cache")
+    parser.add_argument("--csv", required=True, nargs="+", help="Processed CSV split(s)")
+    parser.add_argument("--tokenizer", default=os.getenv("MODEL_NAME", "distilbert-base-uncased"),
+                        help="Tokenizer name or model directory")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=None, help="Cleaning processes")
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+
+    for csv_path in args.csv:
+        dataset = TokenizedDataset(build_token_cache(
+            csv_path, tokenizer, args.cache_dir,
+            max_length=args.max_length, workers=args.workers, rebuild=args.rebuild
+        ))
+        size_mb = sum(
+            os.path.getsize(os.path.join(dataset.path, name)) for name in os.listdir(dataset.path)
+        ) / (1024 * 1024)
+        lengths = np.asarray(dataset.lengths)
+        print(f"{csv_path}: {len(dataset):,} rows, {dataset.meta['tokens']:,} tokens, "
+              f"mean length {lengths.mean() if len(lengths) else 0:.1f}, {size_mb:.1f} MB -> {dataset.path}")
+
+
+if __name__ == "__main__":
+    main()
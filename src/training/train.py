@@ -0,0 +1,384 @@
+"""
+CPU-friendly fine-tuning of the toxicity classifier.
+
+Scripted version of notebooks/03_model_training.ipynb. It keeps the
+notebook's loss (BCEWithLogitsLoss with per-label pos_weight), AdamW and
+linear warmup schedule, gradient clipping, and best-by-validation-loss
+selection. Instead of padding every sample to 256 tokens, it reads the
+pre-tokenized cache (src.training.token_cache). Batches are drawn from
+length-grouped buckets and padded to their longest row, and gradients can
+be accumulated over several micro-batches. Training state is
+checkpointed so an interrupted run resumes where it stopped. The best
+model is saved as a model directory that ModelLoader serves via
+MODEL_PATH.
+
+Usage:
+    python -m src.training.train --train data/train_processed.csv \\
+        --output models/distilbert-toxic --batch-size 16 --accumulation-steps 2 --threads 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import torch
+from sklearn.metrics import f1_score
+from torch.utils.data import DataLoader, Sampler
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, get_linear_schedule_with_warmup
+
+from src.models.predictor import ToxicityPredictor
+from src.training.data import LABEL_COLUMNS, pos_weight
+from src.training.distill import per_label_auc
+from src.training.token_cache import DEFAULT_CACHE_DIR, TokenizedDataset
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = "checkpoint"
+CHECKPOINT_FILE = "training_state.pt"
+REPORT_FILE = "training_report.json"
+
+
+class LengthGroupedBatchSampler(Sampler):
+    """
+    Batches of similar-length rows in random order.
+
+    Each epoch shuffles the rows, cuts them into mega-batches of
+    batch_size * mega_batch_mult, sorts each mega-batch by length and
+    splits it into batches, then shuffles the batch order. Padding stays
+    small while batches still mix across the dataset. The order depends
+    only on (seed, epoch), so a resumed run replays it exactly.
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        indices: Optional[np.ndarray] = None,
+        mega_batch_mult: int = 50,
+        seed: int = 42
+    ):
+        self.lengths = np.asarray(lengths)
+        self.indices = np.arange(len(self.lengths)) if indices is None else np.asarray(indices)
+        self.batch_size = batch_size
+        self.mega_batch_mult = mega_batch_mult
+        self.seed = seed
+        self.epoch = 0
+        self.skip = 0
+
+    def set_epoch(self, epoch: int, skip: int = 0):
+        """Select the epoch's order and how many of its batches were already consumed."""
+        self.epoch = epoch
+        self.skip = skip
+
+    def batches(self) -> List[np.ndarray]:
+        rng = np.random.default_rng(self.seed + self.epoch)
+        order = self.indices[rng.permutation(len(self.indices))]
+        mega = self.batch_size * self.mega_batch_mult
+        batches = []
+        for start in range(0, len(order), mega):
+            chunk = order[start:start + mega]
+            chunk = chunk[np.argsort(-self.lengths[chunk], kind="stable")]
+            batches.extend(chunk[i:i + self.batch_size] for i in range(0, len(chunk), self.batch_size))
+        return [batches[i] for i in rng.permutation(len(batches))]
+
+    def __iter__(self) -> Iterator[List[int]]:
+        for batch in self.batches()[self.skip:]:
+            yield batch.tolist()
+
+    def __len__(self) -> int:
+        return -(-len(self.indices) // self.batch_size) - self.skip
+
+
+def split_indices(n: int, val_fraction: float, seed: int = 42):
+    """Random (train, validation) index split, like the notebook's train_test_split."""
+    order = np.random.default_rng(seed).permutation(n)
+    n_val = int(round(n * val_fraction))
+    return np.sort(order[n_val:]), np.sort(order[:n_val])
+
+
+@torch.no_grad()
+def evaluate(model, dataset: TokenizedDataset, indices: np.ndarray, criterion, batch_size: int = 64) -> Dict:
+    """Validation loss, per-label F1 at the serving threshold, and per-label AUC."""
+    model.eval()
+    order = indices[np.argsort(np.asarray(dataset.lengths)[indices], kind="stable")]
+    total_loss, logits, labels = 0.0, [], []
+    for start in range(0, len(order), batch_size):
+        batch = dataset.collate([dataset[i] for i in order[start:start + batch_size]])
+        batch_logits = model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"]).logits
+        total_loss += criterion(batch_logits, batch["labels"]).item() * len(batch["labels"])
+        logits.append(batch_logits.numpy())
+        labels.append(batch["labels"].numpy())
+
+    scores = 1 / (1 + np.exp(-np.concatenate(logits)))
+    labels = np.concatenate(labels)
+    predicted = scores > ToxicityPredictor.THRESHOLD
+    return {
+        "loss": total_loss / max(len(order), 1),
+        "f1": {
+            label: float(f1_score(labels[:, i], predicted[:, i], zero_division=0))
+            for i, label in enumerate(LABEL_COLUMNS)
+        },
+        "auc": per_label_auc(labels, scores)
+    }
+
+
+def save_checkpoint(path: str, state: Dict):
+    """Write training state atomically so a crash mid-write keeps the previous checkpoint."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    torch.save(state, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def train(
+    train_csv: str,
+    output_dir: str,
+    val_csv: Optional[str] = None,
+    model_name: str = "distilbert-base-uncased",
+    epochs: int = 3,
+    batch_size: int = 16,
+    accumulation_steps: int = 1,
+    learning_rate: float = 2e-5,
+    weight_decay: float = 0.01,
+    warmup_steps: int = 500,
+    max_grad_norm: float = 1.0,
+    max_length: int = 256,
+    val_fraction: float = 0.1,
+    max_pos_weight: Optional[float] = None,
+    checkpoint_every: int = 500,
+    resume: bool = True,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    num_workers: int = 0,
+    log_every: int = 50,
+    seed: int = 42,
+    state_dict_path: Optional[str] = None
+) -> Dict:
+    """
+    Fine-tune a sequence classifier and save the best model for serving.
+
+    Args:
+        train_csv: Processed training CSV
+        output_dir: Model directory written for ModelLoader (plus checkpoint/ and the report)
+        val_csv: Processed validation CSV (defaults to a val_fraction split of train_csv)
+        model_name: Pretrained model name or directory to start from
+        epochs: Passes over the training rows
+        batch_size: Rows per forward pass
+        accumulation_steps: Micro-batches per optimizer step
+        learning_rate: AdamW learning rate
+        weight_decay: AdamW weight decay
+        warmup_steps: Linear warmup length in optimizer steps
+        max_grad_norm: Gradient clipping norm
+        max_length: Truncation length in tokens
+        val_fraction: Share of train_csv held out when val_csv is not given
+        max_pos_weight: Cap on pos_weight (None keeps the notebook's uncapped ratios)
+        checkpoint_every: Optimizer steps between mid-epoch checkpoints (0 for epoch ends only)
+        resume: Continue from output_dir/checkpoint if present
+        cache_dir: Token cache directory
+        num_workers: DataLoader worker processes
+        log_every: Optimizer steps between progress log lines
+        seed: Seed for the split, sampler and initialization
+        state_dict_path: Also save the best weights as a bare state dict (the notebook's best_model.pt)
+
+    Returns:
+        Training report
+    """
+    torch.manual_seed(seed)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    dataset = TokenizedDataset.from_csv(train_csv, tokenizer, cache_dir, max_length=max_length)
+    if val_csv:
+        val_dataset = TokenizedDataset.from_csv(val_csv, tokenizer, cache_dir, max_length=max_length)
+        train_indices, val_indices = np.arange(len(dataset)), np.arange(len(val_dataset))
+    else:
+        train_indices, val_indices = split_indices(len(dataset), val_fraction, seed)
+        val_dataset = dataset
+
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_name, num_labels=len(LABEL_COLUMNS), problem_type="multi_label_classification"
+    )
+    label_weights = pos_weight(
+        np.asarray(dataset.labels[train_indices], dtype=np.float32),
+        max_weight=max_pos_weight
+    )
+    criterion = torch.nn.BCEWithLogitsLoss(pos_weight=label_weights)
+
+    sampler = LengthGroupedBatchSampler(dataset.lengths, batch_size, train_indices, seed=seed)
+    batches_per_epoch = len(sampler)
+    steps_per_epoch = -(-batches_per_epoch // accumulation_steps)
+    total_steps = steps_per_epoch * epochs
+    optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate, weight_decay=weight_decay)
+    scheduler = get_linear_schedule_with_warmup(optimizer, warmup_steps, total_steps)
+
+    config = {
+        "model_name": model_name, "train_csv": train_csv, "val_csv": val_csv, "epochs": epochs,
+        "batch_size": batch_size, "accumulation_steps": accumulation_steps, "learning_rate": learning_rate,
+        "warmup_steps": warmup_steps, "max_length": max_length, "seed": seed,
+        "pos_weight": [round(float(w), 4) for w in label_weights]
+    }
+    state = {"epoch": 0, "batches_done": 0, "global_step": 0, "best_val_loss": float("inf"), "history": []}
+    checkpoint_path = os.path.join(output_dir, CHECKPOINT_DIR, CHECKPOINT_FILE)
+    if resume and os.path.exists(checkpoint_path):
+        saved = torch.load(checkpoint_path, map_location="cpu")
+        model.load_state_dict(saved["model"])
+        optimizer.load_state_dict(saved["optimizer"])
+        scheduler.load_state_dict(saved["scheduler"])
+        torch.set_rng_state(saved["torch_rng"])
+        state = saved["state"]
+        logger.info(
+            "🔄 Resuming from epoch %d, batch %d (step %d)",
+            state["epoch"] + 1, state["batches_done"], state["global_step"]
+        )
+
+    def checkpoint():
+        save_checkpoint(checkpoint_path, {
+            "model": model.state_dict(),
+            "optimizer": optimizer.state_dict(),
+            "scheduler": scheduler.state_dict(),
+            "torch_rng": torch.get_rng_state(),
+            "state": state,
+            "config": config
+        })
+
+    logger.info(
+        "🚀 Training on %d rows (%d validation): %d epochs x %d steps, batch %d x %d accumulation, %d threads",
+        len(train_indices), len(val_indices), epochs, steps_per_epoch, batch_size, accumulation_steps,
+        torch.get_num_threads()
+    )
+    while state["epoch"] < epochs:
+        epoch = state["epoch"]
+        sampler.set_epoch(epoch, skip=state["batches_done"])
+        loader = DataLoader(dataset, batch_sampler=sampler, collate_fn=dataset.collate, num_workers=num_workers)
+        model.train()
+        epoch_start = time.perf_counter()
+        epoch_loss, real_tokens, padded_tokens, seen = 0.0, 0, 0, 0
+
+        for batch_index, batch in enumerate(loader, start=state["batches_done"]):
+            # The last accumulation group of an epoch may be shorter
+            group_start = batch_index - batch_index % accumulation_steps
+            group_size = min(accumulation_steps, batches_per_epoch - group_start)
+
+            logits = model(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"]).logits
+            loss = criterion(logits, batch["labels"])
+            (loss / group_size).backward()
+            epoch_loss += loss.item()
+            seen += 1
+            real_tokens += int(batch["attention_mask"].sum())
+            padded_tokens += batch["attention_mask"].numel()
+
+            if batch_index + 1 == group_start + group_size:
+                torch.nn.utils.clip_grad_norm_(model.parameters(), max_norm=max_grad_norm)
+                optimizer.step()
+                scheduler.step()
+                optimizer.zero_grad()
+                state["global_step"] += 1
+                state["batches_done"] = batch_index + 1
+
+                if log_every and state["global_step"] % log_every == 0:
+                    logger.info(
+                        "Epoch %d step %d/%d | loss %.4f | lr %.2e",
+                        epoch + 1, state["global_step"], total_steps, loss.item(), scheduler.get_last_lr()[0]
+                    )
+                if checkpoint_every and state["global_step"] % checkpoint_every == 0 \
+                        and state["batches_done"] < batches_per_epoch:
+                    checkpoint()
+
+        metrics = evaluate(model, val_dataset, val_indices, criterion, batch_size * 2) if len(val_indices) else None
+        record = {
+            "epoch": epoch + 1,
+            "train_loss": round(epoch_loss / max(seen, 1), 6),
+            "val_loss": round(metrics["loss"], 6) if metrics else None,
+            "val_f1": metrics["f1"] if metrics else None,
+            "val_auc": metrics["auc"] if metrics else None,
+            "seconds": round(time.perf_counter() - epoch_start, 2),
+            "padding_efficiency": round(real_tokens / padded_tokens, 4) if padded_tokens else None
+        }
+        state["history"].append(record)
+        logger.info(
+            "✅ Epoch %d: train loss %.4f, val loss %s, %.1fs, %.0f%% of tokens are real",
+            epoch + 1, record["train_loss"], record["val_loss"], record["seconds"],
+            100 * (record["padding_efficiency"] or 0)
+        )
+
+        # Without a validation split the latest epoch is kept
+        if metrics is None or metrics["loss"] < state["best_val_loss"]:
+            state["best_val_loss"] = metrics["loss"] if metrics else state["best_val_loss"]
+            state["best_epoch"] = epoch + 1
+            model.save_pretrained(output_dir)
+            tokenizer.save_pretrained(output_dir)
+            if state_dict_path:
+                torch.save(model.state_dict(), state_dict_path)
+            logger.info("✅ Best model saved to %s", output_dir)
+
+        state["epoch"] = epoch + 1
+        state["batches_done"] = 0
+        checkpoint()
+
+    report = {"config": config, "best_epoch": state.get("best_epoch"), "epochs": state["history"]}
+    with open(os.path.join(output_dir, REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fine-tune the toxicity classifier on CPU")
+    parser.add_argument("--train", required=True, help="Processed training CSV")
+    parser.add_argument("--val", default=None, help="Processed validation CSV (default: split from --train)")
+    parser.add_argument("--output", default="models/distilbert-toxic", help="Output model directory")
+    parser.add_argument("--model-name", default=os.getenv("MODEL_NAME", "distilbert-base-uncased"))
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--accumulation-steps", type=int, default=1)
+    parser.add_argument("--learning-rate", type=float, default=2e-5)
+    parser.add_argument("--warmup-steps", type=int, default=500)
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--val-fraction", type=float, default=0.1)
+    parser.add_argument("--max-pos-weight", type=float, default=None,
+                        help="Cap on per-label pos_weight (default: uncapped, as in the notebook)")
+    parser.add_argument("--checkpoint-every", type=int, default=500, help="Optimizer steps between checkpoints")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore an existing checkpoint")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=0, help="DataLoader worker processes")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("TORCH_THREADS", "0")) or None,
+                        help="Torch intra-op threads")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--state-dict", default=None, help="Also write the best weights here (e.g. models/best_model.pt)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    report = train(
+        args.train, args.output,
+        val_csv=args.val,
+        model_name=args.model_name,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        accumulation_steps=args.accumulation_steps,
+        learning_rate=args.learning_rate,
+        warmup_steps=args.warmup_steps,
+        max_length=args.max_length,
+        val_fraction=args.val_fraction,
+        max_pos_weight=args.max_pos_weight,
+        checkpoint_every=args.checkpoint_every,
+        resume=not args.no_resume,
+        cache_dir=args.cache_dir,
+        num_workers=args.workers,
+        seed=args.seed,
+        state_dict_path=args.state_dict
+    )
+
+    print(f"{'epoch':>6}{'train loss':>12}{'val loss':>10}{'macro AUC':>11}{'seconds':>9}")
+    for row in report["epochs"]:
+        macro = row["val_auc"]["macro"] if row["val_auc"] else None
+        print(
+            f"{row['epoch']:>6}{row['train_loss']:>12.4f}{str(row['val_loss']):>10}"
+            f"{str(macro if macro is None else round(macro, 4)):>11}{row['seconds']:>9}"
+        )
+    print(f"\nBest epoch {report['best_epoch']} saved to {args.output}; serve it with MODEL_PATH={args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Vocabulary pruning for smaller model artifacts.
+
+Most of the word-embedding matrix is never used by our traffic. This tool
+counts the WordPiece tokens a corpus actually produces, keeps those (plus
+the special tokens and, by default, every single-character piece so unseen
+words still split instead of collapsing to [UNK]), slices the embedding
+matrix to match and writes a tokenizer + model directory that ModelLoader
+loads via MODEL_PATH.
+
+Pruning is exact for any text whose pieces were all seen: WordPiece picks
+the longest matching piece, and every piece it picked on the corpus is kept.
+
+Usage:
+    python -m src.training.vocab_pruning --corpus train_processed.csv \\
+        --heldout test_processed.csv --model-path models/best_model.pt \\
+        --output models/pruned
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+import torch
+
+from src.models.model_loader import ModelLoader
+from src.models.predictor import ToxicityPredictor
+from src.training.data import load_processed_csv
+from src.training.distill import batch_logits
+from src.utils.text_processing import clean_text
+
+logger = logging.getLogger(__name__)
+
+REPORT_FILE = "pruning_report.json"
+COUNT_CHUNK = 1000
+
+
+def load_corpus(path: str, max_samples: int = None) -> List[str]:
+    """
+    Load cleaned texts from a processed CSV split or a plain text file (one text per line).
+    """
+    if path.endswith(".csv"):
+        texts, _ = load_processed_csv(path, max_samples)
+        return texts
+    with open(path, encoding="utf-8") as f:
+        texts = [text for text in (clean_text(line) for line in f) if text]
+    return texts[:max_samples] if max_samples else texts
+
+
+def count_tokens(tokenizer, texts: Sequence[str]) -> np.ndarray:
+    """Occurrences of each vocabulary id when tokenizing the texts."""
+    counts = np.zeros(len(tokenizer), dtype=np.int64)
+    for start in range(0, len(texts), COUNT_CHUNK):
+        encoded = tokenizer(list(texts[start:start + COUNT_CHUNK]), add_special_tokens=False)["input_ids"]
+        ids = np.fromiter(itertools.chain.from_iterable(encoded), dtype=np.int64)
+        counts += np.bincount(ids, minlength=len(counts))
+    return counts
+
+
+def select_vocab(
+    tokenizer,
+    counts: np.ndarray,
+    min_count: int = 1,
+    max_vocab: int = None,
+    keep_chars: bool = True
+) -> np.ndarray:
+    """
+    Choose the vocabulary ids to keep, in their original order.
+
+    Args:
+        tokenizer: Original WordPiece tokenizer
+        counts: Result of count_tokens()
+        min_count: Minimum occurrences for a corpus token to be kept
+        max_vocab: Optional cap on corpus tokens (most frequent first)
+        keep_chars: Also keep single-character pieces ("a", "##a") for fallback
+
+    Returns:
+        Sorted array of original token ids
+    """
+    frequent = np.flatnonzero(counts >= min_count)
+    if max_vocab and len(frequent) > max_vocab:
+        frequent = frequent[np.argsort(-counts[frequent], kind="stable")[:max_vocab]]
+
+    keep = set(frequent.tolist()) | set(tokenizer.all_special_ids)
+    if keep_chars:
+        keep |= {
+            idx for token, idx in tokenizer.get_vocab().items()
+            if len(token) == 1 or (token.startswith("##") and len(token) == 3)
+        }
+    return np.array(sorted(keep), dtype=np.int64)
+
+
+def prune_tokenizer(tokenizer, keep_ids: np.ndarray, output_dir: str):
+    """
+    Write the reduced vocab.txt and a matching tokenizer to output_dir.
+
+    Raises:
+        ValueError: If the tokenizer isn't vocab.txt-based (WordPiece)
+    """
+    if "vocab_file" not in tokenizer.vocab_files_names:
+        raise ValueError(f"Only WordPiece tokenizers are supported, got {type(tokenizer).__name__}")
+
+    id_to_token = {idx: token for token, idx in tokenizer.get_vocab().items()}
+    os.makedirs(output_dir, exist_ok=True)
+    vocab_file = os.path.join(output_dir, "vocab.txt")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        f.writelines(f"{id_to_token[idx]}\n" for idx in keep_ids.tolist())
+
+    pruned = type(tokenizer)(
+        vocab_file=vocab_file,
+        do_lower_case=getattr(tokenizer, "do_lower_case", True),
+        model_max_length=tokenizer.model_max_length
+    )
+    pruned.save_pretrained(output_dir)
+    return pruned
+
+
+def prune_embeddings(model, keep_ids: np.ndarray):
+    """
+    Copy of the model whose input embeddings only cover keep_ids.
+
+    Row i of the new matrix is row keep_ids[i] of the old one, matching the
+    order of the pruned vocab.txt.
+    """
+    pruned = copy.deepcopy(model)
+    old = pruned.get_input_embeddings()
+    index = torch.from_numpy(keep_ids)
+    new = torch.nn.Embedding(len(keep_ids), old.embedding_dim)
+    new.weight.data.copy_(old.weight.data.index_select(0, index))
+    pruned.set_input_embeddings(new)
+    pruned.config.vocab_size = len(keep_ids)
+
+    pad_id = pruned.config.pad_token_id
+    if pad_id is not None:
+        pruned.config.pad_token_id = int(np.searchsorted(keep_ids, pad_id))
+        new.padding_idx = pruned.config.pad_token_id
+    return pruned
+
+
+def directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def load_seconds(model_dir: str) -> float:
+    """Wall time for ModelLoader to load a model directory (eager mode)."""
+    start = time.perf_counter()
+    ModelLoader(model_path=model_dir, device="cpu", inference_mode="eager").load_model()
+    return time.perf_counter() - start
+
+
+def score_drift(original: np.ndarray, pruned: np.ndarray, threshold: float = ToxicityPredictor.THRESHOLD) -> Dict:
+    """Differences between two [n, labels] probability matrices."""
+    diff = np.abs(original - pruned)
+    flips = (original > threshold) != (pruned > threshold)
+    return {
+        "max_abs_diff": round(float(diff.max()), 6) if diff.size else 0.0,
+        "mean_abs_diff": round(float(diff.mean()), 6) if diff.size else 0.0,
+        "per_label_max_abs_diff": {
+            label: round(float(diff[:, i].max()), 6) if len(diff) else 0.0
+            for i, label in enumerate(ToxicityPredictor.LABEL_COLUMNS[:diff.shape[1]])
+        },
+        "flag_flip_rate": round(float(flips.any(axis=1).mean()), 6) if len(flips) else 0.0
+    }
+
+
+def unk_rate(tokenizer, texts: Sequence[str]) -> float:
+    """Fraction of tokens that map to the unknown token."""
+    counts = count_tokens(tokenizer, texts)
+    total = counts.sum()
+    return float(counts[tokenizer.unk_token_id] / total) if total else 0.0
+
+
+def prune(
+    corpus_path: str,
+    heldout_path: str,
+    output_dir: str,
+    model_name: str = "distilbert-base-uncased",
+    model_path: str = None,
+    min_count: int = 1,
+    max_vocab: int = None,
+    keep_chars: bool = True,
+    max_corpus_samples: int = None,
+    max_heldout_samples: int = None,
+    max_length: int = 256
+) -> Dict:
+    """
+    Build a vocabulary-pruned artifact and report its savings and drift.
+
+    Args:
+        corpus_path: Texts defining the vocabulary (CSV split or text file)
+        heldout_path: Texts for measuring score drift
+        output_dir: Directory for the pruned model, tokenizer and report
+        model_name: Base model name
+        model_path: Fine-tuned weights (.pt state dict) or model directory
+        min_count: Minimum occurrences for a token to be kept
+        max_vocab: Optional cap on kept corpus tokens
+        keep_chars: Keep single-character pieces for unseen words
+        max_corpus_samples: Optional corpus subsample
+        max_heldout_samples: Optional held-out subsample
+        max_length: Maximum sequence length for scoring
+
+    Returns:
+        Report dictionary (also written to output_dir/pruning_report.json)
+    """
+    loader = ModelLoader(model_name=model_name, model_path=model_path, device="cpu", inference_mode="eager")
+    loader.load_model()
+    model, tokenizer = loader.get_model(), loader.get_tokenizer()
+
+    corpus = load_corpus(corpus_path, max_corpus_samples)
+    heldout = load_corpus(heldout_path, max_heldout_samples)
+
+    start = time.perf_counter()
+    counts = count_tokens(tokenizer, corpus)
+    keep_ids = select_vocab(tokenizer, counts, min_count, max_vocab, keep_chars)
+    logger.info(
+        "✂️  Keeping %d of %d tokens (%d seen in %d texts) in %.1fs",
+        len(keep_ids), len(tokenizer), int((counts > 0).sum()), len(corpus), time.perf_counter() - start
+    )
+
+    pruned_tokenizer = prune_tokenizer(tokenizer, keep_ids, output_dir)
+    pruned_model = prune_embeddings(model, keep_ids)
+    pruned_model.save_pretrained(output_dir)
+
+    original_scores = 1 / (1 + np.exp(-batch_logits(model, tokenizer, heldout, max_length=max_length)))
+    pruned_scores = 1 / (1 + np.exp(-batch_logits(pruned_model, pruned_tokenizer, heldout, max_length=max_length)))
+
+    with tempfile.TemporaryDirectory() as original_dir:
+        # Same on-disk format as the output, so the comparison is like for like
+        model.save_pretrained(original_dir)
+        tokenizer.save_pretrained(original_dir)
+        original_bytes = directory_size(original_dir)
+        original_load = load_seconds(original_dir)
+    pruned_load = load_seconds(output_dir)
+
+    def param_mb(m) -> float:
+        return round(sum(p.numel() * p.element_size() for p in m.parameters()) / (1024 * 1024), 2)
+
+    report = {
+        "vocab_size": {"original": len(tokenizer), "pruned": len(keep_ids)},
+        "parameters": {
+            "original": sum(p.numel() for p in model.parameters()),
+            "pruned": sum(p.numel() for p in pruned_model.parameters())
+        },
+        "parameters_mb": {"original": param_mb(model), "pruned": param_mb(pruned_model)},
+        "artifact_mb": {
+            "original": round(original_bytes / (1024 * 1024), 2),
+            "pruned": round(directory_size(output_dir) / (1024 * 1024), 2)
+        },
+        "load_seconds": {"original": round(original_load, 3), "pruned": round(pruned_load, 3)},
+        "heldout": {
+            "texts": len(heldout),
+            "unk_rate": {"original": round(unk_rate(tokenizer, heldout), 6),
+                         "pruned": round(unk_rate(pruned_tokenizer, heldout), 6)},
+            "drift": score_drift(original_scores, pruned_scores)
+        }
+    }
+
+    with open(os.path.join(output_dir, REPORT_FILE), "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info("✅ Pruned model saved to %s", output_dir)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune the vocabulary and embeddings to the tokens a corpus uses")
+    parser.add_argument("--corpus", required=True, help="Processed CSV or text file (one text per line)")
+    parser.add_argument("--heldout", required=True, help="Held-out texts for measuring score drift")
+    parser.add_argument("--output", default="models/pruned", help="Output model directory")
+    parser.add_argument("--model-name", default=os.getenv("MODEL_NAME", "distilbert-base-uncased"))
+    parser.add_argument("--model-path", default=os.getenv("MODEL_PATH", "models/best_model.pt"))
+    parser.add_argument("--min-count", type=int, default=1)
+    parser.add_argument("--max-vocab", type=int, default=None, help="Cap on kept corpus tokens")
+    parser.add_argument("--no-keep-chars", action="store_true", help="Drop unseen single-character pieces")
+    parser.add_argument("--max-corpus-samples", type=int, default=None)
+    parser.add_argument("--max-heldout-samples", type=int, default=None)
+    parser.add_argument("--max-length", type=int, default=256)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    report = prune(
+        args.corpus, args.heldout, args.output,
+        model_name=args.model_name,
+        model_path=args.model_path,
+        min_count=args.min_count,
+        max_vocab=args.max_vocab,
+        keep_chars=not args.no_keep_chars,
+        max_corpus_samples=args.max_corpus_samples,
+        max_heldout_samples=args.max_heldout_samples,
+        max_length=args.max_length
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Structured logging setup.
+Records are handed to a background queue listener so JSON formatting and
+I/O happen off the event loop, and per-request logs can be sampled.
+The queue is off by default on Lambda, where a frozen container would
+leave the listener thread holding unflushed records.
+"""
+
+import atexit
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+import random
+from pythonjsonlogger import jsonlogger
+
+REQUEST_LOGGER_NAME = "api.request"
+
+_listener = None
+
+
+class SamplingFilter(logging.Filter):
+    """Pass a random fraction of records; warnings and errors always pass."""
+
+    def __init__(self, rate: float = 1.0):
+        """
+        Initialize sampling filter.
+
+        Args:
+            rate: Fraction of sub-WARNING records to keep (0.0 - 1.0)
+        """
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves JSON formatting and I/O to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only records that passed the level and sampling checks get here.
+        # Like the stock prepare(), merge msg % args and render the traceback
+        # on the calling thread so the listener never sees live arguments.
+        # Unlike it, keep the traceback out of the message so the JSON
+        # formatter still emits it as its own exc_info field.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(level: str = None, sample_rate: float = None, use_queue: bool = None):
+    """
+    Configure root logging once for the process.
+
+    Args:
+        level: Root log level (defaults to LOG_LEVEL env var or INFO)
+        sample_rate: Fraction of per-request logs to keep (defaults to LOG_SAMPLE_RATE or 1.0)
+        use_queue: Format and write records on a background thread
+            (defaults to LOG_QUEUE, or true outside Lambda)
+    """
+    global _listener
+
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    if sample_rate is None:
+        sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+    if use_queue is None:
+        default = "false" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "true"
+        use_queue = os.getenv("LOG_QUEUE", default).lower() == "true"
+
+    root = logging.getLogger()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(jsonlogger.JsonFormatter(
+        fmt='%(asctime)s %(levelname)s %(name)s %(message)s'
+    ))
+
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        root.addHandler(_DeferredQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(
+            log_queue, stream_handler, respect_handler_level=True
+        )
+        _listener.start()
+    else:
+        root.addHandler(stream_handler)
+
+    root.setLevel(level)
+
+    request_logger = logging.getLogger(REQUEST_LOGGER_NAME)
+    for existing in request_logger.filters[:]:
+        if isinstance(existing, SamplingFilter):
+            request_logger.removeFilter(existing)
+    request_logger.addFilter(SamplingFilter(sample_rate))
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background listener."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
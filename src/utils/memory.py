@@ -0,0 +1,177 @@
+"""
+Process memory instrumentation.
+
+Samples current and peak RSS around pipeline stages (model load,
+tokenization, forward pass) and, on demand, counts live tensors and
+reports the largest Python allocation sites via tracemalloc. Stage
+sampling is rate-limited so the hot path pays for a /proc read only on a
+fraction of requests.
+"""
+
+import gc
+import logging
+import os
+import random
+import resource
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_PAGE_MB = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except (OSError, IndexError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """High-water mark of RSS in MB (since start, or since the last reset_peak())."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kB on Linux
+
+
+def reset_peak() -> bool:
+    """Reset the RSS high-water mark (Linux 4.0+); False if not permitted."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def live_tensors() -> Dict:
+    """
+    Count tensors reachable by the garbage collector, grouped by dtype.
+
+    Walks every tracked object, so it's for on-demand debugging only.
+    """
+    import torch
+
+    by_dtype = defaultdict(lambda: {"count": 0, "mb": 0.0})
+    for obj in gc.get_objects():
+        try:
+            if isinstance(obj, torch.Tensor):
+                entry = by_dtype[str(obj.dtype).replace("torch.", "")]
+                entry["count"] += 1
+                entry["mb"] += obj.element_size() * obj.nelement() / (1024 * 1024)
+        except Exception:
+            continue  # Objects that raise on isinstance (lazy proxies)
+    return {
+        "count": sum(e["count"] for e in by_dtype.values()),
+        "mb": round(sum(e["mb"] for e in by_dtype.values()), 2),
+        "by_dtype": {k: {"count": v["count"], "mb": round(v["mb"], 2)} for k, v in by_dtype.items()}
+    }
+
+
+def start_tracing(frames: int = 1) -> bool:
+    """Start tracemalloc if it isn't running; True if this call started it."""
+    if tracemalloc.is_tracing():
+        return False
+    tracemalloc.start(frames)
+    return True
+
+
+def top_allocations(limit: int = 10) -> Optional[List[Dict]]:
+    """Largest allocation sites since tracing started, or None when not tracing."""
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "kb": round(stat.size / 1024, 1),
+            "blocks": stat.count
+        }
+        for stat in snapshot.statistics("lineno")[:limit]
+    ]
+
+
+class MemoryTracker:
+    """Per-stage RSS deltas and peaks, sampled on a fraction of calls."""
+
+    def __init__(self, sample_rate: float = None):
+        """
+        Initialize tracker.
+
+        Args:
+            sample_rate: Fraction of stage calls measured (defaults to MEMORY_SAMPLE_RATE env var)
+        """
+        self.sample_rate = float(os.getenv("MEMORY_SAMPLE_RATE", "0.01")) if sample_rate is None else sample_rate
+        self._stages = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.baseline_rss_mb = current_rss_mb()
+
+    @contextmanager
+    def stage(self, name: str, always: bool = False):
+        """
+        Measure RSS before and after the block on sampled calls.
+
+        Args:
+            name: Stage name (e.g. "model_load", "tokenize", "forward")
+            always: Measure regardless of the sample rate (one-off stages)
+        """
+        if not always and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            yield
+            return
+
+        before = current_rss_mb()
+        try:
+            yield
+        finally:
+            after = current_rss_mb()
+            self._record(name, before, after, peak_rss_mb())
+
+    def _record(self, name: str, before: float, after: float, peak: float):
+        with self._lock:
+            entry = self._stages.setdefault(name, {
+                "samples": 0, "last_delta_mb": 0.0, "max_delta_mb": 0.0, "total_delta_mb": 0.0, "peak_rss_mb": 0.0
+            })
+            delta = after - before
+            entry["samples"] += 1
+            entry["last_delta_mb"] = round(delta, 2)
+            entry["max_delta_mb"] = round(max(entry["max_delta_mb"], delta), 2)
+            entry["total_delta_mb"] = round(entry["total_delta_mb"] + delta, 2)
+            entry["peak_rss_mb"] = round(max(entry["peak_rss_mb"], peak), 2)
+            entry["rss_after_mb"] = round(after, 2)
+
+    def snapshot(self) -> Dict:
+        """Current/peak RSS, growth since start and per-stage measurements."""
+        rss = current_rss_mb()
+        with self._lock:
+            stages = {name: dict(entry) for name, entry in self._stages.items()}
+        return {
+            "rss_mb": round(rss, 2),
+            "peak_rss_mb": round(peak_rss_mb(), 2),
+            "growth_since_start_mb": round(rss - self.baseline_rss_mb, 2),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "sample_rate": self.sample_rate,
+            "stages": stages
+        }
+
+
+# Process-wide tracker used by the model loader, predictor and API
+tracker = MemoryTracker()
+
+if os.getenv("MEMORY_TRACEMALLOC", "").lower() in ("1", "true", "yes"):
+    start_tracing()
@@ -5,6 +5,9 @@ Applies the same cleaning used during training.
 
 import re
 
+# Bump whenever clean_text's output changes, so cached training tokens are rebuilt
+CLEAN_TEXT_VERSION = "1"
+
 
 def clean_text(text: str) -> str:
     """
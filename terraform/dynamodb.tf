@@ -1,3 +1,6 @@
+# Original prediction log (one item per prediction_id). The app no longer
+# writes here; it is kept so existing history is not destroyed. See
+# "Migrating the Audit Table" in README.md before removing it.
 resource "aws_dynamodb_table" "predictions" {
   name         = "${var.dynamodb_table_name}-${var.environment}"
   billing_mode = "PAY_PER_REQUEST"
@@ -28,3 +31,50 @@ resource "aws_dynamodb_table" "predictions" {
     CostCenter = "Free Tier"
   }
 }
+
+# Audit log of predictions, laid out for time-range queries.
+#   Predictions: bucket = "P#<hour>#<shard>", sk = "<epoch_ms>#<prediction_id>"
+#   Rollups:     bucket = "R#<day>",          sk = "<hour>#<category>"
+# See src/audit/schema.py for the full key layout.
+resource "aws_dynamodb_table" "audit" {
+  name         = "${var.dynamodb_table_name}-audit-${var.environment}"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "bucket"
+  range_key    = "sk"
+  
+  attribute {
+    name = "bucket"
+    type = "S"
+  }
+  
+  attribute {
+    name = "sk"
+    type = "S"
+  }
+  
+  attribute {
+    name = "toxicity"
+    type = "N"
+  }
+  
+  # Range queries on max label score within a time bucket
+  local_secondary_index {
+    name            = "by_toxicity"
+    range_key       = "toxicity"
+    projection_type = "ALL"
+  }
+  
+  ttl {
+    attribute_name = "ttl"
+    enabled        = true
+  }
+  
+  point_in_time_recovery {
+    enabled = false
+  }
+  
+  tags = {
+    Name       = "Moderation Audit Log"
+    CostCenter = "Free Tier"
+  }
+}
@@ -37,10 +37,15 @@ resource "aws_iam_role_policy" "lambda_policy" {
         Effect = "Allow"
         Action = [
           "dynamodb:PutItem",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:UpdateItem",
           "dynamodb:GetItem",
           "dynamodb:Query"
         ]
-        Resource = aws_dynamodb_table.predictions.arn
+        Resource = [
+          aws_dynamodb_table.audit.arn,
+          "${aws_dynamodb_table.audit.arn}/index/*"
+        ]
       },
       {
         Effect = "Allow"
@@ -13,7 +13,8 @@ resource "aws_lambda_function" "moderation_api" {
       MODEL_BUCKET    = aws_s3_bucket.model_storage.id
       MODEL_KEY       = "models/best_model.pt"
       MODEL_PATH      = "/tmp/best_model.pt"
-      DYNAMODB_TABLE  = aws_dynamodb_table.predictions.name
+      DYNAMODB_TABLE  = aws_dynamodb_table.audit.name
+      AUDIT_SHARDS    = "4"
       TRANSFORMERS_CACHE = "/tmp/transformers_cache"
       HF_HOME            = "/tmp/hf_home"
     }
@@ -4,10 +4,15 @@ output "s3_bucket_name" {
 }
 
 output "dynamodb_table_name" {
-  description = "Name of the DynamoDB table"
+  description = "Name of the original DynamoDB predictions table (no longer written)"
   value       = aws_dynamodb_table.predictions.name
 }
 
+output "audit_table_name" {
+  description = "Name of the DynamoDB audit table the API writes to"
+  value       = aws_dynamodb_table.audit.name
+}
+
 output "lambda_function_name" {
   description = "Name of the Lambda function"
   value       = aws_lambda_function.moderation_api.function_name
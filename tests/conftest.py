@@ -0,0 +1,103 @@
+import copy
+import os
+
+import pytest
+from transformers import DistilBertConfig, DistilBertForSequenceClassification, DistilBertTokenizer
+from unittest.mock import MagicMock, patch
+
+from src.api.admission import AdmissionController
+
+TINY_VOCAB = [
+    "[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]",
+    "you", "are", "a", "the", "stupid", "idiot", "hello", "world", "nice", "comment",
+    "i", "hate", "love", "this", "is", "great", "bad", "thanks", "for", "help",
+    "##s", "##ing", "##ed", "##ly"
+]
+
+TOXIC_PREDICTION = {
+    'is_toxic': True,
+    'toxicity_scores': {'toxic': 0.95, 'severe_toxic': 0.1, 'obscene': 0.8, 'threat': 0.0, 'insult': 0.7, 'identity_hate': 0.0},
+    'flagged_categories': ['toxic', 'obscene', 'insult'],
+    'confidence': 0.95
+}
+
+CLEAN_PREDICTION = {
+    'is_toxic': False,
+    'toxicity_scores': {'toxic': 0.01, 'severe_toxic': 0.0, 'obscene': 0.0, 'threat': 0.0, 'insult': 0.0, 'identity_hate': 0.0},
+    'flagged_categories': [],
+    'confidence': 0.01
+}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def job_db_path(tmp_path_factory):
+    """Keep the job store that app lifespans open out of the working tree."""
+    os.environ.setdefault("JOB_DB_PATH", str(tmp_path_factory.mktemp("jobs") / "jobs.sqlite3"))
+
+
+@pytest.fixture(scope="session")
+def tiny_model_dir(tmp_path_factory):
+    """A randomly initialized 2-layer DistilBERT saved like a Hugging Face checkpoint."""
+    path = tmp_path_factory.mktemp("tiny_model")
+    vocab_file = path / "vocab.txt"
+    vocab_file.write_text("\n".join(TINY_VOCAB) + "\n")
+
+    tokenizer = DistilBertTokenizer(str(vocab_file))
+    config = DistilBertConfig(
+        vocab_size=len(TINY_VOCAB),
+        dim=32,
+        hidden_dim=64,
+        n_layers=2,
+        n_heads=2,
+        max_position_embeddings=512,
+        num_labels=6,
+        problem_type="multi_label_classification"
+    )
+    model = DistilBertForSequenceClassification(config)
+    model.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return str(path)
+
+
+@pytest.fixture
+def toxic_prediction():
+    """Predictor output for a text flagged as toxic, obscene and insult."""
+    return copy.deepcopy(TOXIC_PREDICTION)
+
+
+@pytest.fixture
+def clean_prediction():
+    """Predictor output for a text that isn't flagged."""
+    return copy.deepcopy(CLEAN_PREDICTION)
+
+
+@pytest.fixture
+def fake_predictor(toxic_prediction, clean_prediction):
+    """Mock predictor that flags any text containing "idiot"."""
+    def predict(text):
+        return toxic_prediction if "idiot" in text else clean_prediction
+
+    predictor = MagicMock()
+    predictor.predict.side_effect = predict
+    predictor.predict_batch.side_effect = lambda texts: [predict(text) for text in texts]
+    return predictor
+
+
+@pytest.fixture
+def serve_app():
+    """
+    Patch the API module to serve in-process with the given predictor.
+
+    Returns a function taking the predictor, an optional AdmissionController
+    and any other src.api.main globals to replace; its result is a context
+    manager. Audit writes are disabled and the app lifespan is not run.
+    """
+    def serve(predictor, admission=None, **overrides):
+        return patch.multiple(
+            'src.api.main',
+            predictor=predictor,
+            admission=admission or AdmissionController(max_concurrent=2, max_queue=8),
+            get_audit_writer=lambda: None,
+            **overrides
+        )
+    return serve
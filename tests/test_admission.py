@@ -0,0 +1,155 @@
+import asyncio
+import time
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from src.api.admission import AdmissionController, QueueFullError, DeadlineExceededError
+from src.api.main import app
+
+
+class TestAdmissionController:
+    def test_admits_up_to_limit(self):
+        """Test slots are granted immediately while under the concurrency limit."""
+        async def scenario():
+            controller = AdmissionController(max_concurrent=2, max_queue=1)
+            await controller.acquire()
+            await controller.acquire()
+            assert controller.active == 2
+            assert controller.queued() == 0
+
+        asyncio.run(scenario())
+
+    def test_sheds_when_queue_full(self):
+        """Test requests beyond the queue limit are rejected with 429."""
+        async def scenario():
+            controller = AdmissionController(max_concurrent=1, max_queue=1)
+            await controller.acquire()
+            waiter = asyncio.create_task(controller.acquire())
+            await asyncio.sleep(0)
+            with pytest.raises(QueueFullError) as exc_info:
+                await controller.acquire()
+            assert exc_info.value.status_code == 429
+            assert exc_info.value.retry_after >= 1
+            assert controller.shed["interactive"] == 1
+            waiter.cancel()
+
+        asyncio.run(scenario())
+
+    def test_deadline_drops_queued_work(self):
+        """Test queued requests time out before reaching the model."""
+        async def scenario():
+            controller = AdmissionController(max_concurrent=1, max_queue=4)
+            await controller.acquire()
+            with pytest.raises(DeadlineExceededError) as exc_info:
+                await controller.acquire(deadline=time.monotonic() + 0.01)
+            assert exc_info.value.status_code == 503
+            assert controller.timed_out["interactive"] == 1
+            assert controller.queued() == 0
+
+        asyncio.run(scenario())
+
+    def test_expired_deadline_rejected_when_idle(self):
+        """Test an already expired deadline is refused even with free slots."""
+        async def scenario():
+            controller = AdmissionController(max_concurrent=2)
+            with pytest.raises(DeadlineExceededError):
+                await controller.acquire(deadline=time.monotonic() - 1)
+            assert controller.active == 0
+            assert controller.admitted["interactive"] == 0
+            assert controller.timed_out["interactive"] == 1
+
+        asyncio.run(scenario())
+
+    def test_interactive_overtakes_bulk(self):
+        """Test a freed slot goes to interactive waiters before bulk ones."""
+        async def scenario():
+            controller = AdmissionController(max_concurrent=1, max_queue=4)
+            order = []
+
+            async def run(lane):
+                async with controller.slot(lane):
+                    order.append(lane)
+
+            async with controller.slot("interactive"):
+                bulk = asyncio.create_task(run("bulk"))
+                await asyncio.sleep(0)
+                interactive = asyncio.create_task(run("interactive"))
+                await asyncio.sleep(0)
+            await asyncio.gather(bulk, interactive)
+
+            assert order == ["interactive", "bulk"]
+            assert controller.active == 0
+            snapshot = controller.snapshot()
+            assert snapshot["queue_wait"]["count"] == 2
+
+        asyncio.run(scenario())
+
+
+class TestAdmissionAPI:
+    def test_overloaded_returns_retry_after(self):
+        """Test the API maps shed requests to 429 with Retry-After."""
+        controller = AdmissionController(max_concurrent=1, max_queue=0)
+        controller._active = 1  # Simulate a busy model
+        with patch('src.api.main.predictor'), \
+             patch('src.api.main.admission', controller):
+            client = TestClient(app)
+            response = client.post("/moderate", json={"text": "hello"})
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+
+    @pytest.mark.parametrize("path, payload", [
+        ("/moderate", {"text": "hello"}),
+        ("/moderate/batch", {"texts": ["hello"]}),
+        ("/moderate/incremental", {"document_id": "doc", "text": "hello"}),
+    ])
+    def test_invalid_priority(self, path, payload):
+        """Test unknown priority lanes are rejected."""
+        with patch('src.api.main.predictor') as mock_pred:
+            client = TestClient(app)
+            response = client.post(path, json=payload, headers={"X-Priority": "urgent"})
+        assert response.status_code == 400
+        assert "X-Priority" in response.json()["detail"]
+        mock_pred.predict.assert_not_called()
+        mock_pred.predict_batch.assert_not_called()
+
+    def test_rejection_on_batch(self):
+        """Test the batch endpoint maps admission rejections the same way."""
+        controller = AdmissionController(max_concurrent=1, max_queue=0)
+        controller._active = 1
+        with patch('src.api.main.predictor'), \
+             patch('src.api.main.admission', controller):
+            response = TestClient(app).post("/moderate/batch", json={"texts": ["hello"]})
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+
+    @pytest.mark.parametrize("budget_ms", ["0", "-50"])
+    def test_expired_deadline_header(self, budget_ms):
+        """Test a request whose deadline has already passed never reaches the model."""
+        with patch('src.api.main.predictor') as mock_pred, \
+             patch('src.api.main.admission', AdmissionController(max_concurrent=2)):
+            response = TestClient(app).post(
+                "/moderate", json={"text": "hello"}, headers={"X-Request-Deadline-Ms": budget_ms}
+            )
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        mock_pred.predict.assert_not_called()
+
+    def test_admitted_request_and_stats(self):
+        """Test admitted requests reach the model and are counted."""
+        controller = AdmissionController(max_concurrent=1, max_queue=1)
+        prediction = {
+            'is_toxic': False,
+            'toxicity_scores': {'toxic': 0.01, 'severe_toxic': 0.0, 'obscene': 0.0, 'threat': 0.0, 'insult': 0.0, 'identity_hate': 0.0},
+            'flagged_categories': [],
+            'confidence': 0.01
+        }
+        with patch('src.api.main.predictor') as mock_pred, \
+             patch('src.api.main.admission', controller):
+            mock_pred.predict.return_value = prediction
+            client = TestClient(app)
+            response = client.post("/moderate", json={"text": "hello"}, headers={"X-Priority": "bulk"})
+            stats = client.get("/admission").json()
+        assert response.status_code == 200
+        assert stats["admitted"]["bulk"] == 1
+        assert stats["active"] == 0
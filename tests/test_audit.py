@@ -0,0 +1,141 @@
+import os
+import time
+import boto3
+import pytest
+from moto import mock_dynamodb
+from unittest.mock import patch
+
+from src.audit import AuditWriter, AuditQuery
+from src.audit import schema
+
+T0 = 1760000000.0  # Fixed reference time
+
+
+AWS_TEST_ENV = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1"
+}
+
+
+@pytest.fixture
+def table():
+    # moto stands in for DynamoDB; the table mirrors terraform/dynamodb.tf
+    with patch.dict(os.environ, AWS_TEST_ENV), mock_dynamodb():
+        dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+        yield schema.create_table(dynamodb, 'audit-test')
+
+
+class TestSchema:
+    def test_sort_keys_order_by_time(self):
+        assert schema.prediction_sort_key(T0, "b") < schema.prediction_sort_key(T0 + 1, "a")
+
+    def test_hours_between(self):
+        hours = schema.hours_between(T0, T0 + 2 * schema.HOUR)
+        assert len(hours) == 3
+        assert schema.hour_bucket(hours[0]) == schema.hour_bucket(T0)
+
+    def test_histogram_bin_bounds(self):
+        assert schema.histogram_bin(0.0) == 0
+        assert schema.histogram_bin(1.0) == schema.HISTOGRAM_BINS - 1
+
+
+class TestAuditWriterAndQuery:
+    def test_time_range_query(self, table, toxic_prediction, clean_prediction):
+        """Test predictions are found by time range without scanning."""
+        writer = AuditWriter(table, shards=2, flush_interval=3600)
+        writer.submit(["bad text"], [toxic_prediction], timestamp=T0)
+        writer.submit(["nice text"], [clean_prediction], timestamp=T0 + 10)
+        writer.submit(["old text"], [toxic_prediction], timestamp=T0 - 2 * schema.HOUR)
+        assert writer.drain()
+
+        query = AuditQuery(table, shards=2)
+        items = query.predictions_between(T0 - 60, T0 + 60)
+        assert [item['text_snippet'] for item in items] == ["bad text", "nice text"]
+        writer.close()
+
+    def test_toxicity_range_query(self, table, toxic_prediction, clean_prediction):
+        """Test the toxicity index returns only high-scoring predictions."""
+        writer = AuditWriter(table, shards=2, flush_interval=3600)
+        writer.submit(["bad text", "nice text"], [toxic_prediction, clean_prediction], timestamp=T0)
+        assert writer.drain()
+
+        query = AuditQuery(table, shards=2)
+        items = query.predictions_between(T0 - 60, T0 + 60, min_toxicity=0.5)
+        assert len(items) == 1
+        assert items[0]['toxicity'] == pytest.approx(0.95)
+        writer.close()
+
+    def test_rollups(self, table, toxic_prediction, clean_prediction):
+        """Test flag rates and histograms come from rollup items."""
+        writer = AuditWriter(table, shards=2, flush_interval=3600)
+        writer.submit(["bad text"], [toxic_prediction], timestamp=T0)
+        writer.submit(["nice text"], [clean_prediction], timestamp=T0 + 10)
+        assert writer.drain()
+        assert writer.flush_rollups() == 7  # six categories plus the total
+
+        # A second flush adds to the existing counters
+        writer.submit(["bad text"], [toxic_prediction], timestamp=T0 + 20)
+        writer.close()  # Drains the queue, then flushes the rollups
+
+        query = AuditQuery(table, shards=2)
+        rates = query.flag_rates(T0 - 60, T0 + 60)
+        day = schema.day_bucket(T0)
+        assert rates[day][schema.ALL_CATEGORIES] == pytest.approx(2 / 3, abs=1e-4)
+        assert rates[day]['threat'] == 0.0
+
+        histogram = query.score_histogram('toxic', T0 - 60, T0 + 60)
+        assert sum(histogram) == 3
+        assert histogram[schema.histogram_bin(0.95)] == 2
+
+    def test_flush_on_interval(self, table, toxic_prediction):
+        """Test the background thread flushes rollups with the batch when the interval has passed."""
+        writer = AuditWriter(table, shards=1, flush_interval=0)
+        writer.submit(["bad text"], [toxic_prediction], timestamp=T0)
+        assert writer.drain()
+        query = AuditQuery(table, shards=1)
+        assert query.score_histogram('toxic', T0, T0) != [0] * schema.HISTOGRAM_BINS
+        writer.close()
+
+
+class TestBackgroundWriter:
+    def test_submit_writes_in_batches(self, table, toxic_prediction):
+        writer = AuditWriter(table, shards=2, flush_interval=3600, batch_size=10)
+        with patch.object(table, "batch_writer", wraps=table.batch_writer) as batch_writer:
+            assert writer.submit([f"text {i}" for i in range(25)], [toxic_prediction] * 25, ip_address="1.2.3.4") == 0
+            assert writer.drain(timeout=5)
+        assert 3 <= batch_writer.call_count <= 25
+        writer.close()
+
+        now = time.time()
+        query = AuditQuery(table, shards=2)
+        assert len(query.predictions_between(now - 60, now + 60)) == 25
+        assert sum(query.score_histogram('toxic', now - 60, now + 60)) == 25
+
+    def test_timed_flush_without_traffic(self, table, toxic_prediction):
+        writer = AuditWriter(table, shards=1, flush_interval=0.1)
+        writer.submit(["bad text"], [toxic_prediction])
+        now = time.time()
+        query = AuditQuery(table, shards=1)
+        deadline = time.monotonic() + 5
+        while sum(query.score_histogram('toxic', now - 60, now + 60)) == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert sum(query.score_histogram('toxic', now - 60, now + 60)) == 1
+        writer.close()
+
+    def test_full_queue_drops(self, table, clean_prediction):
+        writer = AuditWriter(table, shards=1, flush_interval=3600, max_queue=2)
+        with patch.object(writer, "start"):  # No consumer, so the queue fills
+            assert writer.submit(["a", "b", "c"], [clean_prediction] * 3) == 1
+        assert writer.dropped == 1
+
+    def test_failed_rollup_is_retried(self, table, toxic_prediction):
+        writer = AuditWriter(table, shards=1, flush_interval=3600)
+        writer.add_to_rollups(toxic_prediction['toxicity_scores'], True, T0)
+        with patch.object(table, "update_item", side_effect=RuntimeError("throttled")):
+            assert writer.flush_rollups() == 0
+        writer.add_to_rollups(toxic_prediction['toxicity_scores'], True, T0 + 10)
+        assert writer.flush_rollups() == 7
+
+        query = AuditQuery(table, shards=1)
+        assert sum(query.score_histogram('toxic', T0 - 60, T0 + 60)) == 2
@@ -0,0 +1,184 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.admission import AdmissionController
+from src.api.main import app
+from src.client import AsyncModerationClient, ModerationAPIError, ModerationClient, RetryPolicy
+
+NO_WAIT = RetryPolicy(max_retries=2, backoff_base=0.0)
+
+
+@pytest.fixture
+def predictor(fake_predictor, serve_app):
+    with serve_app(fake_predictor, AdmissionController(max_concurrent=4, max_queue=64)):
+        yield fake_predictor
+
+
+def flaky_transport(statuses, result):
+    """Transport answering with the given statuses in turn, then a batch with one result."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) <= len(statuses):
+            return httpx.Response(statuses[len(calls) - 1], json={"detail": "busy"}, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"results": [result]})
+
+    return httpx.MockTransport(handler), calls
+
+
+class TestBatchEndpoint:
+    def test_batch_in_order(self, predictor):
+        response = TestClient(app).post("/moderate/batch", json={"texts": ["you idiot", "hello"]})
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["is_toxic"] for r in results] == [True, False]
+        predictor.predict_batch.assert_called_once_with(["you idiot", "hello"])
+
+    def test_invalid_text_rejects_batch(self, predictor):
+        response = TestClient(app).post("/moderate/batch", json={"texts": ["hello", "   "]})
+        assert response.status_code == 400
+        assert "texts[1]" in response.json()["detail"]
+        predictor.predict_batch.assert_not_called()
+
+
+class TestModerationClient:
+    def test_concurrent_calls_are_batched(self, predictor):
+        """Test calls from many threads share batch requests."""
+        texts = [f"comment {i}" for i in range(7)] + ["you idiot"]
+        results = {}
+        client = ModerationClient(http_client=TestClient(app), max_batch_size=8, max_wait=0.5)
+
+        def call(text):
+            results[text] = client.moderate(text)
+
+        threads = [threading.Thread(target=call, args=(t,)) for t in texts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        client.close()
+
+        assert results["you idiot"]["is_toxic"] is True
+        assert results["comment 0"]["is_toxic"] is False
+        assert predictor.predict_batch.call_count < len(texts)
+        stats = client.stats.snapshot()
+        assert stats["calls"] == len(texts)
+        assert stats["requests"] == predictor.predict_batch.call_count
+        assert stats["latency_ms"]["max"] >= stats["latency_ms"]["p50"]
+
+    def test_moderate_many_chunks(self, predictor):
+        with ModerationClient(http_client=TestClient(app), max_batch_size=3) as client:
+            results = client.moderate_many(["a idiot", "b", "c", "d", "e"])
+        assert [r["is_toxic"] for r in results] == [True, False, False, False, False]
+        assert predictor.predict_batch.call_count == 2
+
+    def test_unbatched_mode_uses_single_endpoint(self, predictor):
+        with ModerationClient(http_client=TestClient(app), max_batch_size=1) as client:
+            assert client.moderate("you idiot")["is_toxic"] is True
+        predictor.predict.assert_called_once()
+
+    def test_invalid_text_raises_locally(self, predictor):
+        with ModerationClient(http_client=TestClient(app)) as client:
+            with pytest.raises(ValueError):
+                client.moderate("   ")
+
+    def test_retries_throttling(self, clean_prediction):
+        transport, calls = flaky_transport([429, 503], clean_prediction)
+        http = httpx.Client(transport=transport, base_url="http://test")
+        with ModerationClient(http_client=http, retry=NO_WAIT) as client:
+            assert client.moderate("hello") == clean_prediction
+        assert len(calls) == 3
+        assert client.stats.snapshot()["retries"] == 2
+
+    def test_retries_are_bounded(self, clean_prediction):
+        transport, calls = flaky_transport([503] * 5, clean_prediction)
+        http = httpx.Client(transport=transport, base_url="http://test")
+        with ModerationClient(http_client=http, retry=NO_WAIT, max_batch_size=1) as client:
+            with pytest.raises(ModerationAPIError) as exc:
+                client.moderate("hello")
+        assert exc.value.status_code == 503
+        assert len(calls) == 3
+        assert client.stats.snapshot()["errors"] == 1
+
+    def test_short_batch_fails_every_call(self, clean_prediction):
+        """Test a result list that doesn't match the texts fails the batch instead of hanging callers."""
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"results": [clean_prediction]}))
+        http = httpx.Client(transport=transport, base_url="http://test")
+        with ModerationClient(http_client=http, max_batch_size=2, max_wait=1.0) as client:
+            futures = [client._batcher.submit(text) for text in ["a", "b"]]
+            for future in futures:
+                with pytest.raises(ModerationAPIError, match="1 results for 2 texts"):
+                    future.result(timeout=5)
+
+    def test_batched_call_times_out(self, clean_prediction):
+        release = threading.Event()
+
+        def handler(request):
+            release.wait(5)
+            return httpx.Response(200, json={"results": [clean_prediction]})
+
+        http = httpx.Client(transport=httpx.MockTransport(handler), base_url="http://test")
+        client = ModerationClient(http_client=http, timeout=0.05, retry=RetryPolicy(max_retries=0))
+        with pytest.raises(TimeoutError):
+            client.moderate("hello")
+        release.set()
+        client.close()
+        assert client.stats.snapshot()["errors"] == 1
+
+    def test_client_errors_not_retried(self, clean_prediction):
+        transport, calls = flaky_transport([400], clean_prediction)
+        http = httpx.Client(transport=transport, base_url="http://test")
+        with ModerationClient(http_client=http, retry=NO_WAIT) as client:
+            with pytest.raises(ModerationAPIError):
+                client.moderate("hello")
+        assert len(calls) == 1
+
+
+class TestAsyncModerationClient:
+    def test_gathered_calls_are_batched(self, predictor):
+        async def scenario():
+            http = httpx.AsyncClient(app=app, base_url="http://testserver")
+            async with AsyncModerationClient(http_client=http, max_batch_size=4, max_wait=0.05) as client:
+                results = await asyncio.gather(*(client.moderate(t) for t in ["you idiot", "a", "b", "c", "d"]))
+            await http.aclose()
+            return client, results
+
+        client, results = asyncio.run(scenario())
+        assert [r["is_toxic"] for r in results] == [True, False, False, False, False]
+        assert predictor.predict_batch.call_count == 2  # One full batch, one flushed by time
+        assert client.stats.snapshot()["calls"] == 5
+
+    def test_retries_throttling(self, clean_prediction):
+        transport, calls = flaky_transport([429], clean_prediction)
+
+        async def scenario():
+            http = httpx.AsyncClient(transport=transport, base_url="http://test")
+            async with AsyncModerationClient(http_client=http, retry=NO_WAIT) as client:
+                return await client.moderate_many(["hello"])
+
+        assert asyncio.run(scenario()) == [clean_prediction]
+        assert len(calls) == 2
+
+
+    def test_short_batch_raises(self, clean_prediction):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"results": [clean_prediction]}))
+
+        async def scenario():
+            http = httpx.AsyncClient(transport=transport, base_url="http://test")
+            async with AsyncModerationClient(http_client=http, max_batch_size=4, max_wait=0.05) as client:
+                return await asyncio.gather(client.moderate("a"), client.moderate("b"), return_exceptions=True)
+
+        assert all(isinstance(result, ModerationAPIError) for result in asyncio.run(scenario()))
+
+
+class TestRetryPolicy:
+    def test_delay_is_bounded(self):
+        policy = RetryPolicy(backoff_base=0.1, backoff_max=0.5)
+        assert all(0 <= policy.delay(attempt) <= 0.5 for attempt in range(10))
+        assert policy.delay(0, retry_after="30") == 0.5
+        assert policy.delay(0, retry_after="0.2") == 0.2
@@ -0,0 +1,101 @@
+import pytest
+import torch
+from transformers import DistilBertForSequenceClassification, DistilBertTokenizer
+
+from src.models import compiled
+from src.models.model_loader import ModelLoader
+from src.models.predictor import ToxicityPredictor
+
+BUCKETS = (8, 16, 32)
+
+
+@pytest.fixture
+def eager_model(tiny_model_dir):
+    return DistilBertForSequenceClassification.from_pretrained(tiny_model_dir).eval()
+
+
+class TestBucketedScriptModel:
+    def test_bucket_routing(self, eager_model):
+        bucketed = compiled.build_bucketed_model(eager_model, BUCKETS, vocab_size=eager_model.config.vocab_size)
+        assert bucketed.bucket_for(5) == 8
+        assert bucketed.bucket_for(8) == 8
+        assert bucketed.bucket_for(9) == 16
+        with pytest.raises(ValueError):
+            bucketed.bucket_for(33)
+
+    def test_parity_with_eager(self, eager_model):
+        """Test traced logits match eager logits after bucket padding."""
+        bucketed = compiled.build_bucketed_model(eager_model, BUCKETS, vocab_size=eager_model.config.vocab_size)
+        input_ids = torch.tensor([[2, 5, 6, 9, 3]])
+        attention_mask = torch.ones_like(input_ids)
+        with torch.no_grad():
+            eager = eager_model(input_ids=input_ids, attention_mask=attention_mask).logits
+            traced = bucketed(input_ids, attention_mask).logits
+        assert torch.allclose(eager, traced, atol=compiled.PARITY_TOLERANCE)
+
+    def test_cache_roundtrip(self, eager_model, tmp_path):
+        bucketed = compiled.build_bucketed_model(
+            eager_model, BUCKETS, vocab_size=eager_model.config.vocab_size, meta={"fine_tuned": True}
+        )
+        compiled.save_cached(bucketed, str(tmp_path), "key")
+        loaded = compiled.load_cached(str(tmp_path), "key")
+        assert loaded.sequence_buckets == BUCKETS
+        assert loaded.meta["fine_tuned"] is True
+        assert compiled.load_cached(str(tmp_path), "missing") is None
+
+    def test_cache_key_changes_with_buckets(self):
+        assert compiled.cache_key("m", None, (32, 64)) != compiled.cache_key("m", None, (32, 128))
+
+    def test_cache_key_tracks_files_in_model_dir(self, tmp_path):
+        (tmp_path / "config.json").write_text("{}")
+        (tmp_path / "model.safetensors").write_bytes(b"a")
+        before = compiled.cache_key("m", str(tmp_path), (32,))
+        (tmp_path / "vocab.txt").write_text("x")  # Not config or weights
+        assert compiled.cache_key("m", str(tmp_path), (32,)) == before
+        (tmp_path / "model.safetensors").write_bytes(b"bb")
+        assert compiled.cache_key("m", str(tmp_path), (32,)) != before
+
+
+class TestTorchScriptLoader:
+    def test_loader_traces_then_reuses_cache(self, tiny_model_dir, tmp_path):
+        """Test the first load traces and caches, and the second load skips tracing."""
+        def make_loader():
+            return ModelLoader(
+                model_name=tiny_model_dir,
+                inference_mode="torchscript",
+                sequence_buckets=BUCKETS,
+                torchscript_cache_dir=str(tmp_path)
+            )
+
+        first = make_loader()
+        first.load_model()
+        assert isinstance(first.get_model(), compiled.BucketedScriptModel)
+        assert len(list(tmp_path.glob("*.pt"))) == 1
+
+        second = make_loader()
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(compiled, "trace_buckets", lambda *a, **k: pytest.fail("re-traced"))
+            second.load_model()
+        assert isinstance(second.get_model(), compiled.BucketedScriptModel)
+
+    def test_predictor_matches_eager(self, tiny_model_dir, tmp_path):
+        """Test end-to-end predictions agree between eager and bucketed modes."""
+        tokenizer = DistilBertTokenizer.from_pretrained(tiny_model_dir)
+        loader = ModelLoader(
+            model_name=tiny_model_dir,
+            inference_mode="torchscript",
+            sequence_buckets=BUCKETS,
+            torchscript_cache_dir=str(tmp_path)
+        )
+        loader.load_model()
+        eager = DistilBertForSequenceClassification.from_pretrained(tiny_model_dir).eval()
+
+        bucketed_predictor = ToxicityPredictor(loader.get_model(), tokenizer, max_length=64)
+        eager_predictor = ToxicityPredictor(eager, tokenizer, max_length=32)
+        assert bucketed_predictor.max_length == 32
+
+        for text in ["you are stupid", "thanks for the help this is great"]:
+            a = bucketed_predictor.predict(text)["toxicity_scores"]
+            b = eager_predictor.predict(text)["toxicity_scores"]
+            for label in ToxicityPredictor.LABEL_COLUMNS:
+                assert a[label] == pytest.approx(b[label], abs=1e-5)
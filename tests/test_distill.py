@@ -0,0 +1,96 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+
+from src.models.model_loader import ModelLoader
+from src.training import distill
+from src.training.data import LABEL_COLUMNS, load_processed_csv, pos_weight
+
+TEXTS = [
+    "you are a stupid idiot", "hello world", "i hate this", "thanks for the help",
+    "this is great", "you are bad", "nice comment", "i love this"
+]
+
+
+@pytest.fixture
+def split_csv(tmp_path):
+    rows = []
+    for i, text in enumerate(TEXTS * 2):
+        toxic = int(any(w in text for w in ("stupid", "hate", "bad")))
+        rows.append({"comment_text": text, **{label: 0 for label in LABEL_COLUMNS}, "toxic": toxic, "insult": int("idiot" in text)})
+    rows.append({"comment_text": "http://example.com", **{label: 0 for label in LABEL_COLUMNS}})
+    path = tmp_path / "split.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+class TestData:
+    def test_load_drops_empty_after_cleaning(self, split_csv):
+        texts, labels = load_processed_csv(split_csv)
+        assert len(texts) == len(TEXTS) * 2
+        assert labels.shape == (len(texts), len(LABEL_COLUMNS))
+        assert labels.dtype == np.float32
+
+    def test_pos_weight_matches_notebook(self):
+        labels = np.array([[1, 0], [0, 0], [0, 0], [0, 0]], dtype=np.float32)
+        assert pos_weight(labels).tolist() == [3.0, 1.0]  # No positives -> 1.0
+
+    def test_pos_weight_cap(self):
+        labels = np.zeros((201, 1), dtype=np.float32)
+        labels[0] = 1
+        assert pos_weight(labels).tolist() == [200.0]
+        assert pos_weight(labels, max_weight=100.0).tolist() == [100.0]
+
+
+class TestDistill:
+    def test_student_copies_teacher_layers(self, tiny_model_dir):
+        loader = ModelLoader(model_path=tiny_model_dir, device="cpu", inference_mode="eager")
+        loader.load_model()
+        teacher = loader.get_model()
+
+        student = distill.init_student_from_teacher(teacher, 1)
+        assert distill.num_layers(student) == 1
+        assert torch.equal(
+            student.distilbert.transformer.layer[0].ffn.lin1.weight,
+            teacher.distilbert.transformer.layer[0].ffn.lin1.weight
+        )
+        with pytest.raises(ValueError):
+            distill.init_student_from_teacher(teacher, 3)
+
+    def test_soft_loss_zero_weight_matches_hard_loss(self):
+        logits = torch.randn(4, 6)
+        labels = torch.randint(0, 2, (4, 6)).float()
+        weights = torch.ones(6)
+        hard = torch.nn.functional.binary_cross_entropy_with_logits(logits, labels)
+        loss = distill.distillation_loss(logits, torch.randn(4, 6), labels, weights, alpha=1.0)
+        assert loss.item() == pytest.approx(hard.item())
+
+    def test_end_to_end_student_loads_in_model_loader(self, tiny_model_dir, split_csv, tmp_path):
+        """Test the saved student is a directory ModelLoader serves with its own config."""
+        output = str(tmp_path / "student")
+        report = distill.distill(
+            split_csv, split_csv, output,
+            teacher_path=tiny_model_dir,
+            student_layers=1,
+            epochs=1,
+            batch_size=4,
+            max_length=16,
+            latency_samples=3
+        )
+
+        assert report["models"]["teacher"]["layers"] == 2
+        assert report["models"]["student"]["layers"] == 1
+        assert set(report["models"]["student"]["auc"]) == {*LABEL_COLUMNS, "macro"}
+        assert report["models"]["student"]["auc"]["threat"] is None  # Single class
+        with open(os.path.join(output, distill.REPORT_FILE)) as f:
+            assert json.load(f) == report
+
+        loader = ModelLoader(model_path=output, device="cpu", inference_mode="eager")
+        loader.load_model()
+        assert loader.fine_tuned_loaded
+        assert loader.get_model().config.num_hidden_layers == 1
+        assert loader.get_model().config.num_labels == 6
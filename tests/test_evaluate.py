@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import precision_score, recall_score, roc_auc_score
+from unittest.mock import patch
+
+from src.training import evaluate
+from src.training.data import LABEL_COLUMNS
+from src.training.evaluate import Variant, agreement, label_auc, threshold_metrics
+
+TEXTS = [
+    "you are a stupid idiot", "hello world", "i hate this", "thanks for the help",
+    "this is great", "you are bad", "nice comment", "i love this"
+]
+
+
+@pytest.fixture
+def random_split():
+    rng = np.random.default_rng(0)
+    labels = (rng.random((500, 6)) < 0.2).astype(np.float32)
+    scores = np.clip(labels * 0.3 + rng.random((500, 6)) * 0.7, 0, 1).round(2)  # Rounded to create ties
+    return labels, scores
+
+
+@pytest.fixture
+def split_csv(tmp_path):
+    rows = []
+    for i, text in enumerate(TEXTS * 4):
+        rows.append({"comment_text": text, **{label: int((i + j) % 3 == 0) for j, label in enumerate(LABEL_COLUMNS)}})
+    path = tmp_path / "split.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+class TestMetrics:
+    def test_auc_matches_sklearn(self, random_split):
+        labels, scores = random_split
+        expected = [roc_auc_score(labels[:, j], scores[:, j]) for j in range(6)]
+        assert label_auc(labels, scores) == pytest.approx(expected)
+
+    def test_average_ranks_share_ties(self):
+        ranks = evaluate.average_ranks(np.array([[0.3, 1.0], [0.1, 1.0], [0.3, 0.0], [0.2, 1.0]]))
+        assert ranks[:, 0].tolist() == [3.5, 1.0, 3.5, 2.0]
+        assert ranks[:, 1].tolist() == [3.0, 3.0, 1.0, 3.0]
+
+    def test_auc_single_class_is_nan(self):
+        labels = np.zeros((4, 6))
+        labels[1, 0] = 1
+        auc = label_auc(labels, np.random.default_rng(0).random((4, 6)))
+        assert not np.isnan(auc[0]) and np.isnan(auc[1:]).all()
+
+    def test_threshold_metrics_match_sklearn(self, random_split):
+        labels, scores = random_split
+        grid = np.array([0.1, 0.35, 0.5, 0.73, 0.99])
+        metrics = threshold_metrics(labels, scores, grid)
+        for j in range(6):
+            for k, threshold in enumerate(grid):
+                predicted = scores[:, j] > threshold
+                assert metrics["precision"][j, k] == pytest.approx(
+                    precision_score(labels[:, j], predicted, zero_division=0))
+                assert metrics["recall"][j, k] == pytest.approx(recall_score(labels[:, j], predicted, zero_division=0))
+
+    def test_per_label_thresholds(self, random_split):
+        labels, scores = random_split
+        per_label = np.linspace(0.2, 0.7, 6)[:, None]
+        metrics = threshold_metrics(labels, scores, per_label)
+        assert metrics["recall"].shape == (6, 1)
+        for j in range(6):
+            expected = recall_score(labels[:, j], scores[:, j] > per_label[j, 0], zero_division=0)
+            assert metrics["recall"][j, 0] == pytest.approx(expected)
+
+    def test_agreement(self):
+        a = np.array([[0.9, 0.1, 0, 0, 0, 0], [0.2, 0.1, 0, 0, 0, 0]])
+        b = np.array([[0.8, 0.6, 0, 0, 0, 0], [0.2, 0.1, 0, 0, 0, 0]])
+        result = agreement(a, b, np.full(6, 0.5))
+        assert result["flags"]["severe_toxic"] == 0.5
+        assert result["is_toxic"] == 1.0
+
+
+class TestVariants:
+    def test_parse(self):
+        variant = Variant.parse("q8=models/best_model.pt:int8")
+        assert (variant.name, variant.model_path, variant.options) == ("q8", "models/best_model.pt", ("int8",))
+        with pytest.raises(ValueError):
+            Variant.parse("bad=path:fp4")
+        with pytest.raises(ValueError):
+            Variant.parse("no-path")
+
+    def test_fingerprint_tracks_artifact_and_options(self, tiny_model_dir, tmp_path):
+        assert Variant("a", tiny_model_dir).fingerprint() == Variant("b", tiny_model_dir).fingerprint()
+        assert Variant("a", tiny_model_dir).fingerprint() != Variant("a", tiny_model_dir, ["int8"]).fingerprint()
+
+
+class TestEvaluate:
+    def test_variants_compared_and_logits_cached(self, tiny_model_dir, split_csv, tmp_path):
+        variants = [Variant("base", tiny_model_dir), Variant("q8", tiny_model_dir, ["int8"])]
+        options = dict(cache_dir=str(tmp_path / "cache"), max_length=16, batch_size=8, latency_samples=3)
+        output = str(tmp_path / "report.json")
+
+        report = evaluate.evaluate(split_csv, variants, output=output, **options)
+        base, q8 = report["variants"]["base"], report["variants"]["q8"]
+        assert not base["cached"] and base["throughput"]["texts_per_s"] > 0
+        assert base["latency"]["p50_ms"] > 0
+        assert set(base["auc"]) == {*LABEL_COLUMNS, "macro"}
+        assert len(base["sweep"]["toxic"]["precision"]) == len(evaluate.DEFAULT_GRID)
+        assert q8["agreement"]["with"] == "base"
+        assert q8["agreement"]["mean_abs_score_diff"] < 0.1
+        with open(output) as f:
+            assert json.load(f)["variants"].keys() == {"base", "q8"}
+
+        thresholds = tmp_path / "thresholds.json"
+        thresholds.write_text(json.dumps({"toxic": 0.3}))
+        with patch.object(evaluate, "run_inference") as inference:
+            again = evaluate.evaluate(split_csv, variants, thresholds_path=str(thresholds), **options)
+            inference.assert_not_called()
+        assert again["variants"]["base"]["cached"]
+        assert again["operating_thresholds"]["toxic"] == 0.3
+        assert again["variants"]["base"]["auc"] == base["auc"]
+
+    def test_unknown_threshold_label(self, tmp_path):
+        path = tmp_path / "thresholds.json"
+        path.write_text(json.dumps({"spam": 0.3}))
+        with pytest.raises(ValueError):
+            evaluate.load_thresholds(str(path))
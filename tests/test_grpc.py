@@ -0,0 +1,105 @@
+import asyncio
+
+import grpc
+import pytest
+from unittest.mock import patch
+
+from src.api import grpc_server
+from src.api.stats import PredictionStats
+from src.proto import moderation_pb2, moderation_pb2_grpc
+
+@pytest.fixture
+def predictor(fake_predictor, serve_app):
+    with serve_app(fake_predictor, prediction_stats=PredictionStats(capacity=100)):
+        yield fake_predictor
+
+
+def with_stub(scenario, servicer=None):
+    """Run scenario(stub) against a server on an ephemeral local port."""
+    async def run():
+        server = grpc.aio.server()
+        moderation_pb2_grpc.add_ModerationServicer_to_server(servicer or grpc_server.ModerationServicer(), server)
+        port = server.add_insecure_port("127.0.0.1:0")
+        await server.start()
+        try:
+            async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+                return await scenario(moderation_pb2_grpc.ModerationStub(channel))
+        finally:
+            await server.stop(None)
+    return asyncio.run(run())
+
+
+class TestMessages:
+    def test_scores_and_flags(self, toxic_prediction):
+        message = grpc_server.to_message(toxic_prediction, "abc")
+        assert list(message.scores) == pytest.approx([0.95, 0.1, 0.8, 0.0, 0.7, 0.0])
+        labels = grpc_server.LABELS
+        assert [labels[i] for i in range(len(labels)) if message.flags >> i & 1] == ['toxic', 'obscene', 'insult']
+        assert message.id == "abc"
+
+
+class TestModerationService:
+    def test_unary(self, predictor):
+        response = with_stub(lambda stub: stub.Moderate(moderation_pb2.ModerateRequest(text="you idiot", id="1")))
+        assert response.is_toxic and response.id == "1"
+        assert len(response.scores) == 6
+
+    def test_invalid_text(self, predictor):
+        with pytest.raises(grpc.aio.AioRpcError) as exc:
+            with_stub(lambda stub: stub.Moderate(moderation_pb2.ModerateRequest(text="   ")))
+        assert exc.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
+    def test_batch_single_forward_pass(self, predictor):
+        request = moderation_pb2.BatchModerateRequest(texts=["you idiot", "hello"])
+        response = with_stub(lambda stub: stub.ModerateBatch(request))
+        assert [r.is_toxic for r in response.results] == [True, False]
+        predictor.predict_batch.assert_called_once()
+
+    def test_batch_size_capped(self, predictor):
+        request = moderation_pb2.BatchModerateRequest(texts=["hello"] * (grpc_server.MAX_BATCH_SIZE + 1))
+        with pytest.raises(grpc.aio.AioRpcError) as exc:
+            with_stub(lambda stub: stub.ModerateBatch(request))
+        assert exc.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+        predictor.predict_batch.assert_not_called()
+
+    def test_stream_hides_internal_errors(self, predictor):
+        predictor.predict_batch.side_effect = RuntimeError("CUDA out of memory at /secret/path")
+
+        async def scenario(stub):
+            async def send():
+                yield moderation_pb2.ModerateRequest(text="hello", id="1")
+
+            return [response async for response in stub.ModerateStream(send())]
+
+        responses = with_stub(scenario)
+        assert responses[0].error == "Internal server error"
+
+    def test_model_not_loaded(self):
+        with patch('src.api.main.predictor', None), pytest.raises(grpc.aio.AioRpcError) as exc:
+            with_stub(lambda stub: stub.Moderate(moderation_pb2.ModerateRequest(text="hello")))
+        assert exc.value.code() == grpc.StatusCode.UNAVAILABLE
+
+    def test_stream_micro_batches_in_order(self, predictor):
+        """Test messages sent together share forward passes and come back in order."""
+        texts = ["a", "you idiot", "   ", "b", "c"]
+
+        async def scenario(stub):
+            requests = [moderation_pb2.ModerateRequest(text=t, id=str(i)) for i, t in enumerate(texts)]
+
+            async def send():
+                for request in requests:
+                    yield request
+
+            return [response async for response in stub.ModerateStream(send())]
+
+        servicer = grpc_server.ModerationServicer(stream_max_batch=8, stream_max_wait=0.2)
+        responses = with_stub(scenario, servicer)
+
+        assert [r.id for r in responses] == ["0", "1", "2", "3", "4"]
+        assert responses[1].is_toxic
+        assert responses[2].error  # Invalid message doesn't end the stream
+        assert predictor.predict_batch.call_count < 4
+
+    def test_labels(self):
+        response = with_stub(lambda stub: stub.Labels(moderation_pb2.LabelsRequest()))
+        assert list(response.labels) == grpc_server.LABELS
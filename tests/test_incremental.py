@@ -0,0 +1,105 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock
+
+from src.api.admission import AdmissionController
+from src.api.main import app
+from src.models.incremental import IncrementalModerator, LRUStore, split_segments
+from src.models.model_loader import ModelLoader
+from src.models.predictor import ToxicityPredictor
+
+DOCUMENT = "hello world. you are a stupid idiot! thanks for the help."
+
+
+@pytest.fixture(scope="module")
+def predictor(tiny_model_dir):
+    loader = ModelLoader(model_path=tiny_model_dir, device="cpu", inference_mode="eager")
+    loader.load_model()
+    predictor = ToxicityPredictor(loader.get_model(), loader.get_tokenizer(), max_length=64)
+    predictor.predict_batch = MagicMock(wraps=predictor.predict_batch)
+    return predictor
+
+
+class TestSegments:
+    def test_sentence_split(self):
+        assert split_segments(DOCUMENT) == ["hello world.", "you are a stupid idiot!", "thanks for the help."]
+
+    def test_long_sentence_cut_at_words(self):
+        segments = split_segments("word " * 50, max_chars=40)
+        assert all(len(s) <= 40 for s in segments)
+        assert " ".join(segments).split() == ["word"] * 50
+
+    def test_lru_eviction(self):
+        store = LRUStore(2)
+        store.put("a", 1)
+        store.put("b", 2)
+        store.get("a")
+        store.put("c", 3)
+        assert store.get("b") is None
+        assert store.get("a") == 1
+        assert store.snapshot()["evictions"] == 1
+
+
+class TestIncrementalModerator:
+    def test_only_changed_segment_is_scored(self, predictor):
+        moderator = IncrementalModerator(predictor)
+        first, details = moderator.moderate("doc", DOCUMENT)
+        assert details["segments_scored"] == 3
+
+        predictor.predict_batch.reset_mock()
+        edited = DOCUMENT.replace("thanks for the help", "i love this")
+        second, details = moderator.moderate("doc", edited)
+        assert details["segments_scored"] == 1
+        assert details["segments_changed"] == 1
+        predictor.predict_batch.assert_called_once_with(["i love this."])
+
+    def test_verdict_is_max_over_segments(self, predictor):
+        moderator = IncrementalModerator(predictor)
+        prediction, _ = moderator.moderate("doc", DOCUMENT)
+        per_segment = [predictor.predict(segment) for segment in split_segments(DOCUMENT)]
+        for label in ToxicityPredictor.LABEL_COLUMNS:
+            expected = max(p['toxicity_scores'][label] for p in per_segment)
+            assert prediction['toxicity_scores'][label] == pytest.approx(expected, abs=1e-5)
+
+    def test_repeated_segments_scored_once(self, predictor):
+        moderator = IncrementalModerator(predictor)
+        _, details = moderator.moderate("doc", "hello world. hello world. hello world.")
+        assert details["segments"] == 3
+        assert details["segments_scored"] == 1
+
+    def test_segment_cache_is_bounded(self, predictor):
+        moderator = IncrementalModerator(predictor, max_segments=2, max_documents=1)
+        moderator.moderate("a", DOCUMENT)
+        moderator.moderate("b", "i hate this.")
+        snapshot = moderator.snapshot()
+        assert snapshot["segments"]["entries"] == 2
+        assert snapshot["documents"]["entries"] == 1
+
+    def test_too_many_segments_scores_whole_text(self, predictor):
+        moderator = IncrementalModerator(predictor, max_document_segments=2)
+        predictor.predict_batch.reset_mock()
+        prediction, details = moderator.moderate("doc", DOCUMENT)
+        assert (details["segments"], details["whole_text"]) == (1, True)
+        predictor.predict_batch.assert_called_once_with([DOCUMENT])
+        expected = predictor.predict(DOCUMENT)
+        assert prediction['toxicity_scores']['toxic'] == pytest.approx(expected['toxicity_scores']['toxic'], abs=1e-5)
+        assert moderator.snapshot()["whole_text_documents"] == 1
+
+
+class TestIncrementalEndpoint:
+    def test_edit_reuses_segments(self, predictor, serve_app):
+        with serve_app(predictor, AdmissionController(), incremental_moderator=None):
+            client = TestClient(app)
+            first = client.post("/moderate/incremental", json={"document_id": "c1", "text": DOCUMENT})
+            second = client.post(
+                "/moderate/incremental",
+                json={"document_id": "c1", "text": DOCUMENT + " nice comment."}
+            )
+            stats = client.get("/incremental").json()
+
+        assert first.status_code == 200
+        assert first.json()["segments_scored"] == 3
+        body = second.json()
+        assert (body["segments"], body["segments_scored"], body["segments_changed"]) == (4, 1, 1)
+        assert set(body["toxicity_scores"]) == set(ToxicityPredictor.LABEL_COLUMNS)
+        assert stats["segments"]["hits"] == 3
@@ -0,0 +1,301 @@
+import asyncio
+import os
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+from src.api.admission import AdmissionController
+from src.api.main import app
+from src.client.retry import RetryPolicy
+from src.jobs import JobExecutor, JobStore
+from src.jobs.callbacks import check_callback_url
+
+PREDICTION = {
+    'is_toxic': False,
+    'toxicity_scores': {'toxic': 0.01, 'severe_toxic': 0.0, 'obscene': 0.0, 'threat': 0.0, 'insult': 0.0, 'identity_hate': 0.0},
+    'flagged_categories': [],
+    'confidence': 0.99
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def predictor():
+    predictor = MagicMock()
+    predictor.predict_batch.side_effect = lambda texts: [PREDICTION] * len(texts)
+    return predictor
+
+
+def make_executor(store, predictor, admission=None, **kwargs):
+    return JobExecutor(store, lambda: predictor, admission or AdmissionController(max_concurrent=2), **kwargs)
+
+
+async def drain(executor):
+    while await executor.step():
+        pass
+
+
+class TestJobStore:
+    def test_claim_complete_and_page(self, store):
+        job = store.create(["a", "b", "c"], ip_address="1.2.3.4")
+        assert job["status"] == "queued" and job["total"] == 3
+
+        job_id, items = store.claim(2)
+        assert job_id == job["id"]
+        assert items == [(0, "a"), (1, "b")]
+        assert store.get(job_id)["status"] == "running"
+
+        store.complete(job_id, [0, 1], [PREDICTION, PREDICTION])
+        assert store.claim(10)[1] == [(2, "c")]
+        job = store.complete(job_id, [2], [PREDICTION])
+        assert job["status"] == "completed" and job["completed"] == 3
+        assert store.claim(10) is None
+
+        assert [row[0] for row in store.results(job_id, offset=1, limit=5)] == [1, 2]
+        assert store.results(job_id)[0][2] == PREDICTION
+
+    def test_oldest_job_first(self, store):
+        first = store.create(["a"])
+        store.create(["b"])
+        assert store.claim(10)[0] == first["id"]
+
+    def test_expired_lease_is_reclaimed(self, tmp_path):
+        store = JobStore(str(tmp_path / "jobs.sqlite3"), lease_seconds=0.01)
+        store.create(["a"])
+        assert store.claim(1)[1] == [(0, "a")]
+        assert store.claim(1) is None  # Still leased
+        time.sleep(0.02)
+        assert store.claim(1)[1] == [(0, "a")]
+
+    def test_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "jobs.sqlite3")
+        store = JobStore(path)
+        job = store.create(["a", "b"])
+        store.close()
+
+        reopened = JobStore(path)
+        assert reopened.get(job["id"])["total"] == 2
+        assert reopened.pending_items() == 2
+
+    def test_purge_finished(self, store):
+        job = store.create(["a"])
+        store.fail(job["id"], "boom")
+        assert store.purge(older_than=3600) == 0
+        assert store.purge(older_than=-1) == 1
+        assert store.get(job["id"]) is None
+
+
+class TestJobExecutor:
+    def test_scores_job_in_batches(self, store, predictor):
+        job = store.create([f"text {i}" for i in range(10)])
+        executor = make_executor(store, predictor, batch_size=4)
+        asyncio.run(drain(executor))
+
+        assert predictor.predict_batch.call_count == 3
+        assert store.get(job["id"])["status"] == "completed"
+        assert executor.snapshot()["items_scored"] == 10
+
+    def test_interactive_traffic_keeps_priority(self, store, predictor):
+        store.create(["a", "b"])
+        admission = AdmissionController(max_concurrent=2)
+        executor = make_executor(store, predictor, admission)
+
+        async def scenario():
+            async with admission.slot("interactive"):
+                assert await executor.step() is False
+            assert await executor.step() is True
+
+        asyncio.run(scenario())
+        assert executor.deferred == 1
+        assert predictor.predict_batch.call_count == 1
+
+    def test_waits_for_model(self, store, predictor):
+        store.create(["a"])
+        executor = JobExecutor(store, lambda: None, AdmissionController())
+        assert asyncio.run(executor.step()) is False
+        assert store.pending_items() == 1
+
+    def test_batch_hook_runs_off_the_event_loop(self, store, predictor):
+        store.create(["a"])
+        threads = []
+        executor = make_executor(store, predictor, on_batch=lambda *args: threads.append(threading.get_ident()))
+        asyncio.run(drain(executor))
+        assert threads and threads[0] != threading.get_ident()
+
+    def test_prediction_error_fails_job(self, store, predictor):
+        job = store.create(["a"])
+        predictor.predict_batch.side_effect = RuntimeError("boom")
+        asyncio.run(drain(make_executor(store, predictor)))
+        failed = store.get(job["id"])
+        assert failed["status"] == "failed"
+        assert "boom" in failed["error"]
+
+    def test_callback_retried_until_delivered(self, store, predictor):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503 if len(calls) == 1 else 200)
+
+        job = store.create(["a"], callback_url="https://example.com/done")
+
+        async def scenario():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            executor = make_executor(
+                store, predictor, http_client=client, callback_retry=RetryPolicy(max_retries=2, backoff_base=0.001)
+            )
+            await drain(executor)
+            await executor.stop()
+
+        asyncio.run(scenario())
+        assert len(calls) == 2
+        assert b'"status":"completed"' in calls[-1].content.replace(b" ", b"")
+        assert store.get(job["id"])["callback_status"] == "delivered"
+
+    def test_slow_callback_does_not_block_jobs(self, store, predictor):
+        release = asyncio.Event()
+
+        async def handler(request):
+            await release.wait()
+            return httpx.Response(200)
+
+        first = store.create(["a"], callback_url="https://example.com/slow")
+        second = store.create(["b"])
+
+        async def scenario():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            executor = make_executor(store, predictor, http_client=client, max_callbacks=1)
+            await asyncio.wait_for(drain(executor), timeout=5)
+            assert store.get(second["id"])["status"] == "completed"
+            assert executor.snapshot()["callbacks"]["pending"] == 1
+            release.set()
+            await executor.stop()
+
+        asyncio.run(scenario())
+        assert store.get(first["id"])["callback_status"] == "delivered"
+
+    def test_blocked_callback_not_sent(self, store, predictor):
+        calls = []
+        job = store.create(["a"], callback_url="http://169.254.169.254/")
+
+        async def scenario():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: calls.append(request)))
+            executor = make_executor(store, predictor, http_client=client, callback_guard=check_callback_url)
+            await drain(executor)
+            await executor.stop()
+
+        asyncio.run(scenario())
+        assert calls == []
+        assert store.get(job["id"])["callback_status"] == "failed: blocked destination"
+
+
+class TestJobEndpoints:
+    @pytest.fixture
+    def client(self, store):
+        with patch.multiple('src.api.main', job_store=store, job_executor=None):
+            yield TestClient(app)
+
+    def test_submit_poll_and_page(self, client, store, predictor):
+        response = client.post("/jobs", json={"texts": ["first comment", "second comment", "third comment"]})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.json()["status"] == "queued"
+
+        asyncio.run(drain(make_executor(store, predictor, batch_size=2)))
+
+        status = client.get(f"/jobs/{job_id}").json()
+        assert status["status"] == "completed"
+        assert status["completed"] == 3
+
+        page = client.get(f"/jobs/{job_id}/results", params={"limit": 2}).json()
+        assert [r["index"] for r in page["results"]] == [0, 1]
+        assert page["results"][0]["text"] == "first comment"
+        assert page["next_offset"] == 2
+
+        compact = client.get(f"/jobs/{job_id}/results", params={"offset": 2, "format": "compact"}).json()
+        assert compact["results"] == [{"index": 2, "is_toxic": False, "scores": [0.01, 0.0, 0.0, 0.0, 0.0, 0.0],
+                                       "flags": 0, "confidence": 0.99}]
+        assert compact["next_offset"] is None
+
+    def test_invalid_text_rejected(self, client):
+        response = client.post("/jobs", json={"texts": ["fine", "   "]})
+        assert response.status_code == 400
+        assert "texts[1]" in response.json()["detail"]
+
+    def test_callback_url_must_be_http(self, client):
+        response = client.post("/jobs", json={"texts": ["fine"], "callback_url": "file:///etc/passwd"})
+        assert response.status_code == 422
+
+    def test_texts_validated_off_the_event_loop(self, client):
+        on_loop = []
+
+        def validate(text):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return True, ""
+
+        with patch('src.api.main.validate_text', side_effect=validate):
+            assert client.post("/jobs", json={"texts": ["a", "b"]}).status_code == 202
+        assert on_loop == [False, False]
+
+    @pytest.mark.parametrize("url", [
+        "http://169.254.169.254/latest/meta-data/",
+        "http://127.0.0.1:8000/admin",
+        "http://localhost/hook",
+        "https://10.1.2.3/hook",
+        "http://[::1]/hook",
+        "http://[::ffff:192.168.0.1]/hook",
+    ])
+    def test_internal_callback_rejected(self, client, store, url):
+        with patch.dict(os.environ, {"JOB_CALLBACK_ALLOWED_HOSTS": ""}):
+            response = client.post("/jobs", json={"texts": ["fine"], "callback_url": url})
+        assert response.status_code == 422
+        assert "callback_url" in response.json()["detail"]
+        assert store.counts()["queued"] == 0
+
+    def test_callback_allowlist(self, client):
+        with patch.dict(os.environ, {"JOB_CALLBACK_ALLOWED_HOSTS": "localhost"}):
+            allowed = client.post("/jobs", json={"texts": ["fine"], "callback_url": "http://localhost/hook"})
+            other = client.post("/jobs", json={"texts": ["fine"], "callback_url": "https://example.com/hook"})
+        assert allowed.status_code == 202
+        assert other.status_code == 422
+
+    def test_unknown_job(self, client):
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.get("/jobs/missing/results").status_code == 404
+
+    def test_job_stats(self, client, store):
+        store.create(["a"])
+        assert client.get("/jobs").json()["jobs"]["queued"] == 1
+
+
+class TestJobsUnavailable:
+    def test_no_store_returns_503(self):
+        with patch.multiple('src.api.main', job_store=None, job_executor=None), \
+                patch.dict(os.environ, {"AWS_LAMBDA_FUNCTION_NAME": "moderation-api"}):
+            os.environ.pop("JOB_DB_PATH", None)  # Restored by patch.dict
+            client = TestClient(app)
+            assert client.post("/jobs", json={"texts": ["fine"]}).status_code == 503
+            assert client.get("/jobs/abc").status_code == 503
+            assert client.get("/jobs").status_code == 503
+
+    def test_relative_path_resolved_against_project_root(self, tmp_path):
+        from src.api import main
+        with patch.multiple('src.api.main', job_store=None, PROJECT_ROOT=tmp_path), \
+                patch.dict(os.environ, {"JOB_DB_PATH": "data/jobs.sqlite3"}):
+            store = main.get_job_store()
+            assert store.path == str(tmp_path / "data" / "jobs.sqlite3")
+            store.close()
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import time
+
+import httpx
+import numpy as np
+
+from src.api.admission import AdmissionController
+from src.api.main import app
+from src.client import loadgen
+
+
+def run_in_process(**kwargs):
+    async def scenario():
+        async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+            return await loadgen.run(["hello world", "nice comment"], client=client, **kwargs)
+    return asyncio.run(scenario())
+
+
+class TestCorpus:
+    def test_jsonl_picks_text_field(self, tmp_path):
+        path = tmp_path / "corpus.jsonl"
+        path.write_text('{"request_id": "a", "body": "first"}\n\n{"text": "second"}\n{"other": 1}\n')
+        assert loadgen.load_corpus(str(path)) == ["first", "second"]
+
+    def test_csv_and_text(self, tmp_path):
+        csv_path = tmp_path / "split.csv"
+        csv_path.write_text("comment_text,toxic\nhello,0\n\"a, b\",1\n")
+        assert loadgen.load_corpus(str(csv_path)) == ["hello", "a, b"]
+
+        text_path = tmp_path / "lines.txt"
+        text_path.write_text("one\n\ntwo\n")
+        assert loadgen.load_corpus(str(text_path)) == ["one", "two"]
+
+
+class TestArrivals:
+    def test_constant_rate(self):
+        offsets = loadgen.arrival_offsets(10, 2)
+        assert len(offsets) == 20
+        assert np.allclose(np.diff(offsets), 0.1)
+
+    def test_poisson_within_duration(self):
+        offsets = loadgen.arrival_offsets(100, 1, poisson=True)
+        assert 50 < len(offsets) < 150
+        assert offsets.max() < 1 and np.all(np.diff(offsets) >= 0)
+
+
+class TestLoadRun:
+    def test_report_against_in_process_app(self, fake_predictor, serve_app):
+        with serve_app(fake_predictor, AdmissionController(max_concurrent=4, max_queue=64)):
+            report = run_in_process(rates=[40, 80], duration=0.5, bucket_seconds=0.25)
+
+        assert [stage["target_rps"] for stage in report["stages"]] == [40, 80]
+        stage = report["stages"][1]
+        assert stage["sent"] == 40
+        assert stage["ok"] == 40
+        assert stage["error_rate"] == 0.0
+        assert stage["latency_ms"]["p50"] <= stage["latency_ms"]["p99"] <= stage["latency_ms"]["max"]
+        assert sum(bucket["sent"] for bucket in stage["timeline"]) == 40
+        assert len(stage["timeline"]) == 2
+        json.dumps(report)  # Serializable as-is
+
+    def test_shedding_is_reported_separately(self, fake_predictor, serve_app):
+        """Test admission rejections count as shed, not as errors."""
+        predict = fake_predictor.predict.side_effect
+        fake_predictor.predict.side_effect = lambda text: time.sleep(0.05) or predict(text)
+        with serve_app(fake_predictor, AdmissionController(max_concurrent=1, max_queue=1)):
+            report = run_in_process(rates=[200], duration=0.25)
+
+        stage = report["stages"][0]
+        assert stage["shed_rate"] > 0
+        assert stage["error_rate"] == 0.0
+        assert stage["status_counts"]["429"] > 0
+
+    def test_transport_errors_count_as_errors(self):
+        transport = httpx.MockTransport(lambda request: (_ for _ in ()).throw(httpx.ConnectError("refused")))
+
+        async def scenario():
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await loadgen.run(["hello"], rates=[20], duration=0.2, client=client)
+
+        stage = asyncio.run(scenario())["stages"][0]
+        assert stage["error_rate"] == 1.0
+        assert stage["status_counts"] == {"0": 4}
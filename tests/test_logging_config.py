@@ -0,0 +1,86 @@
+import logging
+import os
+import sys
+
+import pytest
+from unittest.mock import patch
+
+from src.utils import logging_config
+from src.utils.logging_config import SamplingFilter, setup_logging, shutdown_logging, REQUEST_LOGGER_NAME
+
+
+def make_record(level):
+    return logging.LogRecord("api.request", level, __file__, 1, "msg %s", ("arg",), None)
+
+
+class TestSamplingFilter:
+    def test_zero_rate_drops_info(self):
+        sampler = SamplingFilter(rate=0.0)
+        assert sampler.filter(make_record(logging.INFO)) is False
+
+    def test_errors_always_pass(self):
+        sampler = SamplingFilter(rate=0.0)
+        assert sampler.filter(make_record(logging.WARNING)) is True
+        assert sampler.filter(make_record(logging.ERROR)) is True
+
+    def test_partial_rate(self):
+        sampler = SamplingFilter(rate=0.5)
+        with patch("src.utils.logging_config.random.random", return_value=0.25):
+            assert sampler.filter(make_record(logging.INFO)) is True
+        with patch("src.utils.logging_config.random.random", return_value=0.75):
+            assert sampler.filter(make_record(logging.INFO)) is False
+
+
+class TestSetupLogging:
+    @pytest.fixture(autouse=True)
+    def restore_root(self):
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        yield
+        shutdown_logging()
+        root.handlers[:] = handlers
+        root.setLevel(level)
+
+    def test_idempotent(self):
+        """Test repeated setup leaves a single handler and sampling filter."""
+        setup_logging(level="INFO", sample_rate=0.5)
+        setup_logging(level="INFO", sample_rate=0.5)
+        assert len(logging.getLogger().handlers) == 1
+        filters = [f for f in logging.getLogger(REQUEST_LOGGER_NAME).filters if isinstance(f, SamplingFilter)]
+        assert len(filters) == 1
+
+    def test_queue_snapshots_arguments(self):
+        """Test records are merged on the caller, so later mutation of arguments doesn't leak."""
+        setup_logging(level="INFO", sample_rate=1.0, use_queue=True)
+        assert logging_config._listener is not None
+        handler = logging.getLogger().handlers[0]
+        items = ["a"]
+        record = logging.LogRecord("api.request", logging.INFO, __file__, 1, "items %s", (items,), None)
+        prepared = handler.prepare(record)
+        items.append("b")
+        assert prepared.msg == "items ['a']"
+        assert prepared.args is None
+
+    def test_queue_renders_traceback(self):
+        setup_logging(level="INFO", use_queue=True)
+        handler = logging.getLogger().handlers[0]
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("api", logging.ERROR, __file__, 1, "failed", None, sys.exc_info())
+        prepared = handler.prepare(record)
+        assert prepared.exc_info is None
+        assert "ValueError: boom" in prepared.exc_text
+        assert record.exc_info is not None  # The caller's record is left alone
+
+    def test_queue_off_by_default_on_lambda(self):
+        with patch.dict(os.environ, {"AWS_LAMBDA_FUNCTION_NAME": "moderation-api"}):
+            os.environ.pop("LOG_QUEUE", None)  # Restored by patch.dict
+            setup_logging(level="INFO")
+        assert logging_config._listener is None
+
+    def test_sync_mode(self):
+        """Test the queue can be disabled."""
+        setup_logging(level="INFO", use_queue=False)
+        assert logging_config._listener is None
+        assert isinstance(logging.getLogger().handlers[0], logging.StreamHandler)
@@ -0,0 +1,116 @@
+import asyncio
+import gc
+import logging
+import os
+
+import httpx
+import pytest
+import torch
+from fastapi.testclient import TestClient
+
+from src.api.admission import AdmissionController
+from src.api.main import app
+from src.api.stats import PredictionStats
+from src.models.model_loader import ModelLoader
+from src.models.predictor import ToxicityPredictor
+from src.utils import memory
+from src.utils.logging_config import REQUEST_LOGGER_NAME
+
+# RSS may grow at most this much over 10k requests once warmed up
+GROWTH_BOUND_MB = float(os.getenv("MEMORY_GROWTH_BOUND_MB", "40"))
+TEXTS = ["you are a stupid idiot", "hello world", "thanks for the help", "i hate this comment"]
+
+
+@pytest.fixture(scope="module")
+def predictor(tiny_model_dir):
+    loader = ModelLoader(model_path=tiny_model_dir, device="cpu", inference_mode="eager")
+    loader.load_model()
+    return ToxicityPredictor(loader.get_model(), loader.get_tokenizer(), max_length=64)
+
+
+@pytest.fixture
+def serving(predictor, serve_app):
+    admission = AdmissionController(max_concurrent=2, max_queue=64)
+    with serve_app(predictor, admission, prediction_stats=PredictionStats(capacity=1000)):
+        yield
+
+
+class TestMemoryTracker:
+    def test_rss_readings(self):
+        assert memory.current_rss_mb() > 0
+        assert memory.peak_rss_mb() >= memory.current_rss_mb() * 0.5
+
+    def test_stage_sampling(self):
+        tracker = memory.MemoryTracker(sample_rate=0.0)
+        with tracker.stage("forward"):
+            pass
+        assert tracker.snapshot()["stages"] == {}
+
+        with tracker.stage("model_load", always=True):
+            block = bytearray(20 * 1024 * 1024)
+            block[::4096] = b"x" * len(block[::4096])  # Touch the pages
+        stage = tracker.snapshot()["stages"]["model_load"]
+        assert stage["samples"] == 1
+        assert stage["last_delta_mb"] > 10
+        del block
+
+    def test_model_load_is_always_measured(self, predictor):
+        assert memory.tracker.snapshot()["stages"]["model_load"]["samples"] >= 1
+
+    def test_live_tensors(self):
+        keep = torch.zeros(1024, 1024)
+        report = memory.live_tensors()
+        assert report["count"] >= 1
+        assert report["by_dtype"]["float32"]["mb"] >= 4
+        del keep
+
+    def test_top_allocations(self):
+        started = memory.start_tracing()
+        try:
+            data = [str(i) * 10 for i in range(20000)]
+            sites = memory.top_allocations(5)
+            assert sites and all(site["kb"] > 0 for site in sites)
+        finally:
+            if started:
+                import tracemalloc
+                tracemalloc.stop()
+        assert data
+
+
+class TestDebugEndpoint:
+    def test_debug_memory(self, serving):
+        response = TestClient(app).get("/debug/memory", params={"tensors": True})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["rss_mb"] > 0
+        assert body["live_tensors"]["count"] > 0
+        assert "top_allocations" not in body
+
+
+class TestMemoryGrowth:
+    def test_10k_requests_stay_within_bound(self, serving):
+        """Fails if serving 10k requests grows RSS beyond GROWTH_BOUND_MB."""
+        request_logger = logging.getLogger(REQUEST_LOGGER_NAME)
+        level = request_logger.level
+        request_logger.setLevel(logging.WARNING)  # Keep captured log records out of the measurement
+
+        async def send(client, count):
+            for i in range(count):
+                response = await client.post("/moderate", json={"text": TEXTS[i % len(TEXTS)]})
+                assert response.status_code == 200
+
+        async def scenario():
+            async with httpx.AsyncClient(app=app, base_url="http://testserver") as client:
+                await send(client, 500)  # Warm up allocator pools and caches
+                gc.collect()
+                before = memory.current_rss_mb()
+                await send(client, 10_000)
+                gc.collect()
+                return before, memory.current_rss_mb()
+
+        try:
+            before, after = asyncio.run(scenario())
+        finally:
+            request_logger.setLevel(level)
+
+        assert after - before < GROWTH_BOUND_MB, f"RSS grew {after - before:.1f} MB over 10k requests"
@@ -1,8 +1,17 @@
 import pytest
 import os
+import boto3
+import hashlib
+from moto import mock_s3
 from unittest.mock import MagicMock, patch
 from src.models.model_loader import ModelLoader
 
+AWS_TEST_ENV = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1"
+}
+
 class TestModelLoader:
     @pytest.fixture
     def loader(self):
@@ -25,24 +34,21 @@ class TestModelLoader:
         mock_tokenizer.assert_called_once()
         mock_model.assert_called_once()
 
-    @patch("src.models.model_loader.boto3.client")
-    def test_download_from_s3(self, mock_boto, loader):
-        """Test S3 download logic."""
-        # Setup env vars
-        with patch.dict(os.environ, {"MODEL_BUCKET": "test-bucket", "MODEL_KEY": "model.pt"}):
-            # Mock S3 client
-            mock_s3 = MagicMock()
-            mock_boto.return_value = mock_s3
+    def test_download_from_s3(self, tmp_path):
+        """Test S3 download logic against a local S3 stand-in."""
+        payload = b"model-weights" * 1000
+        loader = ModelLoader(model_path=str(tmp_path / "model.pt"))
+        with patch.dict(os.environ, {**AWS_TEST_ENV, "MODEL_BUCKET": "test-bucket", "MODEL_KEY": "model.pt",
+                                     "S3_DOWNLOAD_PART_MB": "1"}), mock_s3():
+            s3 = boto3.client("s3", region_name="us-east-1")
+            s3.create_bucket(Bucket="test-bucket")
+            s3.put_object(Bucket="test-bucket", Key="model.pt", Body=payload,
+                          Metadata={"sha256": hashlib.sha256(payload).hexdigest()})
             
             # Run download
-            loader._download_from_s3()
-            
-            # Verify call
-            mock_s3.download_file.assert_called_with(
-                "test-bucket", 
-                "model.pt", 
-                "models/test_model.pt"
-            )
+            assert loader._download_from_s3() is True
+        
+        assert (tmp_path / "model.pt").read_bytes() == payload
 
     @patch("src.models.model_loader.boto3.client")
     def test_download_s3_failure(self, mock_boto, loader):
@@ -50,10 +56,10 @@ class TestModelLoader:
         with patch.dict(os.environ, {"MODEL_BUCKET": "test-bucket"}):
             mock_s3 = MagicMock()
             mock_boto.return_value = mock_s3
-            mock_s3.download_file.side_effect = Exception("S3 Error")
+            mock_s3.head_object.side_effect = Exception("S3 Error")
             
             # Should log error but not crash
-            loader._download_from_s3()
+            assert loader._download_from_s3() is False
 
     def test_get_model_not_loaded(self, loader):
         """Test error when accessing model before loading."""
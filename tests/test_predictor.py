@@ -58,8 +58,15 @@ class TestToxicityPredictor:
         assert result["is_toxic"] is False
         assert len(result["flagged_categories"]) == 0
 
-    def test_predict_batch(self, predictor):
+    def test_predict_batch(self, predictor, mock_model, mock_tokenizer):
         """Test batch prediction."""
+        mock_tokenizer.return_value = {
+            'input_ids': torch.tensor([[1, 2, 3], [1, 2, 0]]),
+            'attention_mask': torch.tensor([[1, 1, 1], [1, 1, 0]])
+        }
+        mock_model.return_value.logits = torch.tensor([[0.8, -0.5, 0.9, -1.0, 0.2, -0.8], [-2.0] * 6])
         results = predictor.predict_batch(["text1", "text2"])
         assert len(results) == 2
         assert results[0]["is_toxic"] is True # Based on default mock
+        assert results[1]["is_toxic"] is False
+        assert mock_model.call_count == 1  # One forward pass for the batch
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock
+
+from src.api.admission import AdmissionController
+from src.api.main import app
+from src.api.responses import LABELS, compact_result, full_result, label_flags, render_result
+from src.api.schemas import ModerationResponse, ToxicityScores
+
+@pytest.fixture
+def client(toxic_prediction, serve_app):
+    predictor = MagicMock()
+    predictor.predict.return_value = toxic_prediction
+    predictor.predict_batch.side_effect = lambda texts: [toxic_prediction] * len(texts)
+    with serve_app(predictor, AdmissionController(max_concurrent=2, max_queue=4)):
+        yield TestClient(app)
+
+
+class TestResponseBodies:
+    def test_label_flags(self):
+        assert label_flags([]) == 0
+        assert label_flags(['toxic', 'obscene', 'insult']) == 0b10101
+        assert label_flags(['identity_hate']) == 1 << LABELS.index('identity_hate')
+
+    def test_compact_result(self, toxic_prediction):
+        body = compact_result(toxic_prediction)
+        assert body["scores"] == [0.95, 0.1, 0.8, 0.0, 0.7, 0.0]
+        assert body["flags"] == 0b10101
+        assert "text" not in body and "timestamp" not in body
+
+    def test_full_result_matches_pydantic_response(self, toxic_prediction):
+        text = "x" * 150
+        fast = json.loads(render_result(text, toxic_prediction, "full").body)
+        model = ModerationResponse(
+            text=text[:100] + "...",
+            is_toxic=True,
+            toxicity_scores=ToxicityScores(**toxic_prediction['toxicity_scores']),
+            flagged_categories=toxic_prediction['flagged_categories'],
+            confidence=0.95,
+            timestamp=fast["timestamp"]
+        )
+        assert fast == json.loads(model.model_dump_json())
+
+    def test_full_result_shares_timestamp(self, toxic_prediction):
+        body = full_result("short", toxic_prediction, timestamp="fixed")
+        assert body["text"] == "short"
+        assert body["timestamp"] == "fixed"
+
+
+class TestResponseFormats:
+    def test_default_is_full(self, client):
+        response = client.post("/moderate", json={"text": "You are terrible"})
+        assert response.status_code == 200
+        assert response.json()["toxicity_scores"]["toxic"] == 0.95
+        assert "timestamp" in response.json()
+
+    def test_compact(self, client):
+        response = client.post("/moderate", params={"format": "compact"}, json={"text": "You are terrible"})
+        assert response.status_code == 200
+        assert response.json() == {"is_toxic": True, "scores": [0.95, 0.1, 0.8, 0.0, 0.7, 0.0], "flags": 21,
+                                   "confidence": 0.95}
+
+    def test_compact_batch(self, client):
+        response = client.post("/moderate/batch", params={"format": "compact"}, json={"texts": ["a", "b", "c"]})
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert len(results) == 3
+        assert all(r["flags"] == 21 for r in results)
+
+    def test_full_batch_shares_timestamp(self, client):
+        response = client.post("/moderate/batch", json={"texts": ["a", "b"]})
+        results = response.json()["results"]
+        assert results[0]["timestamp"] == results[1]["timestamp"]
+
+    def test_unknown_format(self, client):
+        response = client.post("/moderate", params={"format": "xml"}, json={"text": "hello"})
+        assert response.status_code == 400
+        assert "format" in response.json()["detail"]
+
+    def test_labels(self, client):
+        response = client.get("/labels")
+        assert response.json()["labels"] == LABELS
@@ -0,0 +1,95 @@
+import os
+import boto3
+import hashlib
+import pytest
+from moto import mock_s3
+from unittest.mock import patch
+
+from src.models import s3_download
+
+AWS_TEST_ENV = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1"
+}
+
+PAYLOAD = os.urandom(300 * 1024)
+
+
+@pytest.fixture
+def s3():
+    # moto stands in for S3
+    with patch.dict(os.environ, AWS_TEST_ENV), mock_s3():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="models")
+        yield client
+
+
+def put_model(s3, body, checksum=None):
+    metadata = {"sha256": checksum or hashlib.sha256(body).hexdigest()}
+    s3.put_object(Bucket="models", Key="best_model.pt", Body=body, Metadata=metadata)
+
+
+class TestParallelDownload:
+    def test_ranged_parts_reassemble(self, s3, tmp_path):
+        """Test a multi-part download reproduces the object exactly."""
+        put_model(s3, PAYLOAD)
+        dest = str(tmp_path / "best_model.pt")
+        s3_download.download_parallel(s3, "models", "best_model.pt", dest, part_size=64 * 1024, concurrency=4)
+
+        with open(dest, "rb") as f:
+            assert f.read() == PAYLOAD
+        assert s3_download.read_meta(dest)["size"] == len(PAYLOAD)
+        assert not [p for p in os.listdir(tmp_path) if ".part-" in p]
+
+    def test_checksum_mismatch(self, s3, tmp_path):
+        """Test a corrupt download is rejected and never moved into place."""
+        put_model(s3, PAYLOAD, checksum="0" * 64)
+        dest = str(tmp_path / "best_model.pt")
+        with pytest.raises(s3_download.ChecksumMismatchError):
+            s3_download.download_parallel(s3, "models", "best_model.pt", dest, part_size=64 * 1024)
+        assert os.listdir(tmp_path) == []
+
+    def test_crash_before_sidecar_leaves_no_stale_meta(self, s3, tmp_path):
+        """Test a crash between moving the file and writing its sidecar leaves no sidecar at all."""
+        put_model(s3, PAYLOAD)
+        dest = str(tmp_path / "best_model.pt")
+        s3_download.download_parallel(s3, "models", "best_model.pt", dest)
+
+        put_model(s3, PAYLOAD[::-1])
+        with patch.object(s3_download, "write_meta", side_effect=OSError("crash")), pytest.raises(OSError):
+            s3_download.download_parallel(s3, "models", "best_model.pt", dest)
+        assert s3_download.read_meta(dest) is None
+        with open(dest, "rb") as f:
+            assert f.read() == PAYLOAD[::-1]
+
+
+class TestCache:
+    def test_reuse_when_etag_matches(self, s3, tmp_path):
+        put_model(s3, PAYLOAD)
+        dest = str(tmp_path / "best_model.pt")
+        s3_download.download_parallel(s3, "models", "best_model.pt", dest)
+        assert s3_download.is_cached(dest, s3_download.remote_meta(s3, "models", "best_model.pt"))
+
+    def test_stale_when_object_changes(self, s3, tmp_path):
+        """Test a warm copy is invalidated when the S3 object changes."""
+        put_model(s3, PAYLOAD)
+        dest = str(tmp_path / "best_model.pt")
+        s3_download.download_parallel(s3, "models", "best_model.pt", dest)
+
+        put_model(s3, PAYLOAD[::-1])
+        assert not s3_download.is_cached(dest, s3_download.remote_meta(s3, "models", "best_model.pt"))
+
+    def test_adopt_copy_without_sidecar(self, s3, tmp_path):
+        """Test a manually placed copy is adopted when its checksum matches."""
+        put_model(s3, PAYLOAD)
+        dest = tmp_path / "best_model.pt"
+        dest.write_bytes(PAYLOAD)
+        assert s3_download.is_cached(str(dest), s3_download.remote_meta(s3, "models", "best_model.pt"))
+        assert s3_download.read_meta(str(dest)) is not None
+
+    def test_partial_copy_not_reused(self, s3, tmp_path):
+        put_model(s3, PAYLOAD)
+        dest = tmp_path / "best_model.pt"
+        dest.write_bytes(PAYLOAD[:1000])
+        assert not s3_download.is_cached(str(dest), s3_download.remote_meta(s3, "models", "best_model.pt"))
@@ -0,0 +1,124 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+import torch
+from unittest.mock import MagicMock, patch
+
+from src.api import server
+from src.api.server import threads_per_worker, parse_smaps_rollup, process_memory, memory_report
+
+SMAPS_ROLLUP = """00400000-7ffd8b5f7000 ---p 00000000 00:00 0                          [rollup]
+Rss:              453040 kB
+Pss:              273812 kB
+Shared_Clean:     261000 kB
+Shared_Dirty:          0 kB
+Private_Clean:      1024 kB
+Private_Dirty:    191016 kB
+Referenced:       453040 kB
+"""
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestThreadSplit:
+    @pytest.mark.parametrize("workers, cpus, expected", [
+        (1, 8, 8),
+        (4, 8, 2),
+        (3, 8, 2),
+        (16, 8, 1),
+    ])
+    def test_threads_per_worker(self, workers, cpus, expected):
+        """Test workers never oversubscribe the available cores."""
+        assert threads_per_worker(workers, cpus) == expected
+
+
+class TestMemoryReport:
+    def test_parse_smaps_rollup(self):
+        values = parse_smaps_rollup(SMAPS_ROLLUP)
+        assert values["Rss"] == 453040
+        assert values["Shared_Clean"] == 261000
+        assert "Referenced" not in values
+
+    def test_process_memory_self(self):
+        memory = process_memory(os.getpid())
+        assert memory["rss_mb"] > 0
+        assert memory["shared_mb"] + memory["private_mb"] <= memory["rss_mb"] + 1
+
+    def test_memory_report_skips_missing(self):
+        report = memory_report([os.getpid(), 2 ** 22 + 1])
+        assert list(report["processes"]) == [os.getpid()]
+        assert report["total_rss_mb"] > 0
+
+
+class TestPreload:
+    def test_shadow_candidate_preloaded_and_frozen(self):
+        primary, candidate = torch.nn.Linear(2, 2), torch.nn.Linear(2, 2)
+        scorer = MagicMock()
+        scorer.candidate.model = candidate
+
+        def load_shadow_scorer():
+            server.main.shadow_scorer = scorer
+
+        with patch.multiple(
+            'src.api.main', load_predictor=MagicMock(), model_loader=MagicMock(), shadow_scorer=None,
+            load_shadow_scorer=load_shadow_scorer
+        ), patch('src.api.server.gc.freeze'), patch('src.api.server.torch.set_num_threads'):
+            server.main.model_loader.get_model.return_value = primary
+            server.preload_and_freeze()
+            assert server.main.shadow_scorer is scorer
+
+        assert not any(p.requires_grad for p in primary.parameters())
+        assert not any(p.requires_grad for p in candidate.parameters())
+        assert not candidate.training
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Pre-fork server needs os.fork")
+class TestServe:
+    def test_worker_serves_health(self, tiny_model_dir, tmp_path):
+        """Start the real pre-fork server with one worker and the tiny model."""
+        port = free_port()
+        env = dict(
+            os.environ, MODEL_PATH=tiny_model_dir, MAX_LENGTH="64", JOB_EXECUTOR="false",
+            HF_HUB_OFFLINE="1", TRANSFORMERS_OFFLINE="1"
+        )
+        env.pop("SHADOW_MODEL_PATH", None)
+        log = open(tmp_path / "server.log", "wb")  # A file rather than a pipe, which could fill up and block
+        process = subprocess.Popen(
+            [sys.executable, "-m", "src.api.server", "--host", "127.0.0.1", "--port", str(port),
+             "--workers", "1", "--threads", "1", "--report-interval", "0"],
+            cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                assert process.poll() is None, (tmp_path / "server.log").read_text()[-2000:]
+                try:
+                    response = httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+                    break
+                except httpx.TransportError:
+                    assert time.monotonic() < deadline, "server did not come up"
+                    time.sleep(0.2)
+            assert response.status_code == 200
+            assert response.json()["model_loaded"] is True
+        finally:
+            process.send_signal(signal.SIGTERM)
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            log.close()
+        assert process.returncode == 0
@@ -0,0 +1,151 @@
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, patch
+
+from src.api.admission import AdmissionController
+from src.api.main import app
+from src.api.shadow import ShadowScorer, ShadowSummary
+from src.utils.text_processing import clean_text
+
+LABELS = ['toxic', 'severe_toxic', 'obscene', 'threat', 'insult', 'identity_hate']
+
+
+def prediction(*scores):
+    scores = dict(zip(LABELS, list(scores) + [0.0] * (6 - len(scores))))
+    flagged = [label for label, score in scores.items() if score > 0.5]
+    return {'is_toxic': bool(flagged), 'toxicity_scores': scores, 'flagged_categories': flagged,
+            'confidence': max(scores.values())}
+
+
+PRIMARY = prediction(0.9, 0.1, 0.6)
+CANDIDATE = prediction(0.8, 0.1, 0.3)
+
+
+@pytest.fixture
+def candidate():
+    candidate = MagicMock()
+    candidate.predict_batch.side_effect = lambda texts: [CANDIDATE] * len(texts)
+    return candidate
+
+
+def make_scorer(candidate, admission=None, **kwargs):
+    kwargs.setdefault("sample_rate", 1.0)
+    return ShadowScorer(candidate, admission or AdmissionController(max_concurrent=2), **kwargs)
+
+
+async def drain(scorer):
+    while await scorer.step():
+        pass
+
+
+class TestShadowSummary:
+    def test_diffs_and_disagreements(self):
+        summary = ShadowSummary(labels=["a", "b"])
+        primary = np.array([[0.9, 0.2], [0.4, 0.1], [0.1, 0.1]])
+        candidate = np.array([[0.3, 0.2], [0.6, 0.1], [0.1, 0.12]])
+        summary.record(["x", "y", "z"], primary, candidate)
+
+        snapshot = summary.snapshot()
+        a, b = snapshot["labels"]["a"], snapshot["labels"]["b"]
+        assert snapshot["scored"] == 3
+        assert a["mean_diff"] == pytest.approx(-0.4 / 3, abs=1e-6)
+        assert a["mean_abs_diff"] == pytest.approx(0.8 / 3, abs=1e-6)
+        assert a["max_abs_diff"] == pytest.approx(0.6)
+        assert (a["flagged_by_primary_only"], a["flagged_by_candidate_only"]) == (1, 1)
+        assert a["abs_diff_histogram"] == {"<=0.01": 1, "<=0.05": 0, "<=0.1": 0, "<=0.25": 1, "<=0.5": 0, ">0.5": 1}
+        assert b["disagreement_rate"] == 0
+        assert snapshot["is_toxic_disagreements"] == 2
+        examples = snapshot["recent_disagreements"]
+        assert [e["text_length"] for e in examples] == [1, 1]
+        assert examples[0]["text_hash"] != examples[1]["text_hash"]
+        assert all("text" not in e for e in examples)
+
+    def test_examples_bounded(self):
+        summary = ShadowSummary(labels=["a"], max_examples=3)
+        for _ in range(10):
+            summary.record(["x"], np.array([[0.9]]), np.array([[0.1]]))
+        assert len(summary.snapshot()["recent_disagreements"]) == 3
+
+
+class TestShadowScorer:
+    def test_scores_sampled_batches(self, candidate):
+        scorer = make_scorer(candidate, batch_size=4)
+
+        async def scenario():
+            await scorer.offer([f"text {i}" for i in range(10)], [PRIMARY] * 10)
+            await drain(scorer)
+
+        asyncio.run(scenario())
+        assert candidate.predict_batch.call_count == 3
+        snapshot = scorer.snapshot()
+        assert snapshot["summary"]["scored"] == 10
+        assert snapshot["summary"]["labels"]["obscene"]["flagged_by_primary_only"] == 10
+        assert snapshot["summary"]["labels"]["toxic"]["mean_diff"] == pytest.approx(-0.1)
+        assert snapshot["max_forward_ms"] >= snapshot["mean_forward_ms"] >= 0
+
+    def test_sampling_rate(self, candidate):
+        scorer = make_scorer(candidate, sample_rate=0.0)
+        asyncio.run(scorer.offer(["a", "b"], [PRIMARY] * 2))
+        assert (scorer.offered, scorer.sampled, scorer.snapshot()["queued"]) == (2, 0, 0)
+
+    def test_full_queue_drops(self, candidate):
+        scorer = make_scorer(candidate, max_queue=3)
+        asyncio.run(scorer.offer(["a"] * 5, [PRIMARY] * 5))
+        assert scorer.snapshot()["queued"] == 3
+        assert scorer.dropped["queue_full"] == 2
+
+    def test_waits_while_busy(self, candidate):
+        admission = AdmissionController(max_concurrent=2)
+        scorer = make_scorer(candidate, admission)
+
+        async def scenario():
+            await scorer.offer(["a"], [PRIMARY])
+            async with admission.slot("interactive"):
+                assert await scorer.step() is False
+            assert await scorer.step() is True
+
+        asyncio.run(scenario())
+        assert scorer.deferred == 1
+        assert candidate.predict_batch.call_count == 1
+
+    def test_candidate_error_drops_batch(self, candidate):
+        candidate.predict_batch.side_effect = RuntimeError("boom")
+        scorer = make_scorer(candidate)
+
+        async def scenario():
+            await scorer.offer(["a", "b"], [PRIMARY] * 2)
+            await drain(scorer)
+
+        asyncio.run(scenario())
+        assert scorer.dropped["error"] == 2
+        assert scorer.snapshot()["summary"]["scored"] == 0
+
+
+class TestShadowEndpoints:
+    @pytest.fixture
+    def predictor(self):
+        predictor = MagicMock()
+        predictor.predict.return_value = PRIMARY
+        predictor.predict_batch.side_effect = lambda texts: [PRIMARY] * len(texts)
+        return predictor
+
+    def test_disabled(self):
+        with patch('src.api.main.shadow_scorer', None):
+            assert TestClient(app).get("/shadow").json() == {"enabled": False}
+
+    def test_queued_after_response(self, predictor, candidate, serve_app):
+        admission = AdmissionController(max_concurrent=2)
+        scorer = make_scorer(candidate, admission)
+        with serve_app(predictor, admission, shadow_scorer=scorer):
+            client = TestClient(app)
+            assert client.post("/moderate", json={"text": "Hello World"}).status_code == 200
+            assert client.post("/moderate/batch", json={"texts": ["one", "two"]}).status_code == 200
+
+            stats = client.get("/shadow").json()
+            assert stats["enabled"] is True
+            assert stats["sampled"] == 3 and stats["queued"] == 3
+            assert scorer._queue[0][0] == clean_text("Hello World")  # As the primary model saw it
+            candidate.predict_batch.assert_not_called()
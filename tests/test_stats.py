@@ -0,0 +1,77 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+
+from src.api.stats import PredictionStats
+from src.api.main import app
+
+TOXIC = [0.9, 0.1, 0.8, 0.0, 0.7, 0.0]
+CLEAN = [0.01, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+
+class TestPredictionStats:
+    @pytest.fixture
+    def stats(self):
+        return PredictionStats(capacity=4)
+
+    def test_empty_window(self, stats):
+        assert stats.window(60)["count"] == 0
+
+    def test_window_aggregates(self, stats):
+        """Test rates, flag counts and percentiles over a window."""
+        stats.record(TOXIC, 0.010, timestamp=1000.0)
+        stats.record(CLEAN, 0.020, timestamp=1000.0)
+
+        result = stats.window(60, now=1010.0)
+        assert result["count"] == 2
+        assert result["toxic_rate"] == 0.5
+        assert result["flag_counts"]["toxic"] == 1
+        assert result["flag_counts"]["threat"] == 0
+        assert result["latency_ms"]["max"] == pytest.approx(20.0, abs=0.01)
+
+    def test_window_excludes_old_entries(self, stats):
+        stats.record(TOXIC, 0.01, timestamp=100.0)
+        stats.record(CLEAN, 0.01, timestamp=1000.0)
+        result = stats.window(60, now=1010.0)
+        assert result["count"] == 1
+        assert result["toxic_rate"] == 0.0
+
+    def test_ring_buffer_overwrites_oldest(self, stats):
+        """Test memory stays fixed and the oldest entries are overwritten."""
+        for _ in range(4):
+            stats.record(TOXIC, 0.01, timestamp=1000.0)
+        for _ in range(2):
+            stats.record(CLEAN, 0.01, timestamp=1000.0)
+
+        snapshot = stats.window(60, now=1000.0)
+        assert snapshot["count"] == 4
+        assert snapshot["toxic_rate"] == 0.5
+        assert stats.snapshot()["total_recorded"] == 6
+
+    def test_truncated_window_uses_covered_span(self, stats):
+        """Test rates over a window the buffer no longer fully covers."""
+        for t in range(6):
+            stats.record(CLEAN, 0.01, timestamp=1000.0 + t)
+
+        result = stats.window(3600, now=1010.0)
+        assert result["truncated"] is True
+        assert result["covered_seconds"] == pytest.approx(8.0)  # Oldest retained entry is t=1002
+        assert result["requests_per_second"] == pytest.approx(4 / 8.0)
+
+        short = stats.window(5, now=1010.0)
+        assert short["truncated"] is False
+        assert short["covered_seconds"] == 5
+        assert short["requests_per_second"] == pytest.approx(1 / 5)
+
+
+class TestStatsEndpoint:
+    def test_stats_endpoint(self):
+        stats = PredictionStats(capacity=8)
+        stats.record(TOXIC, 0.01)
+        with patch('src.api.main.prediction_stats', stats):
+            client = TestClient(app)
+            response = client.get("/stats", params={"window": 60})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["windows"]["60"]["count"] == 1
+        assert data["capacity"] == 8
@@ -0,0 +1,92 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from torch.utils.data import DataLoader
+from transformers import AutoTokenizer
+from unittest.mock import patch
+
+from src.training import token_cache
+from src.training.data import LABEL_COLUMNS, load_processed_csv
+from src.training.token_cache import TokenizedDataset, build_token_cache, parallel_clean
+
+TEXTS = [
+    "you are a stupid idiot", "hello  world\n", "i hate this http://spam.example.com", "thanks for the help",
+    "this is great", "you are bad", "nice comment", "i love this"
+]
+
+
+@pytest.fixture(scope="module")
+def tokenizer(tiny_model_dir):
+    return AutoTokenizer.from_pretrained(tiny_model_dir)
+
+
+@pytest.fixture
+def split_csv(tmp_path):
+    rows = [
+        {"comment_text": text, **{label: 0 for label in LABEL_COLUMNS}, "toxic": int("stupid" in text or "hate" in text)}
+        for text in TEXTS
+    ]
+    rows.append({"comment_text": "www.example.com", **{label: 0 for label in LABEL_COLUMNS}})
+    path = tmp_path / "split.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+class TestParallelClean:
+    def test_matches_serial_cleaning(self):
+        texts = TEXTS * 50
+        assert parallel_clean(texts, workers=2, chunksize=16) == parallel_clean(texts, workers=1)
+
+
+class TestTokenCache:
+    def test_rows_match_tokenizer(self, split_csv, tokenizer, tmp_path):
+        dataset = TokenizedDataset(build_token_cache(split_csv, tokenizer, str(tmp_path / "cache"), max_length=8))
+        texts, labels = load_processed_csv(split_csv)
+
+        assert len(dataset) == len(texts) == len(TEXTS)  # Row empty after cleaning dropped
+        expected = tokenizer(texts, truncation=True, max_length=8)["input_ids"]
+        for i, ids in enumerate(expected):
+            row_ids, row_labels = dataset[i]
+            assert row_ids.tolist() == ids
+            assert row_labels.tolist() == labels[i].tolist()
+        assert dataset.input_ids.dtype == np.uint16
+        assert dataset.labels.dtype == np.uint8
+        assert isinstance(dataset.input_ids, np.memmap)
+
+    def test_reused_until_inputs_change(self, split_csv, tokenizer, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        first = build_token_cache(split_csv, tokenizer, cache_dir, max_length=8)
+        with patch.object(token_cache, "parallel_clean") as clean:
+            assert build_token_cache(split_csv, tokenizer, cache_dir, max_length=8) == first
+            clean.assert_not_called()
+
+        assert build_token_cache(split_csv, tokenizer, cache_dir, max_length=16) != first
+        with patch.object(token_cache, "CLEAN_TEXT_VERSION", "2"):
+            assert build_token_cache(split_csv, tokenizer, cache_dir, max_length=8) != first
+        with open(split_csv, "a") as f:
+            f.write("new row,0,0,0,0,0,0\n")
+        assert build_token_cache(split_csv, tokenizer, cache_dir, max_length=8) != first
+        assert not [name for name in os.listdir(cache_dir) if name.startswith(".")]
+
+    def test_collate_pads_to_batch_longest(self, split_csv, tokenizer, tmp_path):
+        dataset = TokenizedDataset.from_csv(split_csv, tokenizer, str(tmp_path / "cache"), max_length=64)
+        batch = dataset.collate([dataset[0], dataset[1]])
+        longest = int(max(dataset.lengths[0], dataset.lengths[1]))
+        assert batch["input_ids"].shape == (2, longest)
+        assert batch["attention_mask"].sum(dim=1).tolist() == [int(dataset.lengths[0]), int(dataset.lengths[1])]
+        assert batch["labels"].dtype.is_floating_point
+
+    def test_pickles_by_path(self, split_csv, tokenizer, tmp_path):
+        dataset = TokenizedDataset.from_csv(split_csv, tokenizer, str(tmp_path / "cache"))
+        payload = pickle.dumps(dataset)
+        assert len(payload) < 4096
+        restored = pickle.loads(payload)
+        assert restored[3][0].tolist() == dataset[3][0].tolist()
+
+    def test_dataloader(self, split_csv, tokenizer, tmp_path):
+        dataset = TokenizedDataset.from_csv(split_csv, tokenizer, str(tmp_path / "cache"))
+        batches = list(DataLoader(dataset, batch_size=3, collate_fn=dataset.collate))
+        assert sum(len(b["labels"]) for b in batches) == len(dataset)
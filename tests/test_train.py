@@ -0,0 +1,111 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import torch
+from unittest.mock import patch
+
+from src.models.model_loader import ModelLoader
+from src.models.predictor import ToxicityPredictor
+from src.training import train as training
+from src.training.data import LABEL_COLUMNS
+from src.training.train import LengthGroupedBatchSampler
+
+TEXTS = [
+    "you are a stupid idiot", "hello world", "i hate this", "thanks for the help",
+    "this is great you are a nice comment", "you are bad", "nice comment", "i love this this this"
+]
+
+
+@pytest.fixture
+def split_csv(tmp_path):
+    rows = []
+    for text in TEXTS * 3:
+        toxic = int(any(w in text for w in ("stupid", "hate", "bad")))
+        rows.append({"comment_text": text, **{label: 0 for label in LABEL_COLUMNS}, "toxic": toxic, "insult": int("idiot" in text)})
+    path = tmp_path / "split.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+def run(split_csv, tiny_model_dir, tmp_path, **kwargs):
+    options = dict(
+        model_name=tiny_model_dir, epochs=2, batch_size=4, accumulation_steps=2, warmup_steps=1,
+        max_length=16, val_fraction=0.25, cache_dir=str(tmp_path / "cache"), learning_rate=1e-3
+    )
+    options.update(kwargs)
+    return training.train(split_csv, str(tmp_path / "model"), **options)
+
+
+class TestLengthGroupedBatchSampler:
+    def test_covers_every_row_once(self):
+        lengths = np.random.default_rng(0).integers(1, 200, size=103)
+        sampler = LengthGroupedBatchSampler(lengths, batch_size=8, mega_batch_mult=4)
+        batches = list(sampler)
+        assert len(batches) == len(sampler) == 13
+        assert sorted(i for batch in batches for i in batch) == list(range(103))
+
+    def test_batches_have_similar_lengths(self):
+        lengths = np.random.default_rng(0).integers(1, 256, size=4000)
+        grouped = LengthGroupedBatchSampler(lengths, batch_size=16)
+        shuffled = np.random.default_rng(1).permutation(4000).reshape(-1, 16)
+
+        def padding(batches):
+            return sum(len(b) * lengths[b].max() - lengths[b].sum() for b in map(np.asarray, batches))
+
+        assert padding(list(grouped)) < padding(shuffled) / 5
+
+    def test_order_depends_on_epoch_and_replays(self):
+        sampler = LengthGroupedBatchSampler(np.arange(64), batch_size=4)
+        first = list(sampler)
+        sampler.set_epoch(1)
+        assert list(sampler) != first
+        sampler.set_epoch(0, skip=5)
+        assert list(sampler) == first[5:]
+
+
+class TestTrain:
+    def test_smoke_run_writes_servable_model(self, split_csv, tiny_model_dir, tmp_path):
+        """Test a tiny config trains on CPU and ModelLoader serves the result."""
+        report = run(split_csv, tiny_model_dir, tmp_path, state_dict_path=str(tmp_path / "best_model.pt"))
+
+        assert [row["epoch"] for row in report["epochs"]] == [1, 2]
+        assert report["epochs"][0]["padding_efficiency"] <= 1.0
+        # 3 of 8 texts are toxic
+        assert report["config"]["pos_weight"][LABEL_COLUMNS.index("toxic")] == pytest.approx(5 / 3, rel=0.3)
+        output = str(tmp_path / "model")
+        with open(os.path.join(output, training.REPORT_FILE)) as f:
+            assert json.load(f)["best_epoch"] == report["best_epoch"]
+
+        loader = ModelLoader(model_path=output, device="cpu", inference_mode="eager")
+        loader.load_model()
+        prediction = ToxicityPredictor(loader.get_model(), loader.get_tokenizer(), max_length=16).predict("hello")
+        assert set(prediction["toxicity_scores"]) == set(LABEL_COLUMNS)
+        assert set(torch.load(tmp_path / "best_model.pt")) == set(loader.get_model().state_dict())
+
+    def test_resume_after_interruption(self, split_csv, tiny_model_dir, tmp_path):
+        """Test a run killed at epoch end resumes from its mid-epoch checkpoint."""
+        complete = run(split_csv, tiny_model_dir, tmp_path / "complete", epochs=1, checkpoint_every=1)
+        steps = torch.load(tmp_path / "complete" / "model" / "checkpoint" / "training_state.pt")["state"]["global_step"]
+
+        with patch.object(training, "evaluate", side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                run(split_csv, tiny_model_dir, tmp_path, epochs=1, checkpoint_every=1)
+        saved = torch.load(tmp_path / "model" / "checkpoint" / "training_state.pt")["state"]
+        assert 0 < saved["batches_done"] and saved["epoch"] == 0
+
+        with patch.object(training.TokenizedDataset, "collate", autospec=True,
+                          side_effect=training.TokenizedDataset.collate) as collate:
+            resumed = run(split_csv, tiny_model_dir, tmp_path, epochs=1, checkpoint_every=1)
+        state = torch.load(tmp_path / "model" / "checkpoint" / "training_state.pt")["state"]
+        assert state["global_step"] == steps
+        assert len(resumed["epochs"]) == len(complete["epochs"]) == 1
+        # 18 training rows make 5 batches; only those after the checkpoint, plus one validation batch, run again
+        assert collate.call_count == 5 - saved["batches_done"] + 1
+
+    def test_extends_finished_run(self, split_csv, tiny_model_dir, tmp_path):
+        run(split_csv, tiny_model_dir, tmp_path, epochs=1)
+        report = run(split_csv, tiny_model_dir, tmp_path, epochs=2)
+        assert [row["epoch"] for row in report["epochs"]] == [1, 2]
@@ -0,0 +1,79 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.models.model_loader import ModelLoader
+from src.models.predictor import ToxicityPredictor
+from src.training import vocab_pruning
+
+CORPUS = ["you are a stupid idiot", "hello world", "i hate this", "thanks for the help"]
+
+
+@pytest.fixture
+def loaded(tiny_model_dir):
+    loader = ModelLoader(model_path=tiny_model_dir, device="cpu", inference_mode="eager")
+    loader.load_model()
+    return loader.get_model(), loader.get_tokenizer()
+
+
+@pytest.fixture
+def corpus_file(tmp_path):
+    path = tmp_path / "corpus.txt"
+    path.write_text("\n".join(CORPUS + ["", "http://example.com"]) + "\n")
+    return str(path)
+
+
+class TestVocabSelection:
+    def test_keeps_seen_and_special_tokens(self, loaded):
+        _, tokenizer = loaded
+        counts = vocab_pruning.count_tokens(tokenizer, CORPUS)
+        keep = vocab_pruning.select_vocab(tokenizer, counts, keep_chars=False)
+
+        kept = set(tokenizer.convert_ids_to_tokens(keep.tolist()))
+        assert {"[PAD]", "[UNK]", "[CLS]", "[SEP]", "stupid", "hello"} <= kept
+        assert "love" not in kept
+        assert list(keep) == sorted(keep)
+
+    def test_max_vocab_keeps_most_frequent(self, loaded):
+        _, tokenizer = loaded
+        counts = vocab_pruning.count_tokens(tokenizer, ["you you you hello"])
+        keep = vocab_pruning.select_vocab(tokenizer, counts, max_vocab=1, keep_chars=False)
+        assert "you" in tokenizer.convert_ids_to_tokens(keep.tolist())
+        assert "hello" not in tokenizer.convert_ids_to_tokens(keep.tolist())
+
+    def test_load_corpus_cleans_and_drops_empty(self, corpus_file):
+        assert vocab_pruning.load_corpus(corpus_file) == CORPUS
+
+
+class TestPrune:
+    def test_pruned_artifact_loads_and_matches_on_corpus(self, tiny_model_dir, corpus_file, tmp_path):
+        """Test texts made of seen pieces score identically after pruning."""
+        output = str(tmp_path / "pruned")
+        report = vocab_pruning.prune(corpus_file, corpus_file, output, model_path=tiny_model_dir, keep_chars=False)
+
+        assert report["vocab_size"]["pruned"] < report["vocab_size"]["original"]
+        assert report["parameters"]["pruned"] < report["parameters"]["original"]
+        assert report["heldout"]["drift"]["max_abs_diff"] < 1e-5
+        assert report["heldout"]["unk_rate"]["pruned"] == 0.0
+        with open(os.path.join(output, vocab_pruning.REPORT_FILE)) as f:
+            assert json.load(f) == report
+
+        loader = ModelLoader(model_path=output, device="cpu", inference_mode="eager")
+        loader.load_model()
+        tokenizer = loader.get_tokenizer()
+        assert len(tokenizer) == report["vocab_size"]["pruned"]
+        assert loader.get_model().get_input_embeddings().num_embeddings == len(tokenizer)
+
+        # Unseen words fall back to the unknown token rather than failing
+        assert tokenizer.tokenize("i love this") == ["i", "[UNK]", "this"]
+        prediction = ToxicityPredictor(loader.get_model(), tokenizer).predict("i love this")
+        assert set(prediction['toxicity_scores']) == set(ToxicityPredictor.LABEL_COLUMNS)
+
+    def test_score_drift(self):
+        original = np.array([[0.4, 0.1], [0.9, 0.2]])
+        pruned = np.array([[0.6, 0.1], [0.9, 0.2]])
+        drift = vocab_pruning.score_drift(original, pruned)
+        assert drift["max_abs_diff"] == pytest.approx(0.2)
+        assert drift["flag_flip_rate"] == 0.5